@@ -14,8 +14,7 @@ from flask_wtf.file import FileField, FileAllowed
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import re
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from utils_sheets import obtener_cliente
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -41,31 +40,7 @@ login_manager = LoginManager()
 login_manager.login_view = 'login'  # Vista de inicio de sesión
 login_manager.init_app(app)
 
-# Configura la autorización con Google API
-google_credentials = {
-    "type": os.getenv("GOOGLE_TYPE"),
-    "project_id": os.getenv("GOOGLE_PROJECT_ID"),
-    "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
-    "private_key": os.getenv("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
-    "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
-    "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-    "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
-    "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
-    "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_X509_CERT_URL"),
-    "client_x509_cert_url": os.getenv("GOOGLE_CLIENT_X509_CERT_URL"),
-    "universe_domain": os.getenv("GOOGLE_UNIVERSE_DOMAIN")
-}
-
-# Configurar el alcance (scope) de las credenciales
-scope = ["https://spreadsheets.google.com/feeds",
-         "https://www.googleapis.com/auth/drive"]
-
-# Crear las credenciales
-creds = ServiceAccountCredentials.from_json_keyfile_dict(
-    google_credentials, scopes=scope)
-
-# Autorizar el cliente de gspread
-client = gspread.authorize(creds)
+# La autorización con Google API se hace en el primer envío (utils_sheets)
 
 # Función para verificar si la extensión del archivo es válida
 
@@ -419,6 +394,7 @@ def handle_formulario():
     fecha_envio = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     try:
+        client = obtener_cliente()
         sheet = client.open_by_url(
             "https://docs.google.com/spreadsheets/d/1xRvKsi8ZMb5ILpvJTqkTW9MKAHXal_laWo_2_9p9VJY/edit?usp=sharing")
         worksheet = sheet.get_worksheet(0)
@@ -0,0 +1,70 @@
+"""
+Mide el tiempo de arranque en frío de la aplicación (importar + create_app)
+y muestra qué módulos cuestan más, al estilo de python -X importtime.
+
+Uso:
+    python benchmarks/arranque.py --repeticiones 5 --presupuesto-ms 800
+
+Termina con código 1 si la mediana supera el presupuesto, para poder
+usarlo en CI y no volver a engordar el arranque sin darnos cuenta.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODIGO = ('import time; t = time.perf_counter(); '
+          'from app import create_app; create_app(); '
+          'print((time.perf_counter() - t) * 1000)')
+LINEA_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+
+
+def ejecutar(importtime=False):
+    comando = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CODIGO]
+    resultado = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True, check=True)
+    return float(resultado.stdout.strip().splitlines()[-1]), resultado.stderr
+
+
+def modulos_costosos(stderr, cantidad):
+    """
+    Devuelve los paquetes raíz (flask, sqlalchemy, ...) ordenados por el
+    tiempo acumulado de su importación más costosa.
+    """
+    paquetes = {}
+    for linea in stderr.splitlines():
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            raiz = coincidencia.group(3).split('.')[0]
+            ms = int(coincidencia.group(2)) / 1000
+            paquetes[raiz] = max(paquetes.get(raiz, 0), ms)
+    return sorted(paquetes.items(), key=lambda par: par[1], reverse=True)[:cantidad]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--presupuesto-ms', type=float, default=800)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    tiempos = [ejecutar()[0] for _ in range(args.repeticiones)]
+    mediana = statistics.median(tiempos)
+    _, stderr = ejecutar(importtime=True)
+
+    print(f'arranque (importar + create_app): mediana {mediana:.0f} ms, '
+          f'mín {min(tiempos):.0f} ms, máx {max(tiempos):.0f} ms')
+    print(f'\n{"módulo":<40}{"acumulado ms":>14}')
+    for modulo, ms in modulos_costosos(stderr, args.top):
+        print(f'{modulo:<40}{ms:>14.1f}')
+
+    if mediana > args.presupuesto_ms:
+        print(f'\nSupera el presupuesto de {args.presupuesto_ms:.0f} ms')
+        sys.exit(1)
+    print(f'\nDentro del presupuesto de {args.presupuesto_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,406 @@
+"""
+Prueba de carga: siembra una base grande y recorre escenarios con usuarios
+virtuales concurrentes contra gunicorn, con latencias p50/p95/p99,
+throughput y tasa de errores por ruta que se pueden comparar entre commits.
+
+Uso:
+    python benchmarks/carga.py --usuarios 10000 --videos 1000000 \\
+        --virtuales 16 --duracion 60 --salida carga-base.json
+    # después del cambio, con los mismos parámetros
+    python benchmarks/carga.py --usuarios 10000 --videos 1000000 \\
+        --virtuales 16 --duracion 60 --comparar carga-base.json --tolerancia 10
+
+La base sembrada (títulos y descripciones generados con --semilla) se
+guarda en build/carga/ y se reutiliza mientras no cambien los parámetros
+ni models.py; cada corrida trabaja sobre una copia, así las subidas de una
+no alteran la siguiente. Todos los usuarios tienen la contraseña 'carga'.
+
+Escenarios (--mezcla navegar=40,blog=15,buscar=25,login=10,subir=10):
+    navegar  /index y hasta dos páginas más siguiendo la cabecera Link
+    blog     /blog
+    buscar   /search?query= con una o dos palabras de los títulos
+    login    POST /login y /mis_videos
+    subir    POST /upload de un video nuevo (inicia sesión si hace falta)
+
+Las primeras --calentamiento segundos no se cuentan. Con --comparar
+termina con código 1 si el p95 de alguna ruta empeora más de
+--tolerancia % o su tasa de errores sube más de un punto.
+"""
+import argparse
+import hashlib
+import http.cookiejar
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+from comparar_servidores import RAIZ, esperar
+
+CACHE = os.path.join(RAIZ, 'build', 'carga')
+CONTRASENA = 'carga'
+MEZCLA = 'navegar=40,blog=15,buscar=25,login=10,subir=10'
+TEMAS = ['Python', 'Flask', 'Django', 'JavaScript', 'React', 'Vue', 'Node.js', 'SQL',
+         'PostgreSQL', 'MySQL', 'SQLite', 'Docker', 'Linux', 'Git', 'Ruby on Rails', 'HTML',
+         'CSS', 'Tailwind', 'Bootstrap', 'WordPress', 'APIs REST', 'pruebas unitarias',
+         'algoritmos', 'estructuras de datos', 'seguridad web', 'despliegue en la nube']
+TITULOS = ['Tutorial de {tema} desde cero', 'Curso de {tema}: {parte}', '{tema} para principiantes',
+           'Cómo usar {tema} en un proyecto real', '{tema} avanzado: {parte}',
+           '10 errores comunes con {tema}', '{tema} en 15 minutos', 'Proyecto completo con {tema}']
+PARTES = ['instalación', 'primeros pasos', 'rutas y vistas', 'formularios', 'base de datos',
+          'autenticación', 'despliegue', 'rendimiento', 'buenas prácticas', 'depuración']
+FRASES = ['En este video vemos {tema} paso a paso.', 'Ideal si estás empezando con {tema}.',
+          'Incluye ejemplos prácticos y el código fuente.', 'Explicamos {parte} con detalle.',
+          'Al final armamos un pequeño proyecto.', 'Comparamos {tema} con otras alternativas.',
+          'Deja tus preguntas en los comentarios.', 'Parte de la serie sobre {tema}.']
+BASE64 = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+SIGUIENTE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+def id_youtube(numero):
+    """Id de 11 caracteres distinto para cada número."""
+    caracteres = []
+    for _ in range(11):
+        numero, resto = divmod(numero, 64)
+        caracteres.append(BASE64[resto])
+    return ''.join(reversed(caracteres))
+
+
+def titulo(rng):
+    return rng.choice(TITULOS).format(tema=rng.choice(TEMAS), parte=rng.choice(PARTES))
+
+
+def descripcion(rng):
+    tema, parte = rng.choice(TEMAS), rng.choice(PARTES)
+    return ' '.join(rng.choice(FRASES).format(tema=tema, parte=parte)
+                    for _ in range(rng.randint(2, 5)))
+
+
+def sembrar(ruta, usuarios, videos, semilla, lote=20000):
+    """
+    Crea la base en `ruta` con las tablas del modelo, `usuarios` usuarios y
+    `videos` videos, con INSERT por lotes (sin los eventos del ORM) y el
+    índice de búsqueda reconstruido al final.
+    """
+    os.environ['DATABASE_URI'] = 'sqlite:///' + ruta
+    os.environ.setdefault('SHEETS_HILO', 'False')
+    sys.path.insert(0, RAIZ)
+    from werkzeug.security import generate_password_hash
+
+    from app import create_app
+    from extensiones import db
+    from models import User, Video, motor_busqueda
+
+    rng = random.Random(semilla)
+    app = create_app(CONTRASENA_PROCESOS=0)
+    with app.app_context():
+        db.create_all()
+        # Un solo hash para todos: calcular miles cuesta minutos
+        password_hash = generate_password_hash(CONTRASENA)
+        db.session.execute(User.__table__.insert(), [
+            {'username': f'usuario{i}', 'password_hash': password_hash,
+             'name': f'Usuario {i}'} for i in range(1, usuarios + 1)])
+        db.session.commit()
+
+        inicio = datetime(2022, 1, 1)
+        rango = int((datetime(2025, 1, 1) - inicio).total_seconds())
+        for desde in range(0, videos, lote):
+            filas = []
+            for i in range(desde, min(desde + lote, videos)):
+                video_id = id_youtube(i)
+                fecha = inicio + timedelta(seconds=rng.randrange(rango))
+                filas.append({
+                    'title': titulo(rng), 'description': descripcion(rng),
+                    'youtube_url': f'https://www.youtube.com/watch?v={video_id}',
+                    'video_id': video_id, 'embed_url': f'https://www.youtube.com/embed/{video_id}',
+                    'fecha_creacion': fecha, 'fecha_actualizacion': fecha,
+                    'user_id': rng.randint(1, usuarios)})
+            db.session.execute(Video.__table__.insert(), filas)
+            db.session.commit()
+            print(f'\r{min(desde + lote, videos)}/{videos} videos', end='', file=sys.stderr)
+        print(file=sys.stderr)
+
+        with db.engine.begin() as conexion:
+            motor = motor_busqueda(db.engine)
+            motor.preparar(conexion)
+            motor.reconstruir(conexion)
+            conexion.exec_driver_sql('ANALYZE')
+        db.engine.dispose()
+
+
+def base_sembrada(usuarios, videos, semilla, resembrar=False):
+    """Ruta de la base sembrada en build/carga/, creándola si hace falta."""
+    with open(os.path.join(RAIZ, 'models.py'), 'rb') as archivo:
+        esquema = hashlib.sha1(archivo.read()).hexdigest()[:8]
+    ruta = os.path.join(CACHE, f'carga-{usuarios}u-{videos}v-s{semilla}-{esquema}.db')
+    if resembrar or not os.path.exists(ruta):
+        os.makedirs(CACHE, exist_ok=True)
+        temporal = ruta + '.sembrando'
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        inicio = time.perf_counter()
+        # En otro proceso: la configuración se lee de DATABASE_URI al importar
+        subprocess.run([sys.executable, __file__, '--sembrar-en', temporal,
+                        '--usuarios', str(usuarios), '--videos', str(videos),
+                        '--semilla', str(semilla)], check=True)
+        os.replace(temporal, ruta)
+        print(f'Base sembrada en {time.perf_counter() - inicio:.0f} s: {ruta}')
+    return ruta
+
+
+class SinRedireccion(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *argumentos):
+        return None
+
+
+class UsuarioVirtual:
+    """Un navegador con sus cookies que anota cada petición que hace."""
+
+    def __init__(self, base, numero, usuarios, semilla, registros):
+        self.base = base
+        self.rng = random.Random(semilla * 1000 + numero)
+        self.usuario = f'usuario{self.rng.randint(1, usuarios)}'
+        self.numero = numero
+        self.subidos = 0
+        self.con_sesion = False
+        self.registros = registros
+        self.abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), SinRedireccion)
+
+    def pedir(self, nombre, ruta, datos=None, esperados=(200,)):
+        """
+        Hace la petición y la anota como (nombre, inicio, segundos, correcta).
+
+        Devuelve:
+            La respuesta (con .status y .headers) o None si no hubo respuesta.
+        """
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos is not None else None
+        inicio = time.perf_counter()
+        respuesta = None
+        try:
+            with self.abridor.open(self.base + ruta, cuerpo, timeout=60) as respuesta:
+                respuesta.read()
+        except urllib.error.HTTPError as error:
+            # Las redirecciones y los errores llegan como excepción; se cierran
+            # para no dejar la conexión abierta
+            with error:
+                error.read()
+            respuesta = error
+        except OSError:
+            pass
+        duracion = time.perf_counter() - inicio
+        correcta = respuesta is not None and respuesta.status in esperados
+        self.registros.append((nombre, inicio, duracion, correcta))
+        return respuesta
+
+    # --- Escenarios ---
+
+    def navegar(self):
+        ruta = '/index'
+        for pagina in range(self.rng.randint(1, 3)):
+            respuesta = self.pedir('GET /index' if pagina == 0 else 'GET /index (siguiente)', ruta)
+            siguiente = SIGUIENTE.search(respuesta.headers.get('Link', '')) if respuesta else None
+            if not siguiente:
+                break
+            partes = urllib.parse.urlsplit(siguiente.group(1))
+            ruta = f'{partes.path}?{partes.query}'
+
+    def blog(self):
+        self.pedir('GET /blog', '/blog')
+
+    def buscar(self):
+        palabras = self.rng.sample(TEMAS + PARTES, self.rng.randint(1, 2))
+        consulta = urllib.parse.urlencode({'query': ' '.join(palabras)})
+        self.pedir('GET /search', f'/search?{consulta}')
+
+    def login(self):
+        respuesta = self.pedir('POST /login', '/login',
+                               {'username': self.usuario, 'password': CONTRASENA}, esperados=(302,))
+        self.con_sesion = respuesta is not None and respuesta.status == 302
+        if self.con_sesion:
+            self.pedir('GET /mis_videos', '/mis_videos')
+
+    def subir(self):
+        if not self.con_sesion:
+            self.login()
+            if not self.con_sesion:
+                return
+        self.subidos += 1
+        # Ids fuera del rango de los sembrados: no choca con la restricción única
+        video_id = id_youtube(2 ** 60 + self.numero * 10 ** 6 + self.subidos)
+        self.pedir('POST /upload', '/upload', {
+            'title': titulo(self.rng), 'description': descripcion(self.rng),
+            'url': f'https://www.youtube.com/watch?v={video_id}'}, esperados=(302,))
+
+
+def ejecutar(base, mezcla, virtuales, duracion, usuarios, semilla, pausa):
+    """Corre los usuarios virtuales durante `duracion` segundos y devuelve lo anotado."""
+    escenarios, pesos = zip(*mezcla.items())
+    fin = time.perf_counter() + duracion
+    registros = []
+
+    def correr(numero):
+        virtual = UsuarioVirtual(base, numero, usuarios, semilla, registros)
+        while time.perf_counter() < fin:
+            getattr(virtual, virtual.rng.choices(escenarios, pesos)[0])()
+            if pausa:
+                time.sleep(virtual.rng.expovariate(1 / pausa))
+
+    hilos = [threading.Thread(target=correr, args=(numero,)) for numero in range(virtuales)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return registros
+
+
+def percentil(ordenados, fraccion):
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not ordenados:
+        return float('nan')
+    return ordenados[max(0, min(len(ordenados) - 1, int(round(fraccion * len(ordenados))) - 1))]
+
+
+def resumir(registros, desde, segundos):
+    """Latencias (ms), throughput y errores por ruta y en total."""
+    grupos = {}
+    for nombre, inicio, duracion, correcta in registros:
+        if inicio >= desde:
+            grupos.setdefault(nombre, []).append((duracion, correcta))
+    grupos['TOTAL'] = [medida for nombre in list(grupos) for medida in grupos[nombre]]
+    resumen = {}
+    for nombre, medidas in grupos.items():
+        tiempos = sorted(duracion * 1000 for duracion, _ in medidas)
+        errores = sum(1 for _, correcta in medidas if not correcta)
+        resumen[nombre] = {
+            'peticiones': len(medidas),
+            'errores': errores,
+            'tasa_error': errores / len(medidas) if medidas else 0.0,
+            'por_segundo': len(medidas) / segundos,
+            'p50': percentil(tiempos, 0.50),
+            'p95': percentil(tiempos, 0.95),
+            'p99': percentil(tiempos, 0.99),
+        }
+    return resumen
+
+
+def imprimir(rutas):
+    print(f'{"ruta":<24}{"pet.":>8}{"pet./s":>9}{"errores":>9}'
+          f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+    for nombre, r in sorted(rutas.items(), key=lambda item: item[0] == 'TOTAL'):
+        print(f'{nombre:<24}{r["peticiones"]:>8}{r["por_segundo"]:>9.1f}'
+              f'{r["tasa_error"]:>8.1%}{r["p50"]:>9.1f}{r["p95"]:>9.1f}{r["p99"]:>9.1f}')
+
+
+def comparar(rutas, anterior, tolerancia):
+    """Imprime la diferencia con un informe anterior y devuelve las rutas que empeoraron."""
+    print(f'\nContra {anterior.get("commit", "?")[:10]} ({anterior.get("fecha", "?")}):')
+    print(f'{"ruta":<24}{"p95 antes":>11}{"p95 ahora":>11}{"cambio":>9}{"errores":>16}')
+    peores = []
+    for nombre, r in sorted(rutas.items(), key=lambda item: item[0] == 'TOTAL'):
+        antes = anterior['rutas'].get(nombre)
+        if antes is None:
+            continue
+        cambio = (r['p95'] - antes['p95']) / antes['p95'] * 100 if antes['p95'] else 0.0
+        print(f'{nombre:<24}{antes["p95"]:>11.1f}{r["p95"]:>11.1f}{cambio:>+8.0f}%'
+              f'{antes["tasa_error"]:>8.1%}{r["tasa_error"]:>8.1%}')
+        if cambio > tolerancia or r['tasa_error'] - antes['tasa_error'] > 0.01:
+            peores.append(nombre)
+    return peores
+
+
+def commit_actual():
+    resultado = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=RAIZ, capture_output=True, text=True)
+    return resultado.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--videos', type=int, default=100000)
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--resembrar', action='store_true', help='Volver a crear la base sembrada.')
+    parser.add_argument('--virtuales', type=int, default=16, help='Usuarios virtuales concurrentes.')
+    parser.add_argument('--duracion', type=float, default=60, help='Segundos medidos.')
+    parser.add_argument('--calentamiento', type=float, default=5)
+    parser.add_argument('--pausa', type=float, default=0,
+                        help='Segundos promedio entre escenarios de cada usuario virtual.')
+    parser.add_argument('--mezcla', default=MEZCLA)
+    parser.add_argument('--trabajadores', type=int, default=None, help='GUNICORN_WORKERS')
+    parser.add_argument('--hilos', type=int, default=None, help='GUNICORN_THREADS')
+    parser.add_argument('--puerto', type=int, default=5121)
+    parser.add_argument('--salida', help='Guardar el informe en este JSON.')
+    parser.add_argument('--comparar', help='Informe JSON anterior para comparar.')
+    parser.add_argument('--tolerancia', type=float, default=10, help='% de empeoramiento del p95.')
+    parser.add_argument('--sembrar-en', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.sembrar_en:
+        sembrar(args.sembrar_en, args.usuarios, args.videos, args.semilla)
+        return
+
+    mezcla = {nombre: float(peso) for nombre, peso in
+              (parte.split('=') for parte in args.mezcla.split(','))}
+    desconocidos = set(mezcla) - {'navegar', 'blog', 'buscar', 'login', 'subir'}
+    if desconocidos:
+        parser.error(f'Escenarios desconocidos: {", ".join(sorted(desconocidos))}')
+
+    sembrada = base_sembrada(args.usuarios, args.videos, args.semilla, args.resembrar)
+    directorio = tempfile.mkdtemp()
+    copia = os.path.join(directorio, 'carga.db')
+    shutil.copyfile(sembrada, copia)
+
+    entorno = dict(os.environ, DATABASE_URI='sqlite:///' + copia, SHEETS_HILO='False')
+    if args.trabajadores:
+        entorno['GUNICORN_WORKERS'] = str(args.trabajadores)
+    if args.hilos:
+        entorno['GUNICORN_THREADS'] = str(args.hilos)
+    comando = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+               '--bind', f'127.0.0.1:{args.puerto}', 'wsgi:app']
+    servidor = subprocess.Popen(comando, cwd=RAIZ, env=entorno,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{args.puerto}'
+        esperar(base + '/index', segundos=60)
+        inicio = time.perf_counter()
+        registros = ejecutar(base, mezcla, args.virtuales, args.calentamiento + args.duracion,
+                             args.usuarios, args.semilla, args.pausa)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    rutas = resumir(registros, inicio + args.calentamiento, args.duracion)
+    informe = {
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {clave: valor for clave, valor in vars(args).items()
+                       if clave not in ('salida', 'comparar', 'tolerancia', 'sembrar_en', 'resembrar')},
+        'rutas': rutas,
+    }
+    imprimir(rutas)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+        if anterior.get('parametros', {}) != informe['parametros']:
+            print('\nAviso: el informe anterior se hizo con otros parámetros.')
+        peores = comparar(rutas, anterior, args.tolerancia)
+        if peores:
+            print(f'\nEmpeoraron: {", ".join(peores)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Compara el rendimiento del servidor de desarrollo (python app.py) con
+gunicorn en las rutas de listados.
+
+Uso:
+    python benchmarks/comparar_servidores.py --peticiones 500 --concurrencia 16
+
+Crea una base de datos temporal con videos de prueba, levanta cada
+servidor en un puerto local y mide peticiones por segundo.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTAS = ['/index', '/blog', '/index?orden=asc']
+
+
+def sembrar(database_uri, videos):
+    codigo = f'''
+from app import create_app
+from extensiones import db
+from models import User, Video
+with create_app().app_context():
+    db.create_all()
+    autor = User(username='benchmark')
+    autor.set_password('benchmark')
+    db.session.add(autor)
+    db.session.commit()
+    db.session.add_all(Video(title=f'Video de prueba {{i}}', description='Descripción de prueba',
+                             youtube_url=f'https://www.youtube.com/watch?v={{i:011d}}',
+                             video_id=f'{{i:011d}}', user_id=autor.id) for i in range({videos}))
+    db.session.commit()
+'''
+    subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True,
+                   env=dict(os.environ, DATABASE_URI=database_uri))
+
+
+def esperar(url, segundos=20):
+    limite = time.time() + segundos
+    while time.time() < limite:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'El servidor no respondió en {url}')
+
+
+def medir(base, peticiones, concurrencia):
+    def pedir(i):
+        inicio = time.perf_counter()
+        with urllib.request.urlopen(base + RUTAS[i % len(RUTAS)], timeout=30) as respuesta:
+            respuesta.read()
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concurrencia) as pool:
+        tiempos = sorted(pool.map(pedir, range(peticiones)))
+    total = time.perf_counter() - inicio
+    return peticiones / total, tiempos[len(tiempos) // 2], tiempos[int(len(tiempos) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--peticiones', type=int, default=500)
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--videos', type=int, default=2000)
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    database_uri = 'sqlite:///' + os.path.join(directorio, 'benchmark.db')
+    sembrar(database_uri, args.videos)
+    entorno = dict(os.environ, DATABASE_URI=database_uri)
+
+    servidores = {
+        # Igual que python app.py (debug=True) pero sin el recargador
+        'desarrollo (app.py)': ([sys.executable, '-c',
+                                 "from app import create_app; create_app().run(port=5101, debug=True, use_reloader=False)"],
+                                5101, {}),
+        'gunicorn': ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                      '--bind', '127.0.0.1:5102', 'wsgi:app'], 5102, {}),
+        'gunicorn 1 proceso': ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                '--bind', '127.0.0.1:5103', 'wsgi:app'], 5103,
+                               {'GUNICORN_WORKERS': '1', 'GUNICORN_THREADS': '8'}),
+    }
+    print(f'{"servidor":<22}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}')
+    for nombre, (comando, puerto, extra) in servidores.items():
+        proceso = subprocess.Popen(comando, cwd=RAIZ, env=dict(entorno, **extra),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f'http://127.0.0.1:{puerto}'
+            esperar(base + RUTAS[0])
+            rps, p50, p95 = medir(base, args.peticiones, args.concurrencia)
+            print(f'{nombre:<22}{rps:>10.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}')
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Mide inicios de sesión por segundo y cuánto frenan al resto de las rutas,
+con el hash de contraseñas en la petición y en procesos aparte.
+
+Uso:
+    python benchmarks/contrasenas.py --segundos 10 --concurrencia 8
+
+Levanta gunicorn (un proceso, varios hilos) sobre una base temporal y,
+durante el mismo tiempo, manda una ráfaga de POST /login (quien recibe
+503 espera lo que indica Retry-After) y pide /index a un ritmo fijo.
+Informa logins/s, cuántos recibieron 503 y la latencia de /index
+mientras tanto, con CONTRASENA_PROCESOS=0 (hash en el hilo de la
+petición) y con el valor configurado.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from comparar_servidores import RAIZ, esperar, sembrar
+
+DATOS_LOGIN = urllib.parse.urlencode({'username': 'benchmark', 'password': 'benchmark'}).encode()
+
+
+class SinRedireccion(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *argumentos):
+        return None
+
+
+def percentil(tiempos, fraccion):
+    return tiempos[min(len(tiempos) - 1, int(len(tiempos) * fraccion))] if tiempos else float('nan')
+
+
+def medir(base, segundos, concurrencia):
+    abridor = urllib.request.build_opener(SinRedireccion)
+    fin = time.perf_counter() + segundos
+    estados = {}
+    lock = threading.Lock()
+
+    def iniciar_sesiones():
+        while time.perf_counter() < fin:
+            espera = 0
+            try:
+                estado = abridor.open(base + '/login', DATOS_LOGIN, timeout=60).status
+            except urllib.error.HTTPError as error:
+                estado = error.code
+                # Como un cliente que respeta Retry-After
+                espera = float(error.headers.get('Retry-After') or 0)
+            with lock:
+                estados[estado] = estados.get(estado, 0) + 1
+            time.sleep(espera)
+
+    latencias = []
+
+    def pedir_listado():
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            with urllib.request.urlopen(base + '/index', timeout=60) as respuesta:
+                respuesta.read()
+            latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.05)
+
+    hilos = [threading.Thread(target=iniciar_sesiones) for _ in range(concurrencia)]
+    hilos.append(threading.Thread(target=pedir_listado))
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    # Un login correcto redirige a /index
+    return {
+        'logins_s': estados.get(302, 0) / total,
+        'rechazados': estados.get(503, 0),
+        'otros': sum(v for k, v in estados.items() if k not in (302, 503)),
+        'p50': percentil(latencias, 0.5) * 1000,
+        'p95': percentil(latencias, 0.95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--hilos', type=int, default=8, help='GUNICORN_THREADS')
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    database_uri = 'sqlite:///' + os.path.join(directorio, 'benchmark.db')
+    sembrar(database_uri, 200)
+    entorno = dict(os.environ, DATABASE_URI=database_uri, SHEETS_HILO='False',
+                   GUNICORN_WORKERS='1', GUNICORN_THREADS=str(args.hilos))
+
+    modos = {
+        'en la petición': {'CONTRASENA_PROCESOS': '0'},
+        'procesos aparte': {},
+    }
+    print(f'{"hash":<18}{"logins/s":>10}{"503":>7}{"otros":>7}'
+          f'{"/index p50":>12}{"/index p95":>12}')
+    for puerto, (nombre, extra) in enumerate(modos.items(), start=5111):
+        comando = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                   '--bind', f'127.0.0.1:{puerto}', 'wsgi:app']
+        proceso = subprocess.Popen(comando, cwd=RAIZ, env=dict(entorno, **extra),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f'http://127.0.0.1:{puerto}'
+            esperar(base + '/index')
+            r = medir(base, args.segundos, args.concurrencia)
+            print(f'{nombre:<18}{r["logins_s"]:>10.1f}{r["rechazados"]:>7}{r["otros"]:>7}'
+                  f'{r["p50"]:>9.0f} ms{r["p95"]:>9.0f} ms')
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Compara lo que bloquea el primer pintado de las páginas con los CDN de
+siempre y con los paquetes propios (ESTATICOS_BUNDLE).
+
+Uso:
+    python benchmarks/frontend.py --presupuesto-ms 2500
+
+Construye los estáticos (incremental, en build/static), pide cada página a
+la aplicación en los dos modos y, a partir de las etiquetas <link> y
+<script> del HTML, cuenta los recursos que bloquean el pintado, los
+orígenes externos y los bytes transferidos (con brotli/gzip). Con eso
+estima el First Contentful Paint como el modelo simulado de Lighthouse
+(móvil: RTT 150 ms, 1,6 Mbps): cada origen nuevo cuesta DNS + TCP + TLS
+y lo que bloquea se descarga compartiendo el ancho de banda.
+
+Si un CDN no responde se usa el tamaño de la copia de static/vendor de la
+misma versión; los que no tienen copia (jQuery, Tailwind, Font Awesome
+completo) se cuentan sin bytes y la estimación queda marcada con >=.
+Termina con código 1 si en modo paquete alguna página supera el presupuesto.
+"""
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTAS = ['/', '/index', '/login', '/cursos']
+RTT_MS = 150
+KBPS = 1638.4
+# Si el CDN no responde se usa el tamaño de la misma versión ya copiada en static/vendor
+EQUIVALENTES = {
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css':
+        ['vendor/bootstrap.min.css'],
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js':
+        ['vendor/popper.min.js', 'vendor/bootstrap.min.js'],
+}
+
+
+class Recursos(HTMLParser):
+    """Junta los CSS y JS externos de una página y si bloquean el pintado."""
+
+    def __init__(self):
+        super().__init__()
+        self.en_head = False
+        self.recursos = []
+        self.css_en_linea = 0
+        self._en_style = False
+        # Lo de <noscript> solo se pide sin JavaScript
+        self._en_noscript = False
+
+    def handle_starttag(self, etiqueta, atributos):
+        atributos = dict(atributos)
+        if etiqueta == 'noscript':
+            self._en_noscript = True
+        elif self._en_noscript:
+            return
+        elif etiqueta == 'head':
+            self.en_head = True
+        elif etiqueta == 'body':
+            self.en_head = False
+        elif etiqueta == 'style':
+            self._en_style = True
+        elif etiqueta == 'link' and atributos.get('href'):
+            rel = atributos.get('rel', '')
+            if rel == 'stylesheet':
+                self.recursos.append(('css', atributos['href'], atributos.get('media') != 'print'))
+            elif rel == 'preload' and atributos.get('as') == 'style':
+                self.recursos.append(('css', atributos['href'], False))
+        elif etiqueta == 'script' and atributos.get('src'):
+            diferido = 'defer' in atributos or 'async' in atributos
+            self.recursos.append(('js', atributos['src'], self.en_head and not diferido))
+
+    def handle_endtag(self, etiqueta):
+        if etiqueta == 'style':
+            self._en_style = False
+        elif etiqueta == 'noscript':
+            self._en_noscript = False
+
+    def handle_data(self, datos):
+        if self._en_style:
+            self.css_en_linea += len(datos.encode())
+
+
+def preparar_app(bundle, destino):
+    os.environ.setdefault('SHEETS_HILO', 'False')
+    sys.path.insert(0, RAIZ)
+    os.chdir(RAIZ)
+
+    from app import create_app
+    from extensiones import db
+
+    app = create_app(ESTATICOS_BUNDLE=bundle, ESTATICOS_DIR=destino, CACHE_RESPUESTAS=False)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def bytes_transferidos(cliente, url, externos):
+    """Bytes que viajan por la red (comprimidos) o None si no se pudo pedir."""
+    if url.startswith('/') and not url.startswith('//'):
+        return len(cliente.get(url, headers={'Accept-Encoding': 'br, gzip'}).data)
+    if url not in externos:
+        peticion = urllib.request.Request(url, headers={'Accept-Encoding': 'br, gzip'})
+        try:
+            with urllib.request.urlopen(peticion, timeout=5) as respuesta:
+                externos[url] = len(respuesta.read())
+        except OSError:
+            externos[url] = equivalente(url)
+    return externos[url]
+
+
+def equivalente(url):
+    """Tamaño con brotli (como lo sirve jsdelivr) de la copia local, o None."""
+    if url not in EQUIVALENTES:
+        return None
+    import brotli
+    contenido = b''
+    for nombre in EQUIVALENTES[url]:
+        with open(os.path.join(RAIZ, 'static', nombre), 'rb') as archivo:
+            contenido += archivo.read()
+    return len(brotli.compress(contenido))
+
+
+def medir(cliente, ruta, externos):
+    html = cliente.get(ruta).data
+    parser = Recursos()
+    parser.feed(html.decode('utf-8'))
+    # El HTML sale comprimido por el proxy de producción
+    bytes_html = len(gzip.compress(html))
+
+    bloqueantes, diferidos, origenes, desconocidos = 0, 0, set(), 0
+    for _, url, bloquea in parser.recursos:
+        tamano = bytes_transferidos(cliente, url, externos)
+        if tamano is None:
+            desconocidos += 1
+            tamano = 0
+        origen = urlsplit(url).netloc
+        if bloquea:
+            bloqueantes += tamano
+            if origen:
+                origenes.add(origen)
+        else:
+            diferidos += tamano
+
+    def transferir(cantidad):
+        return cantidad * 8 / KBPS
+
+    # Conexión a la página + petición del HTML
+    fcp = 3 * RTT_MS + RTT_MS + transferir(bytes_html)
+    if any(bloquea for _, _, bloquea in parser.recursos):
+        fcp += (3 * RTT_MS if origenes else 0) + RTT_MS + transferir(bloqueantes)
+    return {
+        'bloqueantes': sum(1 for _, _, bloquea in parser.recursos if bloquea),
+        'origenes': len(origenes),
+        'kb_html': bytes_html / 1024,
+        'kb_en_linea': parser.css_en_linea / 1024,
+        'kb_bloqueantes': bloqueantes / 1024,
+        'kb_diferidos': diferidos / 1024,
+        'desconocidos': desconocidos,
+        'fcp_ms': fcp,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--destino', default=os.path.join(RAIZ, 'build', 'static'))
+    parser.add_argument('--presupuesto-ms', type=float, default=2500)
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directorio, 'frontend.db')
+    sys.path.insert(0, RAIZ)
+    from utils_estaticos import construir
+    manifiesto = construir(os.path.join(RAIZ, 'static'), args.destino)
+    if 'bundle.css' not in manifiesto:
+        sys.exit('Faltan los paquetes: corre primero `flask estaticos vendorizar`.')
+
+    externos = {}
+    resultados = {}
+    for modo, bundle in (('cdn', False), ('paquete', True)):
+        cliente = preparar_app(bundle, args.destino).test_client()
+        resultados[modo] = {ruta: medir(cliente, ruta, externos) for ruta in RUTAS}
+
+    print(f'{"ruta":<10}{"modo":<9}{"bloq.":>6}{"orígenes":>9}{"KB html":>9}'
+          f'{"KB línea":>9}{"KB bloq.":>9}{"KB dif.":>9}{"FCP est.":>12}')
+    excedidos = []
+    for ruta in RUTAS:
+        for modo, paginas in resultados.items():
+            r = paginas[ruta]
+            cota = '>=' if r['desconocidos'] else ''
+            print(f'{ruta:<10}{modo:<9}{r["bloqueantes"]:>6}{r["origenes"]:>9}'
+                  f'{r["kb_html"]:>9.1f}{r["kb_en_linea"]:>9.1f}{r["kb_bloqueantes"]:>9.1f}'
+                  f'{r["kb_diferidos"]:>9.1f}{cota:>4}{r["fcp_ms"]:>6.0f} ms')
+            if modo == 'paquete' and r['fcp_ms'] > args.presupuesto_ms:
+                excedidos.append(ruta)
+    if any(r['desconocidos'] for paginas in resultados.values() for r in paginas.values()):
+        print('\n>= : algún CDN no respondió; sus bytes no se cuentan.')
+    if excedidos:
+        print(f'\nSuperan {args.presupuesto_ms:.0f} ms en modo paquete: {", ".join(excedidos)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
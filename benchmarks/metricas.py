@@ -0,0 +1,95 @@
+"""
+Mide cuánto cuesta por petición la instrumentación de utils_metricas.
+
+Uso:
+    python benchmarks/metricas.py --peticiones 300 --presupuesto-ms 0.5
+
+Pide las mismas rutas con METRICAS=False, con METRICAS=True y con la
+cabecera Server-Timing, cada modo en un proceso aparte (los eventos de
+SQLAlchemy son globales y no se pueden desconectar a mitad de camino).
+La base es temporal y la caché de respuestas está apagada para que cada
+petición haga su trabajo completo. Termina con código 1 si la diferencia
+de medianas entre METRICAS=True y METRICAS=False supera el presupuesto.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTAS = ['/index', '/api/v1/videos', '/login']
+MODOS = {
+    'apagadas': {'METRICAS': 'False'},
+    'encendidas': {'METRICAS': 'True', 'METRICAS_SERVER_TIMING': 'False'},
+    'server-timing': {'METRICAS': 'True', 'METRICAS_SERVER_TIMING': 'True'},
+}
+CODIGO = '''
+import json, sys, time
+from app import create_app
+from extensiones import db
+from models import User, Video
+
+app = create_app(CACHE_RESPUESTAS=False)
+with app.app_context():
+    db.create_all()
+    autor = User(username='benchmark')
+    autor.set_password('benchmark')
+    db.session.add(autor)
+    db.session.commit()
+    db.session.add_all(Video(title=f'Video de prueba {i}', description='Descripción de prueba',
+                             youtube_url=f'https://www.youtube.com/watch?v={i:011d}',
+                             video_id=f'{i:011d}', user_id=autor.id) for i in range(200))
+    db.session.commit()
+cliente = app.test_client()
+rutas, peticiones = json.loads(sys.argv[1]), int(sys.argv[2])
+resultados = {}
+for ruta in rutas:
+    for _ in range(20):
+        cliente.get(ruta)
+    tiempos = []
+    for _ in range(peticiones):
+        inicio = time.perf_counter()
+        cliente.get(ruta)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    resultados[ruta] = tiempos
+print(json.dumps(resultados))
+'''
+
+
+def medir(entorno, peticiones):
+    directorio = tempfile.mkdtemp()
+    entorno = dict(os.environ, SHEETS_HILO='False',
+                   DATABASE_URI='sqlite:///' + os.path.join(directorio, 'metricas.db'), **entorno)
+    resultado = subprocess.run([sys.executable, '-c', CODIGO, json.dumps(RUTAS), str(peticiones)],
+                               cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True)
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--peticiones', type=int, default=300)
+    parser.add_argument('--presupuesto-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    medianas = {modo: {ruta: statistics.median(tiempos)
+                       for ruta, tiempos in medir(entorno, args.peticiones).items()}
+                for modo, entorno in MODOS.items()}
+
+    print(f'{"ruta":<18}' + ''.join(f'{modo:>15}' for modo in MODOS) + f'{"diferencia":>13}')
+    excedidas = []
+    for ruta in RUTAS:
+        diferencia = medianas['encendidas'][ruta] - medianas['apagadas'][ruta]
+        print(f'{ruta:<18}' + ''.join(f'{medianas[modo][ruta]:>12.2f} ms' for modo in MODOS)
+              + f'{diferencia:>10.3f} ms')
+        if diferencia > args.presupuesto_ms:
+            excedidas.append(ruta)
+    if excedidas:
+        print(f'\nLas métricas cuestan más de {args.presupuesto_ms} ms en: {", ".join(excedidas)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Verifica con EXPLAIN QUERY PLAN que los listados de videos usan un índice
+en vez de recorrer la tabla completa.
+
+Uso:
+    python benchmarks/planes_consulta.py --videos 2000
+
+Crea una base SQLite temporal con las tablas del modelo, recorre cada
+listado (primera página y página siguiente, en ambos órdenes), captura las
+consultas sobre la tabla video y termina con código 1 si alguna hace un
+SCAN sin índice o necesita ordenar en memoria (USE TEMP B-TREE).
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTAS = ['/index', '/blog', '/mis_videos', '/search?query=video',
+         '/api/v1/videos', '/api/v1/videos/changes?limite=50']
+# La tabla video, no el índice de texto completo video_fts
+DESDE_VIDEO = re.compile(r'\bFROM video\b(?!_)')
+
+
+def preparar_app(cantidad):
+    directorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directorio, 'planes.db')
+    os.environ.setdefault('SHEETS_HILO', 'False')
+    sys.path.insert(0, RAIZ)
+    os.chdir(RAIZ)
+
+    from app import create_app
+    from extensiones import db
+    from models import User, Video
+
+    app = create_app(CACHE_RESPUESTAS=False, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        usuarios = []
+        for i in range(3):
+            usuario = User(username=f'usuario{i}')
+            usuario.set_password('clave')
+            db.session.add(usuario)
+            usuarios.append(usuario)
+        db.session.commit()
+        inicio = datetime(2024, 1, 1)
+        for i in range(cantidad):
+            db.session.add(Video(
+                title=f'Video {i}', description=f'Descripción del video {i}',
+                youtube_url=f'https://youtu.be/v{i:010d}', video_id=f'v{i:010d}',
+                user_id=usuarios[i % 3].id, fecha_creacion=inicio + timedelta(minutes=i)))
+        db.session.commit()
+        # Sin estadísticas el planificador de SQLite puede elegir otro plan
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+    return app, db
+
+
+def capturar_consultas(app, db):
+    """
+    Recorre los listados y devuelve las consultas SELECT sobre video con
+    sus parámetros, sin repetir la misma sentencia.
+    """
+    from sqlalchemy import event
+
+    consultas = {}
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencia = statement.lstrip()
+        if sentencia.upper().startswith('SELECT') and DESDE_VIDEO.search(sentencia):
+            consultas.setdefault(sentencia, parameters)
+
+    with app.app_context():
+        motor = db.engine
+    cliente = app.test_client()
+    cliente.post('/login', data={'username': 'usuario0', 'password': 'clave'})
+    # Cada petición empuja su propio contexto, como en producción
+    event.listen(motor, 'before_cursor_execute', registrar)
+    try:
+        for ruta in RUTAS:
+            for orden in ('desc', 'asc'):
+                separador = '&' if '?' in ruta else '?'
+                url = f'{ruta}{separador}orden={orden}'
+                respuesta = cliente.get(url)
+                if respuesta.status_code != 200:
+                    raise SystemExit(f'{url} respondió {respuesta.status_code}')
+                siguiente = respuesta.headers.get('Link', '')
+                if 'rel="next"' in siguiente:
+                    url = siguiente.split('>')[0].lstrip('<')
+                    cliente.get(url)
+    finally:
+        event.remove(motor, 'before_cursor_execute', registrar)
+    return consultas
+
+
+def problemas_del_plan(sentencia, filas):
+    """
+    Devuelve las líneas del plan que indican un recorrido completo de video
+    o un ordenamiento en memoria. Recorrer video por su clave primaria sin
+    ningún filtro es aceptable: el LIMIT corta en cuanto tiene la página.
+    """
+    filtrada = ' WHERE ' in sentencia.upper()
+    problemas = []
+    for fila in filas:
+        detalle = fila[-1]
+        if 'USE TEMP B-TREE FOR ORDER BY' in detalle:
+            problemas.append(detalle)
+        elif detalle.startswith('SCAN video') and 'INDEX' not in detalle and filtrada:
+            problemas.append(detalle)
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=2000)
+    parser.add_argument('--verbose', action='store_true', help='Muestra todos los planes.')
+    args = parser.parse_args()
+
+    app, db = preparar_app(args.videos)
+    consultas = capturar_consultas(app, db)
+    fallos = 0
+    with app.app_context():
+        conexion = db.engine.raw_connection()
+        try:
+            for sentencia, parametros in consultas.items():
+                filas = conexion.execute('EXPLAIN QUERY PLAN ' + sentencia, parametros).fetchall()
+                problemas = problemas_del_plan(sentencia, filas)
+                if problemas or args.verbose:
+                    print(' '.join(sentencia.split())[:160])
+                    for fila in filas:
+                        print('   ', fila[-1])
+                if problemas:
+                    fallos += 1
+                    print('    -> sin índice:', '; '.join(problemas), '\n')
+        finally:
+            conexion.close()
+
+    print(f'{len(consultas)} consultas revisadas, {fallos} sin índice.')
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
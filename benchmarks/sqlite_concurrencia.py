@@ -0,0 +1,163 @@
+"""
+Mide las lecturas por segundo de los listados mientras otros hilos
+escriben videos sin parar, con SQLite tal como viene y con el perfil de
+producción (SQLITE_PERFIL: WAL, synchronous=NORMAL, busy_timeout, ...).
+
+Uso:
+    python benchmarks/sqlite_concurrencia.py --segundos 10 --escritores 2 --ritmo 50 --lectores 4
+
+Cada modo usa su propia base temporal (el modo WAL queda guardado en el
+archivo). Como con gunicorn, los lectores son hilos de un proceso que
+piden /index y /mis_videos, y cada escritor es otro proceso que inserta
+y edita videos en transacciones cortas, como upload_video y edit_video,
+hasta --ritmo escrituras por segundo (el mismo trabajo en los dos modos). Informa lecturas y escrituras por segundo, la latencia de
+las lecturas y cuántas operaciones fallaron con "database is locked".
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODOS = {
+    'por defecto': {'SQLITE_PERFIL': 'False'},
+    'perfil': {'SQLITE_PERFIL': 'True'},
+}
+CODIGO = '''
+import json, sys, threading, time
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from extensiones import db
+from models import User, Video
+
+papel, segundos, cantidad = sys.argv[1], float(sys.argv[2]), int(sys.argv[3])
+app = create_app(CACHE_RESPUESTAS=False, CACHE_USUARIOS=False, CONTRASENA_PROCESOS=0,
+                 PRESUPUESTO_CONSULTAS=100)
+# Los errores de las vistas se cuentan, no se muestran
+app.logger.disabled = True
+
+if papel == 'sembrar':
+    with app.app_context():
+        db.create_all()
+        autor = User(username='benchmark')
+        autor.set_password('benchmark')
+        db.session.add(autor)
+        db.session.commit()
+        db.session.add_all(Video(title=f'Video de prueba {i}', description='Descripción de prueba',
+                                 youtube_url=f'https://www.youtube.com/watch?v={i:011d}',
+                                 video_id=f'{i:011d}', user_id=autor.id) for i in range(2000))
+        db.session.commit()
+    sys.exit()
+
+# Todos los procesos empiezan a la vez (sys.argv[4] es el instante de inicio)
+time.sleep(max(0, float(sys.argv[4]) - time.time()))
+fin = time.perf_counter() + segundos
+resultados = {'lecturas': [], 'escrituras': 0, 'bloqueos': 0}
+lock = threading.Lock()
+
+
+def leer():
+    cliente = app.test_client()
+    cliente.post('/login', data={'username': 'benchmark', 'password': 'benchmark'})
+    rutas = ['/index', '/mis_videos']
+    i = 0
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        respuesta = cliente.get(rutas[i % 2])
+        i += 1
+        with lock:
+            if respuesta.status_code == 200:
+                resultados['lecturas'].append(time.perf_counter() - inicio)
+            else:
+                resultados['bloqueos'] += 1
+
+
+def escribir(ritmo):
+    i = 0
+    while time.perf_counter() < fin:
+        siguiente = time.perf_counter() + 2 / ritmo
+        with app.app_context():
+            try:
+                id_video = f'w{id(threading.current_thread()) % 997:03d}{time.time_ns() % 10**7:07d}{i}'
+                video = Video(title=f'Nuevo {i}', description='x', video_id=id_video,
+                              youtube_url=f'https://www.youtube.com/watch?v={id_video}', user_id=1)
+                db.session.add(video)
+                db.session.commit()
+                video.description = 'editado'
+                db.session.commit()
+                resultados['escrituras'] += 2
+            except OperationalError:
+                db.session.rollback()
+                resultados['bloqueos'] += 1
+        i += 1
+        time.sleep(max(0, siguiente - time.perf_counter()))
+
+
+if papel == 'leer':
+    hilos = [threading.Thread(target=leer) for _ in range(cantidad)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+else:
+    escribir(cantidad)
+print(json.dumps(resultados))
+'''
+
+
+def medir(entorno, segundos, escritores, ritmo, lectores):
+    directorio = tempfile.mkdtemp()
+    entorno = dict(os.environ, SHEETS_HILO='False',
+                   DATABASE_URI='sqlite:///' + os.path.join(directorio, 'concurrencia.db'), **entorno)
+
+    def lanzar(papel, cantidad=1, inicio=0):
+        return subprocess.Popen([sys.executable, '-c', CODIGO, papel, str(segundos), str(cantidad),
+                                 str(inicio)], cwd=RAIZ, env=entorno, text=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def resultado(proceso):
+        salida, errores = proceso.communicate()
+        if proceso.returncode:
+            sys.exit(errores)
+        return json.loads(salida) if salida.strip() else None
+
+    resultado(lanzar('sembrar'))
+    # Como gunicorn: cada escritor es otro proceso; el lector, uno con varios hilos
+    inicio = time.time() + 3
+    procesos = [lanzar('escribir', ritmo, inicio) for _ in range(escritores)]
+    lector = resultado(lanzar('leer', lectores, inicio))
+    escrituras = [resultado(proceso) for proceso in procesos]
+    return {
+        'lecturas': sorted(lector['lecturas']),
+        'escrituras': sum(r['escrituras'] for r in escrituras),
+        'bloqueos_lectura': lector['bloqueos'],
+        'bloqueos_escritura': sum(r['bloqueos'] for r in escrituras),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--ritmo', type=int, default=50,
+                        help='escrituras por segundo de cada escritor como máximo')
+    parser.add_argument('--lectores', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f'{"modo":<14}{"lect./s":>9}{"p50 ms":>9}{"p95 ms":>9}{"escr./s":>9}'
+          f'{"bloqueos lect.":>16}{"bloqueos escr.":>16}')
+    for nombre, entorno in MODOS.items():
+        r = medir(entorno, args.segundos, args.escritores, args.ritmo, args.lectores)
+        lecturas = r['lecturas']
+        p50 = lecturas[len(lecturas) // 2] * 1000 if lecturas else float('nan')
+        p95 = lecturas[int(len(lecturas) * 0.95)] * 1000 if lecturas else float('nan')
+        print(f'{nombre:<14}{len(lecturas) / args.segundos:>9.1f}{p50:>9.1f}{p95:>9.1f}'
+              f'{r["escrituras"] / args.segundos:>9.1f}'
+              f'{r["bloqueos_lectura"]:>16}{r["bloqueos_escritura"]:>16}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+from decouple import Csv, config
+
+
+class Config:
+    """
+    Configuración de la aplicación, leída de variables de entorno o del
+    archivo .env con python-decouple.
+    """
+
+    SECRET_KEY = config('SECRET_KEY')  # Carga la variable SECRET_KEY
+    SQLALCHEMY_DATABASE_URI = config('DATABASE_URI')  # Carga la variable DATABASE_URI
+    UPLOAD_FOLDER = config('UPLOAD_FOLDER')  # Carga la variable UPLOAD_FOLDER
+    UPLOADED_PHOTOS_DEST = config('UPLOADED_PHOTOS_DEST')  # Carga la variable UPLOADED_PHOTOS_DEST
+
+    # Define la lista de extensiones permitidas como una lista
+    ALLOWED_EXTENSIONS = config('ALLOWED_EXTENSIONS').split(',')
+
+    # Imágenes de perfil: tamaño máximo de la petición (413 si se supera),
+    # píxeles máximos y lados de las miniaturas cuadradas
+    MAX_CONTENT_LENGTH = config('MAX_CONTENT_LENGTH', default=5 * 1024 * 1024, cast=int)
+    AVATAR_MAX_PIXELES = config('AVATAR_MAX_PIXELES', default=40_000_000, cast=int)
+    AVATAR_TAMANOS = config('AVATAR_TAMANOS', default='128,512', cast=Csv(int))
+    AVATAR_HILO = config('AVATAR_HILO', default=True, cast=bool)
+
+    # Hash de contraseñas: método de werkzeug ('scrypt:32768:8:1',
+    # 'pbkdf2:sha256:600000', ...), procesos que lo calculan (0 = en la misma
+    # petición), cuántos más pueden esperar antes de responder 503, segundos
+    # de espera y prioridad (nice) de esos procesos
+    CONTRASENA_METODO = config('CONTRASENA_METODO', default='scrypt:32768:8:1')
+    CONTRASENA_PROCESOS = config('CONTRASENA_PROCESOS', default=1, cast=int)
+    CONTRASENA_COLA = config('CONTRASENA_COLA', default=4, cast=int)
+    CONTRASENA_ESPERA = config('CONTRASENA_ESPERA', default=10, cast=int)
+    CONTRASENA_PRIORIDAD = config('CONTRASENA_PRIORIDAD', default=5, cast=int)
+
+    # Réplicas de lectura (URIs separadas por comas) y segundos que un
+    # usuario lee del primario después de escribir
+    DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+    REPLICAS_PAUSA_SEGUNDOS = config('REPLICAS_PAUSA_SEGUNDOS', default=10, cast=int)
+
+    # Perfil de SQLite para producción (solo con DATABASE_URI de SQLite en
+    # un archivo): WAL, PRAGMA por conexión y tamaño del pool de conexiones
+    SQLITE_PERFIL = config('SQLITE_PERFIL', default=True, cast=bool)
+    SQLITE_WAL = config('SQLITE_WAL', default=True, cast=bool)
+    SQLITE_SYNCHRONOUS = config('SQLITE_SYNCHRONOUS', default='NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+    SQLITE_CACHE_MB = config('SQLITE_CACHE_MB', default=16, cast=int)
+    SQLITE_MMAP_MB = config('SQLITE_MMAP_MB', default=64, cast=int)
+    SQLITE_POOL_SIZE = config('SQLITE_POOL_SIZE', default=8, cast=int)
+    SQLITE_POOL_OVERFLOW = config('SQLITE_POOL_OVERFLOW', default=4, cast=int)
+
+    # Paginación de los listados de videos
+    VIDEOS_POR_PAGINA = config('VIDEOS_POR_PAGINA', default=12, cast=int)
+    VIDEOS_POR_PAGINA_MAX = config('VIDEOS_POR_PAGINA_MAX', default=60, cast=int)
+    PAGINACION_LINK_HEADER = config('PAGINACION_LINK_HEADER', default=True, cast=bool)
+
+    # Miniatura con botón de reproducir en lugar de un iframe por video
+    VIDEO_FACADE = config('VIDEO_FACADE', default=True, cast=bool)
+    VIDEO_FACADE_DETALLE = config('VIDEO_FACADE_DETALLE', default=False, cast=bool)
+
+    # Caché de respuestas para las páginas informativas
+    DEPLOY_VERSION = config('DEPLOY_VERSION', default='dev')
+    CACHE_RESPUESTAS = config('CACHE_RESPUESTAS', default=True, cast=bool)
+    CACHE_TTL = config('CACHE_TTL', default=3600, cast=int)
+    CACHE_BACKEND = config('CACHE_BACKEND', default='memoria')
+    CACHE_MAX_ITEMS = config('CACHE_MAX_ITEMS', default=256, cast=int)
+    CACHE_DIR = config('CACHE_DIR', default=None)
+    # En archivos: máximo de bytes en disco (además de CACHE_MAX_ITEMS)
+    CACHE_MAX_BYTES = config('CACHE_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+    CACHE_REDIS_URL = config('CACHE_REDIS_URL', default=None)
+
+    # Caché del usuario de la sesión en cada proceso (evita una consulta por petición)
+    CACHE_USUARIOS = config('CACHE_USUARIOS', default=True, cast=bool)
+    CACHE_USUARIOS_TTL = config('CACHE_USUARIOS_TTL', default=300, cast=int)
+    CACHE_USUARIOS_MAX_ITEMS = config('CACHE_USUARIOS_MAX_ITEMS', default=1024, cast=int)
+
+    # Caché de fragmentos de plantilla: {% cache %} ... {% endcache %}
+    CACHE_FRAGMENTOS = config('CACHE_FRAGMENTOS', default=True, cast=bool)
+    CACHE_FRAGMENTOS_MAX_ITEMS = config('CACHE_FRAGMENTOS_MAX_ITEMS', default=512, cast=int)
+    CACHE_FRAGMENTOS_MAX_BYTES = config(
+        'CACHE_FRAGMENTOS_MAX_BYTES', default=8 * 1024 * 1024, cast=int)
+
+    # Feed de cambios de la API (/api/v1/videos/changes)
+    CAMBIOS_POR_PAGINA = config('CAMBIOS_POR_PAGINA', default=500, cast=int)
+    CAMBIOS_MARGEN_SEGUNDOS = config('CAMBIOS_MARGEN_SEGUNDOS', default=2, cast=int)
+    CAMBIOS_RETENCION_DIAS = config('CAMBIOS_RETENCION_DIAS', default=90, cast=int)
+
+    # Archivos estáticos con huella en el nombre (flask estaticos construir)
+    ESTATICOS_DIR = config('ESTATICOS_DIR', default='build/static')
+    ESTATICOS_HUELLA = config('ESTATICOS_HUELLA', default=True, cast=bool)
+    # bundle.css/bundle.js propios (CSS crítico en línea) en lugar de los CDN
+    ESTATICOS_BUNDLE = config('ESTATICOS_BUNDLE', default=False, cast=bool)
+
+    # Métricas de rendimiento en /metrics (Prometheus) y cabecera Server-Timing.
+    # Sin METRICAS_TOKEN, /metrics solo responde en modo debug o en las pruebas
+    METRICAS = config('METRICAS', default=True, cast=bool)
+    METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+    METRICAS_SERVER_TIMING = config('METRICAS_SERVER_TIMING', default=False, cast=bool)
+    # Directorio donde cada proceso de gunicorn deja sus números para que
+    # /metrics los sume (vacío: solo los del proceso que responde) y cada
+    # cuántos segundos los actualiza
+    METRICAS_DIR = config('METRICAS_DIR', default='')
+    METRICAS_INTERVALO = config('METRICAS_INTERVALO', default=5, cast=int)
+
+    # Máximo de consultas SQL por petición en los listados (detecta N+1)
+    PRESUPUESTO_CONSULTAS = config('PRESUPUESTO_CONSULTAS', default=4, cast=int)
+    PRESUPUESTO_CONSULTAS_ESTRICTO = config(
+        'PRESUPUESTO_CONSULTAS_ESTRICTO', default=False, cast=bool)
+
+    # Cola del formulario de contacto hacia Google Sheets
+    SHEETS_URL = config(
+        'SHEETS_URL', default='https://docs.google.com/spreadsheets/d/1xRvKsi8ZMb5ILpvJTqkTW9MKAHXal_laWo_2_9p9VJY/edit?usp=sharing')
+    SHEETS_FALSO = config('SHEETS_FALSO', default=False, cast=bool)
+    SHEETS_HILO = config('SHEETS_HILO', default=True, cast=bool)
+    SHEETS_INTERVALO = config('SHEETS_INTERVALO', default=30, cast=int)
+    SHEETS_TAMANIO_LOTE = config('SHEETS_TAMANIO_LOTE', default=50, cast=int)
+    SHEETS_RESERVA_SEGUNDOS = config('SHEETS_RESERVA_SEGUNDOS', default=120, cast=int)
+    SHEETS_REINTENTO_BASE = config('SHEETS_REINTENTO_BASE', default=5, cast=int)
+    SHEETS_REINTENTO_MAX = config('SHEETS_REINTENTO_MAX', default=3600, cast=int)
@@ -0,0 +1,12 @@
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+from utils_replicas import SesionEnrutada
+
+# Las extensiones se crean sin aplicación y se enlazan en create_app().
+# La sesión manda las lecturas de las vistas @solo_lectura a una réplica
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
+
+# Configuración de Flask-Login
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'  # Vista de inicio de sesión
@@ -0,0 +1,22 @@
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField
+from wtforms import StringField, PasswordField, SubmitField, TextAreaField
+from wtforms.validators import DataRequired
+
+# Formulario de Registro
+
+
+class RegistrationForm(FlaskForm):
+    username = StringField('Nombre de Usuario', validators=[DataRequired()])
+    password = PasswordField('Contraseña', validators=[DataRequired()])
+    submit = SubmitField('Registrarse')
+
+# Formulario de Edición de Perfil
+
+
+class EditProfileForm(FlaskForm):
+    username = StringField('Nombre de Usuario', validators=[DataRequired()])
+    description = TextAreaField('Descripción')
+    # Opcional; el tipo se comprueba por el contenido al guardarla
+    profile_picture = FileField('Imagen de Perfil')
+    submit = SubmitField('Guardar Cambios')
@@ -0,0 +1,57 @@
+# Configuración de gunicorn para producción (se lee con -c gunicorn.conf.py).
+# Todos los valores se pueden cambiar con variables de entorno.
+import os
+import tempfile
+
+from decouple import config as env
+
+# Directorio donde los procesos dejan sus métricas para que /metrics las
+# sume (se define antes de que se importe la aplicación)
+if not os.environ.get('METRICAS_DIR'):
+    os.environ['METRICAS_DIR'] = tempfile.mkdtemp(prefix='metricas-')
+
+bind = f"0.0.0.0:{env('PORT', default=5000, cast=int)}"
+
+# Procesos y hilos: en la VM de 1 CPU compartida, 2 procesos con 4 hilos
+# cada uno. Más procesos no mejoran el rendimiento con una sola CPU
+# (ver benchmarks/comparar_servidores.py) y cada uno suma memoria: su
+# caché de usuarios y su proceso para las contraseñas (CONTRASENA_PROCESOS)
+workers = env('GUNICORN_WORKERS', default=2, cast=int)
+worker_class = 'gthread'
+threads = env('GUNICORN_THREADS', default=4, cast=int)
+
+# Tiempos: timeout mata peticiones colgadas, graceful_timeout deja terminar
+# las que están en curso al recargar (kill -HUP) o al detener la máquina
+timeout = env('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = env('GUNICORN_GRACEFUL_TIMEOUT', default=20, cast=int)
+keepalive = env('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+# Reciclar procesos de vez en cuando evita que crezca la memoria
+max_requests = env('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=100, cast=int)
+
+# Cargar la aplicación una vez antes de crear los procesos: arrancan más
+# rápido y comparten la memoria de los módulos importados
+preload_app = env('GUNICORN_PRELOAD', default=True, cast=bool)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = env('GUNICORN_LOGLEVEL', default='info')
+
+
+def post_fork(server, worker):
+    # Las conexiones abiertas antes del fork no deben compartirse entre procesos
+    from wsgi import app
+    with app.app_context():
+        for engine in app.extensions['sqlalchemy'].engines.values():
+            engine.dispose(close=False)
+    # Cada proceso arranca su hilo de la cola de formularios: lo guardado
+    # antes de que la máquina se detuviera se envía sin esperar otro envío
+    from utils_cola_formularios import cola_formularios
+    cola_formularios.iniciar()
+
+
+def worker_exit(server, worker):
+    # Los números del proceso que termina quedan en la suma de /metrics
+    from utils_metricas import metricas
+    metricas.guardar()
@@ -0,0 +1,53 @@
+"""Índice de búsqueda de videos (FTS5 en SQLite, tsvector en PostgreSQL)
+
+Revision ID: 0c2e4a6b8d1f
+Revises: d5f7a9c1e3b4
+Create Date: 2026-10-18 21:05:12.418630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c2e4a6b8d1f'
+down_revision = 'd5f7a9c1e3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Antes el índice se creaba en la primera búsqueda, así que puede existir
+    # ya: se crea si falta y se vuelve a llenar siempre
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS video_fts USING fts5("
+            "title, description, tokenize = 'unicode61 remove_diacritics 2')")
+        op.execute("DELETE FROM video_fts")
+        op.execute(
+            "INSERT INTO video_fts (rowid, title, description) "
+            "SELECT id, title, coalesce(description, '') FROM video")
+    elif dialecto == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS video_busqueda ("
+            "video_id INTEGER PRIMARY KEY REFERENCES video (id) ON DELETE CASCADE, "
+            "documento TSVECTOR NOT NULL)")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS video_busqueda_documento_idx "
+            "ON video_busqueda USING GIN (documento)")
+        op.execute("DELETE FROM video_busqueda")
+        op.execute(
+            "INSERT INTO video_busqueda (video_id, documento) "
+            "SELECT id, setweight(to_tsvector('spanish', unaccent(title)), 'A') || "
+            "setweight(to_tsvector('spanish', unaccent(coalesce(description, ''))), 'B') "
+            "FROM video")
+
+
+def downgrade():
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS video_fts")
+    elif dialecto == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS video_busqueda")
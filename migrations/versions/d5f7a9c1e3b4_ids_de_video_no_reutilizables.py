@@ -0,0 +1,41 @@
+"""Ids de video no reutilizables: AUTOINCREMENT en SQLite para el feed de cambios
+
+Revision ID: d5f7a9c1e3b4
+Revises: b8e2c4d6f0a1
+Create Date: 2026-10-18 19:20:41.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f7a9c1e3b4'
+down_revision = 'b8e2c4d6f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Solo SQLite vuelve a usar el id más alto después de borrarlo; en
+    # PostgreSQL la secuencia nunca retrocede
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('video', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Un video nuevo tampoco puede recibir el id de uno eliminado antes
+    # de esta migración
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'video'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'video', max("
+        "(SELECT coalesce(max(id), 0) FROM video), "
+        "(SELECT coalesce(max(video_id), 0) FROM video_eliminado))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('video', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}):
+        pass
@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+
+from extensiones import db
+from utils_busqueda import crear_motor
+from utils_contrasenas import ContrasenasOcupadas, cifrar, rehash_pendiente, verificar
+
+# Definición del modelo de base de datos
+
+
+class User(db.Model, UserMixin):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    profile_picture = db.Column(db.String(255), nullable=True)
+    name = db.Column(db.String(255), nullable=True)
+    description = db.Column(db.Text, nullable=True)
+    videos = db.relationship('Video', backref='user', lazy=True)
+
+    def set_password(self, password):
+        self.password_hash = cifrar(password)
+
+    def check_password(self, password):
+        """
+        Verifica la contraseña. Si el hash se calculó con otro método o costo
+        que CONTRASENA_METODO, lo recalcula (quien llama guarda la sesión).
+        """
+        if not verificar(self.password_hash, password):
+            return False
+        if rehash_pendiente(self.password_hash):
+            try:
+                self.password_hash = cifrar(password)
+            except ContrasenasOcupadas:
+                # Se actualizará en otro inicio de sesión
+                pass
+        return True
+
+# Modelo de Video
+
+
+class Video(db.Model):
+    __table_args__ = (
+        # mis_videos: filtra por user_id y pagina por (fecha_creacion, id)
+        db.Index('ix_video_user_id_fecha_creacion',
+                 'user_id', 'fecha_creacion', 'id'),
+        # Un mismo video de YouTube una sola vez por usuario
+        db.UniqueConstraint('user_id', 'video_id', name='uq_video_user_id_video_id'),
+        # Feed de cambios de la API: /api/v1/videos/changes
+        db.Index('ix_video_fecha_actualizacion', 'fecha_actualizacion', 'id'),
+        # SQLite no vuelve a usar el id de un video eliminado: el feed de
+        # cambios manda su id como eliminado y no debe borrar otro video
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    youtube_url = db.Column(db.String(255), nullable=False)
+    video_id = db.Column(db.String(255), nullable=False, index=True)
+    embed_url = db.Column(db.String(255), nullable=True)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_actualizacion = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+# Índice de búsqueda de texto completo
+
+
+def motor_busqueda(bind):
+    """
+    Devuelve el motor de búsqueda de la aplicación, creándolo según el
+    dialecto de la base de datos la primera vez.
+    """
+    motor = current_app.extensions.get('motor_busqueda')
+    if motor is None:
+        motor = current_app.extensions['motor_busqueda'] = crear_motor(bind)
+    return motor
+
+
+def tabla_existe(connection, nombre):
+    """
+    Indica si la tabla ya está en la base. Mientras se despliega, una base a
+    medio migrar puede no tener todavía video_eliminado o el índice de
+    búsqueda; una vez que aparece se recuerda y no se vuelve a consultar.
+    """
+    existentes = current_app.extensions.setdefault('tablas_existentes', set())
+    if nombre not in existentes:
+        if not inspect(connection).has_table(nombre):
+            return False
+        existentes.add(nombre)
+    return True
+
+
+def motor_con_indice(connection):
+    """
+    Devuelve el motor de búsqueda, o None si la base aún no tiene su índice
+    (la migración 0c2e4a6b8d1f lo llena completo cuando se aplica).
+    """
+    motor = motor_busqueda(connection)
+    if motor.TABLA is None or tabla_existe(connection, motor.TABLA):
+        return motor
+    return None
+
+
+@event.listens_for(Video, 'after_insert')
+@event.listens_for(Video, 'after_update')
+def indexar_video(mapper, connection, target):
+    # Se indexa en la misma transacción que guarda el video
+    motor = motor_con_indice(connection)
+    if motor:
+        motor.indexar(connection, target)
+
+
+@event.listens_for(Video, 'after_delete')
+def desindexar_video(mapper, connection, target):
+    motor = motor_con_indice(connection)
+    if motor:
+        motor.eliminar(connection, target.id)
+
+
+@event.listens_for(Video.__table__, 'after_create')
+def crear_indice_busqueda(target, connection, **kw):
+    # db.create_all() crea el índice junto con la tabla video; en las bases
+    # migradas lo crea la migración 0c2e4a6b8d1f
+    motor_busqueda(connection).preparar(connection)
+
+# Registro de videos eliminados para el feed de cambios de la API
+
+
+class VideoEliminado(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, nullable=False)  # Video.id que ya no existe
+    user_id = db.Column(db.Integer, nullable=True)
+    fecha_eliminacion = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+@event.listens_for(Video, 'after_delete')
+def registrar_eliminacion(mapper, connection, target):
+    # En la misma transacción que el DELETE: si se revierte, no queda rastro.
+    # Antes de la migración a3d5f7b9c1e2 no hay feed de cambios que avisar
+    if not tabla_existe(connection, VideoEliminado.__table__.name):
+        return
+    connection.execute(VideoEliminado.__table__.insert().values(
+        video_id=target.id, user_id=target.user_id, fecha_eliminacion=datetime.utcnow()))
+
+# Cola de envíos del formulario de contacto hacia Google Sheets
+
+
+class EnvioFormulario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    apellido = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    telefono = db.Column(db.String(50), nullable=False)
+    mensaje = db.Column(db.Text, nullable=False)
+    fecha_envio = db.Column(db.String(19), nullable=False)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    # Cuándo puede volver a intentarse; también sirve de reserva mientras
+    # un proceso lo está enviando
+    proximo_intento = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    lote = db.Column(db.String(32), nullable=True)
+    ultimo_error = db.Column(db.Text, nullable=True)
+
+    def fila(self):
+        return [self.nombre, self.apellido, self.email,
+                self.telefono, self.mensaje, self.fecha_envio]
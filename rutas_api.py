@@ -0,0 +1,239 @@
+import base64
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request, url_for
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, load_only
+
+from extensiones import db
+from models import User, Video, VideoEliminado
+from utils_consultas import presupuesto_consultas
+from utils_paginacion import link_header, paginar_peticion
+from utils_youtube import embed_url_para
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def fecha_iso(fecha):
+    return fecha.isoformat(timespec='seconds') + 'Z' if fecha else None
+
+
+# Campos que puede pedir el cliente con ?fields=id,title,...
+CAMPOS = {
+    'id': lambda v: v.id,
+    'title': lambda v: v.title,
+    'description': lambda v: v.description,
+    'youtube_url': lambda v: v.youtube_url,
+    'video_id': lambda v: v.video_id,
+    'embed_url': lambda v: v.embed_url or embed_url_para(v.video_id),
+    'fecha_creacion': lambda v: fecha_iso(v.fecha_creacion),
+    'fecha_actualizacion': lambda v: fecha_iso(v.fecha_actualizacion),
+    'usuario': lambda v: {'id': v.user.id, 'username': v.user.username},
+}
+# Columnas de la tabla que necesita cada campo
+COLUMNAS = {
+    'id': [], 'title': [Video.title], 'description': [Video.description],
+    'youtube_url': [Video.youtube_url], 'video_id': [Video.video_id],
+    'embed_url': [Video.embed_url, Video.video_id],
+    'fecha_creacion': [Video.fecha_creacion], 'fecha_actualizacion': [],
+    'usuario': [Video.user_id],
+}
+
+
+class ErrorApi(Exception):
+    """Error que se devuelve al cliente como JSON con su código HTTP."""
+
+    def __init__(self, codigo, error, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.error = error
+        self.mensaje = mensaje
+
+
+@bp.errorhandler(ErrorApi)
+def manejar_error_api(e):
+    return jsonify(error=e.error, mensaje=e.mensaje), e.codigo
+
+
+def campos_pedidos():
+    """
+    Devuelve la lista de campos del parámetro fields (todos si no viene).
+    """
+    fields = request.args.get('fields')
+    if not fields:
+        return list(CAMPOS)
+    campos = [c.strip() for c in fields.split(',') if c.strip()]
+    desconocidos = [c for c in campos if c not in CAMPOS]
+    if desconocidos or not campos:
+        raise ErrorApi(400, 'campo_no_valido',
+                       f'Campos no válidos: {", ".join(desconocidos)}. '
+                       f'Disponibles: {", ".join(CAMPOS)}')
+    return campos
+
+
+def consulta_videos(campos):
+    """
+    Consulta de videos que solo carga las columnas de los campos pedidos
+    (más id y fecha_actualizacion, que se usan para el cursor y el ETag).
+    """
+    columnas = {Video.id, Video.fecha_actualizacion}
+    for campo in campos:
+        columnas.update(COLUMNAS[campo])
+    query = Video.query.options(load_only(*columnas))
+    if 'usuario' in campos:
+        query = query.options(joinedload(Video.user).load_only(User.id, User.username))
+    return query
+
+
+def etag_de(videos, *extra):
+    """
+    ETag calculado con el id y la fecha_actualizacion de cada video: cambia
+    cuando se edita, agrega o elimina alguno de la respuesta.
+    """
+    huella = hashlib.sha1(repr(extra).encode())
+    for video in videos:
+        fecha = video.fecha_actualizacion.isoformat() if video.fecha_actualizacion else ''
+        huella.update(f'{video.id}:{fecha};'.encode())
+    return huella.hexdigest()
+
+
+def respuesta_condicional(etag, construir):
+    """
+    Devuelve 304 sin serializar nada si el cliente ya tiene esta versión
+    (If-None-Match); si no, el JSON que arma `construir`.
+    """
+    if request.if_none_match.contains_weak(etag):
+        respuesta = current_app.response_class(status=304)
+    else:
+        respuesta = jsonify(construir())
+    respuesta.set_etag(etag)
+    respuesta.cache_control.no_cache = True
+    return respuesta
+
+
+def serializar(video, campos):
+    return {campo: CAMPOS[campo](video) for campo in campos}
+
+# Ruta para listar videos: /api/v1/videos?cursor=...&por_pagina=...&fields=...
+
+
+@bp.route('/videos')
+@presupuesto_consultas()
+def listar_videos():
+    campos = campos_pedidos()
+    pagina = paginar_peticion(consulta_videos(campos), [Video.id])
+
+    def url_pagina(cursor):
+        args = request.args.to_dict()
+        args.update(orden=pagina.orden, cursor=cursor)
+        return url_for('api.listar_videos', _external=True, **args)
+
+    etag = etag_de(pagina.items, campos, pagina.orden, pagina.siguiente, pagina.anterior)
+    respuesta = respuesta_condicional(etag, lambda: {
+        'videos': [serializar(video, campos) for video in pagina.items],
+        'siguiente': pagina.siguiente,
+        'anterior': pagina.anterior,
+    })
+    link = link_header(pagina, url_pagina)
+    if link:
+        respuesta.headers['Link'] = link
+    return respuesta
+
+# Ruta para ver un video: /api/v1/videos/<id>?fields=...
+
+
+@bp.route('/videos/<int:id>')
+def ver_video(id):
+    campos = campos_pedidos()
+    video = consulta_videos(campos).filter(Video.id == id).first()
+    if video is None:
+        raise ErrorApi(404, 'no_encontrado', f'No existe el video {id}.')
+    respuesta = respuesta_condicional(etag_de([video], campos),
+                                      lambda: serializar(video, campos))
+    respuesta.last_modified = video.fecha_actualizacion
+    return respuesta
+
+
+def codificar_token(datos):
+    crudo = json.dumps(datos, separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_token(token):
+    """
+    Devuelve la posición guardada en el token de `since`:
+    (fecha_actualizacion, id) del último video, id del último eliminado y
+    fecha en que se emitió.
+    """
+    try:
+        relleno = '=' * (-len(token) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(token + relleno))
+        fecha = datetime.fromisoformat(datos['f']) if datos['f'] else None
+        return fecha, int(datos['i']), int(datos['t']), datetime.fromisoformat(datos['e'])
+    except (ValueError, KeyError, TypeError):
+        raise ErrorApi(400, 'token_no_valido', 'El parámetro since no es válido.')
+
+# Ruta del feed de cambios: /api/v1/videos/changes?since=<token>
+
+
+@bp.route('/videos/changes')
+def cambios_videos():
+    """
+    Devuelve los videos creados o editados y los ids de los eliminados
+    desde el token `since` (sin él, desde el principio). El cliente aplica
+    primero `eliminados` y luego `videos`, guarda `siguiente` y vuelve a
+    pedir mientras `hay_mas` sea verdadero. Los ids de video no se
+    reutilizan (AUTOINCREMENT), así que un id eliminado nunca es el de un
+    video vivo aunque las dos listas avancen con cursores distintos.
+    """
+    config = current_app.config
+    campos = campos_pedidos()
+    limite = max(1, min(request.args.get('limite', config['CAMBIOS_POR_PAGINA'], type=int),
+                        config['CAMBIOS_POR_PAGINA']))
+    ahora = datetime.utcnow()
+    # Lo más reciente se deja para la próxima vez: una transacción que aún
+    # no terminó puede confirmar filas con una fecha ya pasada
+    corte = ahora - timedelta(seconds=config['CAMBIOS_MARGEN_SEGUNDOS'])
+
+    since = request.args.get('since')
+    if since:
+        fecha, ultimo_id, ultimo_eliminado, emitido = decodificar_token(since)
+        if emitido < ahora - timedelta(days=config['CAMBIOS_RETENCION_DIAS']):
+            # Los eliminados de entonces ya se purgaron: hay que sincronizar todo
+            raise ErrorApi(410, 'token_vencido',
+                           'El token es muy antiguo; vuelve a sincronizar sin since.')
+    else:
+        # Sincronización completa: los eliminados anteriores no interesan
+        fecha, ultimo_id = None, 0
+        ultimo_eliminado = db.session.query(
+            func.coalesce(func.max(VideoEliminado.id), 0)).scalar()
+
+    query = consulta_videos(campos).filter(Video.fecha_actualizacion <= corte)
+    if fecha is not None:
+        # El >= acota el rango del índice (fecha_actualizacion, id); con el
+        # OR solo, SQLite une dos búsquedas y ordena el resultado en memoria
+        query = query.filter(Video.fecha_actualizacion >= fecha, or_(
+            Video.fecha_actualizacion > fecha, Video.id > ultimo_id))
+    videos = query.order_by(Video.fecha_actualizacion, Video.id).limit(limite + 1).all()
+
+    eliminados = db.session.query(VideoEliminado.id, VideoEliminado.video_id).filter(
+        VideoEliminado.id > ultimo_eliminado, VideoEliminado.fecha_eliminacion <= corte).order_by(
+        VideoEliminado.id).limit(limite + 1).all()
+
+    hay_mas = len(videos) > limite or len(eliminados) > limite
+    videos, eliminados = videos[:limite], eliminados[:limite]
+    if videos:
+        fecha, ultimo_id = videos[-1].fecha_actualizacion, videos[-1].id
+    if eliminados:
+        ultimo_eliminado = eliminados[-1].id
+
+    return jsonify(
+        videos=[serializar(video, campos) for video in videos],
+        eliminados=[fila.video_id for fila in eliminados],
+        siguiente=codificar_token({
+            'f': fecha.isoformat() if fecha else None, 'i': ultimo_id,
+            't': ultimo_eliminado, 'e': ahora.isoformat()}),
+        hay_mas=hay_mas,
+    )
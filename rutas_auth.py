@@ -0,0 +1,140 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, send_from_directory
+from flask_login import login_user, login_required, current_user, logout_user
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from extensiones import db, login_manager
+from models import User
+from utils_avatares import CON_HUELLA, ImagenNoValida
+from utils_usuarios import cargar_usuario
+
+bp = Blueprint('auth', __name__)
+UN_ANIO = 365 * 24 * 3600
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    # Recupera el usuario de la caché del proceso o, si no está, de la base
+    return cargar_usuario(user_id)
+
+# Ruta para editar el perfil del usuario
+
+
+@bp.route('/edit_profile', methods=['GET', 'POST'])
+@login_required
+def edit_profile():
+    # WTForms solo se importa cuando se usa el formulario
+    from forms import EditProfileForm
+
+    title = "editar perfil "
+    form = EditProfileForm()
+    if form.validate_on_submit():
+        user = current_user
+        profile_picture = form.profile_picture.data
+        if profile_picture:
+            # Se valida por el contenido, no por la extensión del nombre
+            try:
+                filename = current_app.extensions['avatares'].guardar(profile_picture)
+            except ImagenNoValida as e:
+                flash(str(e), 'danger')
+                return render_template('edit_profile.html', form=form, user=current_user, title=title)
+            user.profile_picture = url_for('auth.uploaded_file', filename=filename)
+        user.username = form.username.data
+        user.description = form.description.data
+        db.session.commit()
+        flash('Perfil actualizado exitosamente', 'success')
+        return redirect(url_for('auth.profile'))
+    form.username.data = current_user.username
+    form.description.data = current_user.description
+    return render_template('edit_profile.html', form=form, user=current_user, title=title)
+
+# Imagen más grande que MAX_CONTENT_LENGTH
+
+
+@bp.errorhandler(RequestEntityTooLarge)
+def imagen_muy_grande(e):
+    if request.endpoint != 'auth.edit_profile':
+        return e
+    limite = current_app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    flash(f'La imagen no puede superar {limite} MB.', 'danger')
+    return redirect(url_for('auth.edit_profile'), code=303)
+
+# Ruta para ver el perfil del usuario
+
+
+@bp.route('/profile')
+@login_required
+def profile():
+    title = "perfil"
+    return render_template('profile.html', user=current_user, title=title)
+
+# Ruta para mostrar la imagen de perfil del usuario
+
+
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    # Las imágenes nombradas por su contenido (y sus miniaturas) nunca
+    # cambian; las subidas antes de eso se revalidan con ETag
+    inmutable = CON_HUELLA.match(filename)
+    respuesta = send_from_directory(current_app.config['UPLOAD_FOLDER'], filename,
+                                    max_age=UN_ANIO if inmutable else 0)
+    if inmutable:
+        respuesta.cache_control.public = True
+        respuesta.cache_control.immutable = True
+    else:
+        respuesta.cache_control.no_cache = True
+    # Contenido subido por usuarios: que el navegador no adivine otro tipo
+    respuesta.headers['X-Content-Type-Options'] = 'nosniff'
+    return respuesta
+
+# Vista para cerrar sesión
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Has cerrado sesión exitosamente.', 'success')
+    return redirect(url_for('videos.index'))
+
+# Inicio de sesión
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    title = "Iniciando Sesión"
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username).first()
+        if user and user.check_password(password):
+            # check_password pudo actualizar el hash a los parámetros actuales
+            if user in db.session.dirty:
+                db.session.commit()
+            login_user(user)
+            flash('Inicio de sesión exitoso.', 'success')
+            return redirect(url_for('videos.index'))
+        flash('Credenciales inválidas. Inténtalo de nuevo.', 'danger')
+    return render_template('login.html', title=title)
+
+# registrar usuario
+
+
+@bp.route('/registro', methods=['GET', 'POST'])
+def registro():
+    title = "Registrando Usuario"
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        # Verificar si el usuario ya existe
+        existing_user = User.query.filter_by(username=username).first()
+        if existing_user:
+            flash('El nombre de usuario ya está en uso.', 'danger')
+        else:
+            new_user = User(username=username)
+            new_user.set_password(password)
+            db.session.add(new_user)
+            db.session.commit()
+            flash('¡Registro exitoso! Ahora puedes iniciar sesión.', 'success')
+            # Redirige a la página de inicio de sesión
+            return redirect(url_for('auth.login'))
+    return render_template('registro.html', title=title)
@@ -0,0 +1,225 @@
+from datetime import datetime
+
+from flask import Blueprint, make_response, render_template, request, redirect, url_for, flash
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from extensiones import db
+from models import Video
+from rutas_videos import render_listado
+from utils_cache import cachear_respuesta
+from utils_consultas import presupuesto_consultas
+from utils_replicas import solo_lectura
+from utils_seo import update_seo
+from utils_cola_formularios import cola_formularios
+
+bp = Blueprint('paginas', __name__)
+
+# ruta inicio
+
+
+@bp.route('/')
+@cachear_respuesta()
+def inicio():
+    main_title = "Compilandocode"
+    seo = update_seo('Inicio - Compilando Code', 'Servicios de Consultoría y Capacitación Tecnológica, Consultoría y capacitación diseñados para satisfacer las necesidades de profesionales, emprendedores y empresas. Transforme su negocio con nuestras soluciones a la medida. Desde el desarrollo de software hasta la implementación de estrategias digitales, nuestro equipo de expertos lo guiará hacia el éxito.',
+                     'Expertos en Transformación Digital y Desarrollo de Software, Impulsa tus habilidades tecnológicas, Páginas realizadas para Clientes,Elige el mejor plan de desarrollo web')
+
+    return render_template('inicio.html', main_title=main_title, **seo)
+
+# fecha para todo
+
+
+@bp.app_context_processor
+def inject_now():
+    return {'current_date': datetime.now()}
+
+# Configura la ruta para la página de errores 404
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    title = "Pagina no Encotrado"
+    return render_template('404.html', error=error, title=title), 404
+# errores 500
+
+
+@bp.app_errorhandler(500)
+def internal_server_error(e):
+    title = "Error de conexión con base de datos"
+    # Renderiza la página de error personalizada
+    return render_template('500.html', e=e, title=title), 500
+
+# para guardar datos de información en excel online
+
+
+@bp.route('/formulario', methods=['GET', 'POST'])
+def formulario():
+    title = "Formulario"
+    return render_template('formulario.html', title=title)
+
+
+@bp.route('/handle_formulario', methods=['POST'])
+def handle_formulario():
+    nombre = request.form['nombre']
+    apellido = request.form['apellido']
+    email = request.form['email']
+    telefono = request.form['telefono']
+    mensaje = request.form['mensaje']
+    fecha_envio = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Se guarda en la cola y un hilo lo envía a Google Sheets en segundo plano
+    cola_formularios.encolar(
+        [nombre, apellido, email, telefono, mensaje, fecha_envio])
+    flash('Datos enviados correctamente', 'success')
+
+    return redirect(url_for('paginas.inicio'))
+
+# rutas para cursos
+
+
+@bp.route('/cursos')
+@cachear_respuesta()
+def cursos():
+    main_title = "Cursos - Compilandocode"
+    seo = {
+        'title': 'Cursos - Compilando Code',
+        'description': 'Amplía tus habilidades con nuestros cursos de programación. Desde Python hasta WordPress, nuestros cursos están diseñados para transformar tu perfil profesional. Perfecto para emprendedores, empresarios, independientes y profesionales que buscan dominar nuevas tecnologías y destacarse en el mercado digital.',
+        'keywords': 'Cursos de Programación, Python, Flask, HTML, CSS, JavaScript, Ruby, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/cursos.html', main_title=main_title, **seo)
+
+# ruta para nosotros
+
+
+@bp.route('/nosotros')
+@cachear_respuesta()
+def nosotros():
+    main_title = "Nosotros - Compilandocode"
+    seo = {
+        'title': 'Nosotros - Compilando Code',
+        'description': 'Conoce a Compilando Code, expertos en transformación digital y desarrollo de software. Nuestro equipo apasionado ofrece soluciones tecnológicas a medida para emprendedores, empresarios, independientes y profesionales. Desde consultoría estratégica hasta implementación técnica, estamos aquí para hacer crecer tu visión digital.',
+        'keywords': 'Transformación Digital, Desarrollo de Software, Consultoría Tecnológica, Python, Flask, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/nosotros.html', main_title=main_title, **seo)
+# ruta para contacto
+
+
+@bp.route('/contacto')
+@cachear_respuesta()
+def contacto():
+    main_title = "Contacto - Compilandocode"
+    seo = {
+        'title': 'Contacto - Compilando Code',
+        'description': 'Conecta con Compilando Code para explorar cómo podemos ayudarte. Consultas comerciales, colaboraciones o simplemente obtener más información sobre nuestros servicios de desarrollo de software y cursos de programación. Estamos aquí para escucharte y hacer realidad tu próximo proyecto digital.',
+        'keywords': 'Contacto Compilando Code, Consultas Comerciales, Desarrollo de Software, Cursos de Programación, Python, Flask, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/contacto.html', main_title=main_title, **seo)
+
+# ruta para portafolios
+
+
+@bp.route('/portafolios')
+@cachear_respuesta()
+def portafolios():
+    main_title = "Portafolios - Compilandocode"
+    seo = {
+        'title': 'Portafolios - Compilando Code',
+        'description': 'Explora nuestros proyectos destacados en desarrollo web y móvil. Desde aplicaciones innovadoras hasta sitios web personalizados, nuestros portafolios muestran cómo hemos transformado ideas en realidades digitales. Ideal para emprendedores, empresarios, independientes y profesionales que buscan inspiración tecnológica.',
+        'keywords': 'Proyectos de Desarrollo Web, Proyectos de Desarrollo Móvil, Python, Flask, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/portafolios.html', main_title=main_title, **seo)
+
+# ruta de servicios
+
+
+@bp.route('/servicios')
+@cachear_respuesta()
+def servicios():
+    main_title = "Servicios - Compilandocode"
+    seo = {
+        'title': 'Servicios - Compilando Code',
+        'description': 'Descubre nuestros servicios de desarrollo de software y consultoría tecnológica. Desde desarrollo web y móvil hasta estrategias digitales personalizadas, ayudamos a emprendedores, empresarios, independientes y profesionales a alcanzar sus objetivos tecnológicos. Haz crecer tu negocio con nuestras soluciones innovadoras.',
+        'keywords': 'Desarrollo de Software, Consultoría Tecnológica, Python, Flask, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/servicios.html', main_title=main_title, **seo)
+
+# planes
+
+
+@bp.route('/planes')
+@cachear_respuesta()
+def planes():
+    main_title = "Planes - Compilandocode"
+    seo = {
+        'title': 'Planes - Compilando Code',
+        'description': 'Explora nuestros planes de servicios diseñados para emprendedores, empresarios, independientes y profesionales que buscan soluciones tecnológicas a medida. Desde consultoría estratégica hasta desarrollo técnico avanzado, tenemos el plan ideal para hacer crecer tu negocio digital.',
+        'keywords': 'Planes de Servicios, Consultoría Estratégica, Desarrollo Técnico, Python, Flask, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+
+    return render_template('rutas/planes.html', main_title=main_title, **seo)
+# ruta para blog
+
+
+@bp.route('/blog')
+@solo_lectura
+@presupuesto_consultas()
+def blog():
+    main_title = "Blog - Compilandocode"
+    seo = {
+        'title': 'Blog - Compilando Code',
+        'description': 'Explora nuestro blog para insights valiosos sobre desarrollo de software, tendencias tecnológicas y consejos prácticos en programación. Aprende con nuestros tutoriales en Python, Flask, HTML, CSS, JavaScript, Ruby, Ruby on Rails, MySQL, PostgreSQL y WordPress. Todo diseñado para impulsar tu conocimiento y éxito en el mundo digital.',
+        'keywords': 'Blog de Tecnología, Desarrollo de Software, Python, Flask, HTML, CSS, JavaScript, Ruby on Rails, MySQL, PostgreSQL, WordPress',
+    }
+    videos = Video.query.options(joinedload(Video.user))
+    return render_listado('rutas/blog.html', videos, [Video.id], main_title=main_title, **seo)
+
+
+# para seo: índice de sitemaps con las páginas públicas. El detalle de cada
+# video (/video/<id>) pide iniciar sesión, así que no se anuncia
+
+PAGINAS_SITEMAP = [
+    ('paginas.inicio', 'daily', '1.0'),
+    ('paginas.cursos', 'weekly', '0.9'),
+    ('paginas.servicios', 'monthly', '0.8'),
+    ('paginas.planes', 'monthly', '0.8'),
+    ('paginas.portafolios', 'monthly', '0.7'),
+    ('paginas.nosotros', 'monthly', '0.7'),
+    ('paginas.contacto', 'monthly', '0.8'),
+    ('paginas.blog', 'daily', '0.8'),
+    ('videos.index', 'daily', '0.6'),
+]
+
+
+def respuesta_sitemap(cuerpo, mimetype):
+    respuesta = make_response(cuerpo)
+    respuesta.mimetype = mimetype
+    respuesta.add_etag()
+    respuesta.cache_control.public = True
+    respuesta.cache_control.max_age = 3600
+    return respuesta.make_conditional(request)
+
+
+@bp.route('/sitemap.xml', methods=['GET'])
+def sitemap():
+    from utils_sitemap import fecha_w3c, xml_indice
+
+    ultima = db.session.query(func.max(Video.fecha_actualizacion)).scalar()
+    sitemaps = [(url_for('paginas.sitemap_paginas', _external=True), fecha_w3c(ultima))]
+    return respuesta_sitemap(xml_indice(sitemaps), 'application/xml')
+
+
+@bp.route('/sitemaps/paginas.xml', methods=['GET'])
+def sitemap_paginas():
+    from utils_sitemap import fecha_w3c, xml_urlset
+
+    ultima = fecha_w3c(db.session.query(func.max(Video.fecha_actualizacion)).scalar())
+    urls = [(url_for(endpoint, _external=True),
+             ultima if endpoint in ('paginas.blog', 'videos.index') else None,
+             frecuencia, prioridad) for endpoint, frecuencia, prioridad in PAGINAS_SITEMAP]
+    return respuesta_sitemap(''.join(xml_urlset(urls)), 'application/xml')
@@ -0,0 +1,363 @@
+import click
+from flask import Blueprint, current_app, jsonify, make_response, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from extensiones import db
+from models import Video, motor_busqueda
+from utils_consultas import presupuesto_consultas
+from utils_paginacion import Pagina, paginar_peticion, link_header
+from utils_replicas import solo_lectura
+from utils_youtube import parse_youtube_url, embed_url_para
+
+bp = Blueprint('videos', __name__, cli_group='videos')
+
+# Ruta para mostrar la lista de videos
+
+
+def render_listado(template, query, columnas, **context):
+    """
+    Pagina una consulta de videos con los parámetros de la petición
+    (orden, cursor, por_pagina) y renderiza la plantilla del listado.
+
+    Argumentos:
+        template: La plantilla del listado.
+        query: Consulta de videos sin order_by.
+        columnas: Columnas de ordenamiento; la última debe ser única.
+        context: Variables extra para la plantilla.
+
+    Devuelve:
+        La respuesta con la cabecera Link si corresponde.
+    """
+    config = current_app.config
+    pagina = paginar_peticion(query, columnas)
+
+    def url_pagina(cursor, **kwargs):
+        args = request.view_args.copy()
+        args.update(orden=pagina.orden, cursor=cursor)
+        if pagina.por_pagina != config['VIDEOS_POR_PAGINA']:
+            args['por_pagina'] = pagina.por_pagina
+        return url_for(request.endpoint, **args, **kwargs)
+
+    response = make_response(render_template(
+        template, videos=pagina.items, pagina=pagina, orden=pagina.orden,
+        url_pagina=url_pagina, **context))
+    if config['PAGINACION_LINK_HEADER']:
+        link = link_header(
+            pagina, lambda cursor: url_pagina(cursor, _external=True))
+        if link:
+            response.headers['Link'] = link
+    return response
+
+
+@bp.route('/index')
+@solo_lectura
+@presupuesto_consultas()
+def index():
+    title = "Compilandocode"
+    videos = Video.query.options(joinedload(Video.user))
+    return render_listado('index.html', videos, [Video.id], title=title)
+
+
+def quiere_json():
+    # Clientes de API (fetch, curl) que piden JSON en lugar de HTML
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+
+def video_existente(user_id, video_id):
+    """
+    Devuelve el video de YouTube `video_id` que el usuario ya guardó, o None.
+    La búsqueda usa la restricción única (user_id, video_id).
+    """
+    return Video.query.filter_by(user_id=user_id, video_id=video_id).first()
+
+
+def respuesta_duplicado(video):
+    mensaje = f'Ya tienes guardado este video: "{video.title}"'
+    if quiere_json():
+        return jsonify(error='duplicado', mensaje=mensaje, id=video.id,
+                       url=url_for('videos.show_video_detail', id=video.id)), 409
+    flash(mensaje, 'warning')
+    return redirect(url_for('videos.show_video_detail', id=video.id))
+
+# Ruta para cargar un nuevo video
+
+
+@bp.route('/upload', methods=['GET', 'POST'])
+@login_required
+def upload_video():
+    title = "Cargando Videos"
+    if request.method == 'POST':
+        datos = request.get_json(silent=True) or request.form
+        youtube_url = datos.get('url', '')
+        user_id = current_user.id
+        video_id = parse_youtube_url(youtube_url)
+        if video_id:
+            # Volver a subir el mismo video no crea otra fila
+            existente = video_existente(user_id, video_id)
+            if existente:
+                return respuesta_duplicado(existente)
+            video = Video(
+                title=datos.get('title', ''),
+                description=datos.get('description', ''),
+                youtube_url=youtube_url,
+                video_id=video_id,
+                embed_url=embed_url_para(video_id),
+                user_id=user_id
+            )
+            db.session.add(video)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Otra petición lo guardó entre la consulta y el INSERT
+                db.session.rollback()
+                return respuesta_duplicado(video_existente(user_id, video_id))
+            if quiere_json():
+                return jsonify(id=video.id, video_id=video.video_id,
+                               url=url_for('videos.show_video_detail', id=video.id)), 201
+            flash('Video creado exitosamente', 'success')  # Mensaje de éxito
+            return redirect(url_for('videos.mis_videos'))
+        else:
+            if quiere_json():
+                return jsonify(error='url_no_valida',
+                               mensaje='URL de YouTube no válida'), 400
+            flash('No se pudo crear el video. URL de YouTube no válida',
+                  'danger')  # Mensaje de error
+    return render_template('upload.html', title=title)
+
+# Ruta para ver detalles de un video
+
+
+@bp.route('/video/<int:id>')
+@solo_lectura
+@login_required
+def show_video_detail(id):
+    title = f"Detalle video {id} "
+    video = db.get_or_404(Video, id)
+    if not current_user.is_authenticated:
+        flash('Inicia sesión para ver el video.', 'warning')
+        return redirect(url_for('auth.login'))
+    return render_template('show.html', video=video, title=title)
+
+# Ruta para ver solo los videos del usuario actual
+
+
+@bp.route('/mis_videos')
+@presupuesto_consultas()
+@login_required
+def mis_videos():
+    title = "mis videos"
+    user_videos = Video.query.options(joinedload(Video.user)).filter_by(
+        user_id=current_user.id)
+    return render_listado('mis_videos.html', user_videos,
+                          [Video.fecha_creacion, Video.id], title=title)
+
+# Ruta para editar un video
+
+
+@bp.route('/edit/<int:id>', methods=['GET', 'POST'])
+def edit_video(id):
+    title = "edit video"
+    video = db.get_or_404(Video, id)
+    if request.method == 'POST':
+        youtube_url = request.form['youtube_url']
+        video_id = parse_youtube_url(youtube_url)
+        if video_id:
+            user_id = video.user_id
+            existente = video_existente(user_id, video_id)
+            if existente and existente.id != video.id:
+                return respuesta_duplicado(existente)
+            video.title = request.form['title']
+            video.description = request.form['description']
+            video.youtube_url = youtube_url
+            video.video_id = video_id
+            video.embed_url = embed_url_para(video_id)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Otra petición guardó ese video entre la consulta y el UPDATE
+                db.session.rollback()
+                return respuesta_duplicado(video_existente(user_id, video_id))
+            return redirect(url_for('videos.index'))
+        flash('No se pudo actualizar el video. URL de YouTube no válida',
+              'danger')  # Mensaje de error
+    return render_template('update.html', video=video, title=title)
+
+# Ruta para eliminar un video
+
+
+@bp.route('/delete/<int:id>')
+def delete_video(id):
+
+    video = db.get_or_404(Video, id)
+    db.session.delete(video)
+    db.session.commit()
+    return redirect(url_for('videos.index'))
+
+# Ruta para buscar videos
+
+
+@bp.route('/search', methods=['GET'])
+@solo_lectura
+@presupuesto_consultas()
+def search():
+    title = "Buscando videos"
+    query = request.args.get('query', '')
+    numero = max(request.args.get('pagina', 1, type=int), 1)
+    por_pagina = current_app.config['VIDEOS_POR_PAGINA']
+
+    # El índice devuelve los ids por relevancia; luego se cargan los videos.
+    # La conexión de la sesión es la de la réplica si la vista puede usarla
+    ids = motor_busqueda(db.engine).buscar(
+        db.session.connection(), query, por_pagina + 1, (numero - 1) * por_pagina)
+    hay_mas = len(ids) > por_pagina
+    ids = ids[:por_pagina]
+    encontrados = {video.id: video for video in Video.query.options(
+        joinedload(Video.user)).filter(Video.id.in_(ids))} if ids else {}
+    videos = [encontrados[i] for i in ids if i in encontrados]
+
+    pagina = Pagina(videos, numero + 1 if hay_mas else None,
+                    numero - 1 if numero > 1 else None, None, por_pagina)
+
+    def url_pagina(n):
+        return url_for('videos.search', query=query, pagina=n)
+
+    return render_template('search.html', videos=videos, query=query, title=title, pagina=pagina,
+                           url_pagina=url_pagina)
+
+# Comandos de mantenimiento: flask videos <comando>
+
+
+@bp.cli.command('reindexar')
+def reindexar_busqueda():
+    """Reconstruye el índice de búsqueda de videos."""
+    motor = motor_busqueda(db.engine)
+    with db.engine.begin() as conexion:
+        motor.preparar(conexion)
+        motor.reconstruir(conexion)
+    click.echo(f'Índice de búsqueda reconstruido ({type(motor).__name__}).')
+
+
+@bp.cli.command('backfill-embed')
+@click.option('--lote', default=500, show_default=True, help='Filas por transacción.')
+def backfill_embed(lote):
+    """
+    Calcula video_id y embed_url de los videos que aún no lo tienen. Si el
+    usuario ya tiene otro video con el mismo id, la fila se deja como está y
+    se informa como repetida en lugar de abortar el lote.
+    """
+    actualizados = repetidos = invalidos = 0
+    ultimo_id = 0
+    while True:
+        videos = Video.query.filter(Video.id > ultimo_id, Video.embed_url.is_(None)).order_by(
+            Video.id).limit(lote).all()
+        if not videos:
+            break
+        ultimo_id = videos[-1].id
+        for video in videos:
+            video_id = parse_youtube_url(video.youtube_url)
+            if not video_id:
+                invalidos += 1
+                continue
+            # Un SAVEPOINT por fila: una colisión solo deshace esa fila
+            try:
+                with db.session.begin_nested():
+                    video.video_id = video_id
+                    video.embed_url = embed_url_para(video_id)
+                actualizados += 1
+            except IntegrityError:
+                repetidos += 1
+        db.session.commit()
+    click.echo(f'{actualizados} videos actualizados, {repetidos} repetidos, '
+               f'{invalidos} con URL no válida.')
+
+
+@bp.cli.command('deduplicar')
+@click.option('--lote', default=500, show_default=True, help='Grupos de duplicados por transacción.')
+def deduplicar(lote):
+    """
+    Fusiona los videos repetidos de un mismo usuario (mismo video_id):
+    conserva el más antiguo y completa su descripción con la de los otros.
+    """
+    grupos_total = eliminados = 0
+    while True:
+        grupos = db.session.query(Video.user_id, Video.video_id).group_by(
+            Video.user_id, Video.video_id).having(func.count() > 1).limit(lote).all()
+        if not grupos:
+            break
+        for user_id, video_id in grupos:
+            conservado, *repetidos = Video.query.filter_by(
+                user_id=user_id, video_id=video_id).order_by(Video.id).all()
+            for repetido in repetidos:
+                if not conservado.description and repetido.description:
+                    conservado.description = repetido.description
+                db.session.delete(repetido)
+                eliminados += 1
+        grupos_total += len(grupos)
+        db.session.commit()
+        click.echo(f'{grupos_total} grupos fusionados, {eliminados} videos eliminados...', err=True)
+    click.echo(f'Listo: {grupos_total} grupos fusionados, {eliminados} videos eliminados.')
+
+
+@bp.cli.command('import')
+@click.argument('archivo', type=click.File('r', encoding='utf-8'))
+@click.option('--usuario', required=True, help='Nombre del usuario dueño de los videos.')
+@click.option('--formato', type=click.Choice(['csv', 'jsonl', 'urls']),
+              help='Por defecto se deduce de la extensión del archivo.')
+@click.option('--lote', default=1000, show_default=True, help='Filas por transacción.')
+def importar(archivo, usuario, formato, lote):
+    """Importa videos desde un CSV, un JSONL o una lista de URLs ('-' lee la entrada estándar)."""
+    from models import User
+    from utils_importacion import formato_de, importar_videos, leer_filas
+
+    dueno = User.query.filter_by(username=usuario).first()
+    if dueno is None:
+        raise click.ClickException(f'No existe el usuario {usuario}.')
+    filas = leer_filas(archivo, formato_de(archivo.name, formato))
+    progreso = importar_videos(filas, dueno.id, lote,
+                               al_avanzar=lambda p: click.echo(p, err=True))
+    click.echo(f'Importación terminada: {progreso}')
+
+
+@bp.cli.command('export')
+@click.argument('archivo', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--usuario', help='Solo los videos de este usuario.')
+@click.option('--formato', type=click.Choice(['csv', 'jsonl', 'urls']),
+              help='Por defecto se deduce de la extensión del archivo.')
+@click.option('--lote', default=1000, show_default=True, help='Filas leídas por consulta.')
+def exportar(archivo, usuario, formato, lote):
+    """Exporta los videos a un CSV, un JSONL o una lista de URLs ('-' escribe en la salida estándar)."""
+    import time
+
+    from models import User
+    from utils_importacion import escribir_videos, formato_de, videos_para_exportar
+
+    user_id = None
+    if usuario:
+        dueno = User.query.filter_by(username=usuario).first()
+        if dueno is None:
+            raise click.ClickException(f'No existe el usuario {usuario}.')
+        user_id = dueno.id
+    usuarios = dict(db.session.query(User.id, User.username))
+    inicio = time.perf_counter()
+    total = escribir_videos(videos_para_exportar(user_id, lote), archivo,
+                            formato_de(archivo.name, formato), usuarios)
+    segundos = time.perf_counter() - inicio
+    click.echo(f'{total} videos exportados en {segundos:.2f} s '
+               f'({total / max(segundos, 1e-9):,.0f} filas/s).', err=True)
+
+
+@bp.cli.command('purgar-eliminados')
+def purgar_eliminados():
+    """Borra el registro de videos eliminados más antiguo que CAMBIOS_RETENCION_DIAS."""
+    from datetime import datetime, timedelta
+
+    from models import VideoEliminado
+
+    limite = datetime.utcnow() - timedelta(days=current_app.config['CAMBIOS_RETENCION_DIAS'])
+    borrados = VideoEliminado.query.filter(
+        VideoEliminado.fecha_eliminacion < limite).delete(synchronize_session=False)
+    db.session.commit()
+    click.echo(f'{borrados} registros de videos eliminados purgados.')
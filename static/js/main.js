@@ -1,22 +1,48 @@
-$(document).ready(function () {
+// Modo día/noche: sin jQuery para no cargar una librería por un botón
+function alCargar(funcion) {
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', funcion);
+  } else {
+    funcion();
+  }
+}
+
+alCargar(function () {
   // Verifica si ya se ha seleccionado un modo previamente
   const savedMode = localStorage.getItem('mode');
 
   // Aplica el modo guardado si existe, o establece el modo de día como predeterminado
-  if (savedMode === 'night-mode') {
-    $('body').addClass('night-mode');
-  } else {
-    $('body').addClass('day-mode');
-
-  }
+  document.body.classList.add(savedMode === 'night-mode' ? 'night-mode' : 'day-mode');
 
   // Al hacer clic en el botón de cambio de modo
-  $('#toggle-mode').click(function () {
+  const boton = document.getElementById('toggle-mode');
+  if (!boton) {
+    return;
+  }
+  boton.addEventListener('click', function () {
     // Alterna las clases CSS en el elemento <body>
-    $('body').toggleClass('day-mode night-mode');
+    document.body.classList.toggle('day-mode');
+    document.body.classList.toggle('night-mode');
 
-    // Guarda la preferencia de modo en una cookie
-    const currentMode = $('body').hasClass('night-mode') ? 'night-mode' : 'day-mode';
+    // Guarda la preferencia de modo en localStorage
+    const currentMode = document.body.classList.contains('night-mode') ? 'night-mode' : 'day-mode';
     localStorage.setItem('mode', currentMode);
   });
 });
+
+// Fachada de videos: el iframe de YouTube se crea solo al hacer clic
+document.addEventListener('click', function (event) {
+  const fachada = event.target.closest('.video-facade');
+  if (!fachada) {
+    return;
+  }
+  const iframe = document.createElement('iframe');
+  iframe.className = fachada.dataset.clase;
+  iframe.src = fachada.dataset.embed;
+  iframe.width = '100%';
+  iframe.height = fachada.style.height;
+  iframe.setAttribute('frameborder', '0');
+  iframe.setAttribute('allow', 'autoplay; encrypted-media; picture-in-picture');
+  iframe.setAttribute('allowfullscreen', '');
+  fachada.replaceWith(iframe);
+});
@@ -0,0 +1,116 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from app import create_app  # noqa: E402
+from extensiones import db  # noqa: E402
+from models import User, Video  # noqa: E402
+
+
+def crear_app_de_pruebas(tmp_path, **overrides):
+    """Aplicación sobre una base SQLite temporal, sin hilos ni procesos de fondo."""
+    opciones = dict(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "pruebas.db"}',
+        DATABASE_REPLICAS=[],
+        CACHE_DIR=str(tmp_path / 'cache'),
+        # Hash barato y en la misma petición: las pruebas no miden contraseñas
+        CONTRASENA_METODO='pbkdf2:sha256:1',
+        CONTRASENA_PROCESOS=0,
+        SHEETS_HILO=False,
+        SHEETS_FALSO=True,
+    )
+    opciones.update(overrides)
+    return create_app(**opciones)
+
+
+def cerrar_conexiones(app):
+    with app.app_context():
+        for motor in app.extensions['sqlalchemy'].engines.values():
+            motor.dispose()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicación de pruebas con las tablas creadas por db.create_all()."""
+    app = crear_app_de_pruebas(tmp_path)
+    with app.app_context():
+        db.create_all()
+    yield app
+    cerrar_conexiones(app)
+
+
+@pytest.fixture
+def app_vacia(tmp_path):
+    """Aplicación de pruebas sin tablas, para llevarla con migrar()."""
+    app = crear_app_de_pruebas(tmp_path)
+    yield app
+    cerrar_conexiones(app)
+
+
+@pytest.fixture
+def app_con_replica(tmp_path):
+    """
+    Aplicación de pruebas con una réplica de lectura en otro archivo SQLite,
+    que se actualiza con "flask replicas copiar".
+    """
+    app = crear_app_de_pruebas(
+        tmp_path, DATABASE_REPLICAS=[f'sqlite:///{tmp_path / "replica.db"}'])
+    with app.app_context():
+        db.create_all()
+    yield app
+    cerrar_conexiones(app)
+    # db es global: sin esto, create_all() de las pruebas siguientes buscaría
+    # el bind de la réplica en aplicaciones que no lo tienen
+    for clave in app.extensions['replicas']:
+        db.metadatas.pop(clave, None)
+
+
+@pytest.fixture
+def migrar(app_vacia):
+    """
+    Función que aplica las migraciones de Alembic a la base de app_vacia
+    hasta la revisión indicada ('head' por omisión).
+    """
+    from flask_migrate import Migrate, upgrade
+    Migrate(app_vacia, db, directory=os.path.join(RAIZ, 'migrations'))
+
+    def migrar(revision='head'):
+        with app_vacia.app_context():
+            upgrade(revision=revision)
+    return migrar
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def videos(app):
+    """
+    Tres usuarios (u0, u1, u2 con contraseña 'x') con 40 videos repartidos
+    entre ellos. Devuelve los ids de los usuarios.
+    """
+    with app.app_context():
+        usuarios = []
+        for numero in range(3):
+            usuario = User(username=f'u{numero}')
+            usuario.set_password('x')
+            db.session.add(usuario)
+            usuarios.append(usuario)
+        db.session.commit()
+        for numero in range(40):
+            db.session.add(Video(
+                title=f'Programación título {numero}', description=f'descripción número {numero}',
+                youtube_url=f'https://www.youtube.com/watch?v=abcdefghi{numero:02d}',
+                video_id=f'abcdefghi{numero:02d}', user_id=usuarios[numero % 3].id,
+                fecha_creacion=datetime(2024, 1, 1) + timedelta(hours=numero)))
+        db.session.commit()
+        return [usuario.id for usuario in usuarios]
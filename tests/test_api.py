@@ -0,0 +1,62 @@
+from extensiones import db
+from models import Video
+
+
+def test_fields_elige_los_campos(client, videos):
+    datos = client.get('/api/v1/videos?fields=id,title,usuario&por_pagina=2').get_json()
+    assert [sorted(video) for video in datos['videos']] == [['id', 'title', 'usuario']] * 2
+    assert datos['videos'][0] == {'id': 40, 'title': 'Programación título 39',
+                                  'usuario': {'id': videos[39 % 3], 'username': 'u0'}}
+
+    respuesta = client.get('/api/v1/videos?fields=id,secreto')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['error'] == 'campo_no_valido'
+    assert 'secreto' in respuesta.get_json()['mensaje']
+    assert client.get('/api/v1/videos/1?fields=,').status_code == 400
+
+
+def test_el_cursor_recorre_todas_las_paginas(client, videos):
+    vistos, url, paginas = [], '/api/v1/videos?fields=id&por_pagina=15', 0
+    while url:
+        respuesta = client.get(url)
+        vistos += [video['id'] for video in respuesta.get_json()['videos']]
+        paginas += 1
+        enlace = respuesta.headers.get('Link', '')
+        url = enlace.split('>')[0].lstrip('<') if 'rel="next"' in enlace else None
+    assert paginas == 3
+    assert vistos == list(range(40, 0, -1))
+
+    # Los cursores del cuerpo son los mismos que los de la cabecera Link
+    primera = client.get('/api/v1/videos?fields=id&por_pagina=15&orden=asc')
+    siguiente = primera.get_json()['siguiente']
+    segunda = client.get(f'/api/v1/videos?fields=id&por_pagina=15&orden=asc&cursor={siguiente}')
+    assert f'cursor={siguiente}' in primera.headers['Link']
+    assert [video['id'] for video in segunda.get_json()['videos']] == list(range(16, 31))
+
+
+def test_etag_y_if_none_match(app, client, videos):
+    url = '/api/v1/videos?fields=id,title&por_pagina=5'
+    primera = client.get(url)
+    etag = primera.headers['ETag']
+    assert primera.status_code == 200 and etag
+    assert client.get(url).headers['ETag'] == etag
+    # Otros campos o tamaño de página son otra representación
+    assert client.get('/api/v1/videos?fields=id&por_pagina=5').headers['ETag'] != etag
+    assert client.get('/api/v1/videos?fields=id,title&por_pagina=6').headers['ETag'] != etag
+
+    respuesta = client.get(url, headers={'If-None-Match': etag})
+    assert respuesta.status_code == 304
+    assert respuesta.get_data() == b''
+    assert respuesta.headers['ETag'] == etag
+
+    # Al editar un video de la página cambia el ETag y vuelve el cuerpo
+    with app.app_context():
+        db.session.get(Video, 40).title = 'Editado'
+        db.session.commit()
+    respuesta = client.get(url, headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['videos'][0]['title'] == 'Editado'
+
+    detalle = client.get('/api/v1/videos/40')
+    assert client.get('/api/v1/videos/40', headers={
+        'If-None-Match': detalle.headers['ETag']}).status_code == 304
@@ -0,0 +1,49 @@
+from extensiones import db
+from models import Video
+
+
+def nuevo_video(user_id, video_id):
+    video = Video(title=f'Video {video_id}', youtube_url=f'https://youtu.be/{video_id}',
+                  video_id=video_id, user_id=user_id)
+    db.session.add(video)
+    db.session.commit()
+    return video.id
+
+
+def sincronizar(client, espejo, token=None):
+    """Aplica el feed página por página como lo haría un cliente."""
+    while True:
+        datos = client.get('/api/v1/videos/changes', query_string={
+            'limite': 1, **({'since': token} if token else {})}).get_json()
+        for video_id in datos['eliminados']:
+            espejo.pop(video_id, None)
+        for video in datos['videos']:
+            espejo[video['id']] = video['title']
+        token = datos['siguiente']
+        if not datos['hay_mas']:
+            return token
+
+
+def test_el_id_de_un_video_eliminado_no_se_reutiliza(app, videos):
+    with app.app_context():
+        ultimo = nuevo_video(videos[0], 'zzzzzzzzz01')
+        db.session.delete(db.session.get(Video, ultimo))
+        db.session.commit()
+        assert nuevo_video(videos[0], 'zzzzzzzzz02') > ultimo
+
+
+def test_el_espejo_no_borra_un_video_vivo(app, client, videos):
+    app.config['CAMBIOS_MARGEN_SEGUNDOS'] = 0
+    espejo = {}
+    token = sincronizar(client, espejo)
+
+    with app.app_context():
+        ultimo = nuevo_video(videos[0], 'zzzzzzzzz01')
+        db.session.delete(db.session.get(Video, ultimo))
+        db.session.commit()
+        nuevo = nuevo_video(videos[0], 'zzzzzzzzz02')
+        vivos = {video.id: video.title for video in Video.query}
+    sincronizar(client, espejo, token)
+
+    assert espejo[nuevo] == 'Video zzzzzzzzz02'
+    assert espejo == vivos
@@ -0,0 +1,59 @@
+import hashlib
+import io
+import os
+
+from PIL import Image
+
+from extensiones import db
+from models import User
+
+
+def png(color, tamano=(600, 400)):
+    salida = io.BytesIO()
+    Image.new('RGB', tamano, color).save(salida, 'PNG')
+    return salida.getvalue()
+
+
+def subir(client, usuario, contenido, nombre):
+    client.post('/login', data={'username': usuario, 'password': 'x'})
+    respuesta = client.post('/edit_profile', content_type='multipart/form-data', data={
+        'username': usuario, 'description': '',
+        'profile_picture': (io.BytesIO(contenido), nombre)})
+    client.get('/logout')
+    return respuesta
+
+
+def test_la_imagen_se_guarda_por_contenido_con_miniaturas(app, client, videos, tmp_path):
+    carpeta = tmp_path / 'uploads'
+    app.config.update(UPLOAD_FOLDER=str(carpeta), AVATAR_HILO=False, AVATAR_TAMANOS=[128])
+    imagen = png('red')
+    original = hashlib.sha256(imagen).hexdigest() + '.png'
+
+    # El nombre y la extensión del cliente no importan, sí el contenido
+    assert subir(client, 'u0', imagen, 'foto.txt').status_code == 302
+    assert subir(client, 'u1', imagen, 'otra.gif').status_code == 302
+    with app.app_context():
+        fotos = {u.username: u.profile_picture for u in User.query}
+    assert fotos['u0'] == fotos['u1'] == f'/uploads/{original}'
+    base = original.split('.')[0]
+    assert sorted(os.listdir(carpeta)) == sorted(
+        [original, f'{base}.128.jpg', f'{base}.128.webp'])
+    with Image.open(carpeta / f'{base}.128.webp') as miniatura:
+        assert miniatura.size == (128, 128)
+
+    respuesta = client.get(f'/uploads/{base}.128.jpg')
+    assert respuesta.status_code == 200
+    assert respuesta.cache_control.immutable and respuesta.cache_control.max_age == 365 * 24 * 3600
+    assert respuesta.headers['X-Content-Type-Options'] == 'nosniff'
+
+
+def test_un_archivo_que_no_es_imagen_se_rechaza(app, client, videos, tmp_path):
+    carpeta = tmp_path / 'uploads'
+    app.config.update(UPLOAD_FOLDER=str(carpeta), AVATAR_HILO=False)
+
+    respuesta = subir(client, 'u0', b'<?php echo "hola"; ?>', 'foto.png')
+
+    assert respuesta.status_code == 200
+    with app.app_context():
+        assert db.session.get(User, videos[0]).profile_picture is None
+    assert not carpeta.exists() or not [n for n in os.listdir(carpeta) if not n.startswith('.')]
@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, text
+
+from extensiones import db
+from models import Video
+
+
+def buscar(client, consulta):
+    return client.get('/search', query_string={'query': consulta}).get_data(as_text=True)
+
+
+def test_el_indice_sigue_a_los_videos(app, client, videos):
+    with app.app_context():
+        video = db.session.get(Video, 1)
+        video.title = 'Tutorial de mecanografía'
+        db.session.commit()
+    assert 'Tutorial de mecanografía' in buscar(client, 'mecanografia')
+
+    with app.app_context():
+        db.session.delete(db.session.get(Video, 1))
+        db.session.commit()
+    assert 'Tutorial de mecanografía' not in buscar(client, 'mecanografia')
+
+
+def test_una_base_sin_indice_lo_recibe_al_migrar(app_vacia, migrar):
+    # Una base que quedó en la revisión anterior al índice, sin video_fts
+    migrar('d5f7a9c1e3b4')
+    with app_vacia.app_context(), db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO \"user\" (username, password_hash) VALUES ('u0', 'x')"))
+        conexion.execute(text(
+            "INSERT INTO video (title, youtube_url, video_id, user_id) VALUES "
+            "('Curso de mecanografía', 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1)"))
+        assert 'video_fts' not in inspect(conexion).get_table_names()
+    migrar()
+
+    client = app_vacia.test_client()
+    for _ in range(2):
+        respuesta = client.get('/search', query_string={'query': 'mecanografia'})
+        assert respuesta.status_code == 200
+        assert 'Curso de mecanografía' in respuesta.get_data(as_text=True)
+
+    with app_vacia.app_context():
+        db.session.add(Video(title='Mecanografía avanzada', youtube_url='https://youtu.be/abcdefghi02',
+                             video_id='abcdefghi02', user_id=1))
+        db.session.commit()
+    assert 'Mecanografía avanzada' in buscar(client, 'mecanografia')
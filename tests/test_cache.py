@@ -0,0 +1,41 @@
+import os
+
+from utils_cache import CacheArchivos
+
+
+def test_parametros_ignorados_no_crean_entradas(app, client):
+    app.extensions['cache_respuestas'].clear()
+    for numero in range(20):
+        assert client.get(f'/cursos?x={numero}').status_code == 200
+    cache = app.extensions['cache_respuestas']
+    assert cache.fallos == 1
+    assert cache.aciertos == 19
+
+
+def test_cache_archivos_respeta_max_items(tmp_path):
+    cache = CacheArchivos(str(tmp_path), max_items=3)
+    for numero in range(10):
+        cache.set(f'clave{numero}', b'x' * 100, 60)
+    assert len(os.listdir(tmp_path)) == 3
+    assert cache.get('clave9') == b'x' * 100
+
+
+def test_cache_archivos_respeta_max_bytes(tmp_path):
+    cache = CacheArchivos(str(tmp_path), max_bytes=5000)
+    for numero in range(20):
+        cache.set(f'clave{numero}', b'x' * 1000, 60)
+    total = sum(os.path.getsize(tmp_path / nombre) for nombre in os.listdir(tmp_path))
+    assert total <= 5000
+
+
+def test_cache_archivos_descarta_la_menos_usada(tmp_path):
+    cache = CacheArchivos(str(tmp_path), max_items=2)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    # Leer 'a' la marca como reciente: al llenarse se descarta 'b'
+    os.utime(cache._ruta('a'), (0, 0))
+    os.utime(cache._ruta('b'), (1, 1))
+    assert cache.get('a') == 1
+    cache.set('c', 3, 60)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
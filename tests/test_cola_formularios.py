@@ -0,0 +1,130 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensiones import db
+from models import EnvioFormulario
+from utils_cola_formularios import ColaFormularios, HojaEnMemoria, cola_formularios
+
+
+class HojaQueFalla(HojaEnMemoria):
+    """Hoja falsa que falla las primeras `fallas` llamadas."""
+
+    def __init__(self, fallas):
+        super().__init__()
+        self.fallas = fallas
+
+    def append_rows(self, filas, value_input_option=None):
+        if self.fallas:
+            self.fallas -= 1
+            self.llamadas += 1
+            raise ConnectionError('API no disponible')
+        super().append_rows(filas, value_input_option)
+
+
+def fila(numero):
+    return ['Ana', 'Pérez', f'ana{numero}@ejemplo.com', '555', 'Hola', '2024-01-01 10:00:00']
+
+
+def vencer_esperas():
+    # Como si hubiera pasado el tiempo de espera de todos los envíos
+    EnvioFormulario.query.update({'proximo_intento': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+
+@pytest.fixture
+def cola(app):
+    with app.app_context():
+        yield cola_formularios
+
+
+def test_el_formulario_se_encola_sin_llamar_a_la_api(app, client, cola):
+    respuesta = client.post('/handle_formulario', data={
+        'nombre': 'Ana', 'apellido': 'Pérez', 'email': 'ana@ejemplo.com',
+        'telefono': '555', 'mensaje': 'Hola'})
+    assert respuesta.status_code == 302
+    assert cola.profundidad() == 1
+    assert cola._hoja.llamadas == 0
+
+
+def test_los_envios_salen_en_un_solo_lote(app, cola):
+    for numero in range(5):
+        cola.encolar(fila(numero))
+    # Sin un lote completo no se despierta al hilo antes del intervalo
+    assert not cola._despertar.is_set()
+
+    assert cola.vaciar() == 5
+    assert cola._hoja.llamadas == 1
+    assert [f[2] for f in cola._hoja.filas] == [f'ana{n}@ejemplo.com' for n in range(5)]
+    assert cola.profundidad() == 0
+
+
+def test_un_lote_completo_despierta_al_hilo(app, cola):
+    app.config['SHEETS_TAMANIO_LOTE'] = 3
+    cola._despertar.clear()
+    cola.encolar(fila(0))
+    cola.encolar(fila(1))
+    assert not cola._despertar.is_set()
+    cola.encolar(fila(2))
+    assert cola._despertar.is_set()
+
+    assert cola.vaciar() == 3
+    assert cola._hoja.llamadas == 1
+
+
+def test_reintento_con_espera_exponencial(app, cola):
+    cola._hoja = HojaQueFalla(fallas=2)
+    cola.encolar(fila(0))
+
+    esperas = []
+    for intentos in (1, 2):
+        antes = datetime.utcnow()
+        assert cola.vaciar() == 0
+        envio = EnvioFormulario.query.one()
+        assert envio.intentos == intentos
+        assert 'API no disponible' in envio.ultimo_error
+        esperas.append((envio.proximo_intento - antes).total_seconds())
+        # Mientras dura la espera no se vuelve a intentar
+        assert cola.vaciar() == 0
+        assert cola._hoja.llamadas == intentos
+        vencer_esperas()
+
+    base = app.config['SHEETS_REINTENTO_BASE']
+    assert base * 2 * 0.8 <= esperas[0] <= base * 2 * 1.2
+    assert base * 4 * 0.8 <= esperas[1] <= base * 4 * 1.2
+
+    assert cola.vaciar() == 1
+    assert cola._hoja.filas == [fila(0)]
+    assert cola.profundidad() == 0
+
+
+def test_nada_se_pierde_al_reiniciar(app, cola):
+    for numero in range(3):
+        cola.encolar(fila(numero))
+    # Un proceso reservó un lote y se detuvo antes de enviarlo
+    lote = cola._reservar_lote()
+    assert len(lote) == 3
+
+    # Otro proceso (una cola nueva sobre la misma base) lo envía cuando
+    # vence la reserva
+    nueva = ColaFormularios(app)
+    assert nueva.vaciar() == 0
+    vencer_esperas()
+    assert nueva.vaciar() == 3
+    assert [f[2] for f in nueva._hoja.filas] == [f'ana{n}@ejemplo.com' for n in range(3)]
+    assert nueva.profundidad() == 0
+
+
+def test_el_hilo_vacia_la_cola_al_arrancar(app, cola):
+    cola.encolar(fila(0))
+    # Una cola propia: su hilo queda ligado a esta aplicación
+    app.config.update(SHEETS_HILO=True, SHEETS_INTERVALO=3600)
+    nueva = ColaFormularios(app)
+    nueva.iniciar()
+    for _ in range(50):
+        if nueva._hoja.filas:
+            break
+        time.sleep(0.1)
+    assert nueva._hoja.filas == [fila(0)]
+    assert cola.profundidad() == 0
@@ -0,0 +1,39 @@
+import pytest
+
+from utils_consultas import PresupuestoConsultasExcedido
+
+# Listados con @presupuesto_consultas(): con TESTING, pasarse del
+# presupuesto lanza PresupuestoConsultasExcedido y la prueba falla
+LISTADOS = [
+    '/index',
+    '/index?orden=asc&por_pagina=60',
+    '/blog',
+    '/search?query=programacion',
+    '/api/v1/videos',
+    '/api/v1/videos?fields=id,title,usuario,embed_url',
+]
+
+
+@pytest.mark.parametrize('ruta', LISTADOS)
+def test_listados_dentro_del_presupuesto(client, videos, ruta):
+    assert client.get(ruta).status_code == 200
+
+
+def test_mis_videos_dentro_del_presupuesto(client, videos):
+    client.post('/login', data={'username': 'u0', 'password': 'x'})
+    assert client.get('/mis_videos').status_code == 200
+    # Segunda petición: el usuario sale de la caché de usuarios
+    assert client.get('/mis_videos?por_pagina=60').status_code == 200
+
+
+def test_pasarse_del_presupuesto_falla(app, client, videos):
+    # /index necesita al menos una consulta
+    app.config['PRESUPUESTO_CONSULTAS'] = 0
+    with pytest.raises(PresupuestoConsultasExcedido):
+        client.get('/index')
+
+
+def test_cada_peticion_cuenta_desde_cero(app, client, videos):
+    # El contador vive en g: no se arrastra de una petición a la siguiente
+    for _ in range(5):
+        assert client.get('/index').status_code == 200
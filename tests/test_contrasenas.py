@@ -0,0 +1,42 @@
+from extensiones import db
+from models import User
+
+
+def hash_de(app, user_id):
+    with app.app_context():
+        return db.session.get(User, user_id).password_hash
+
+
+def test_al_iniciar_sesion_se_actualiza_el_hash(app, client, videos):
+    assert hash_de(app, videos[0]).startswith('pbkdf2:sha256:1$')
+    app.config['CONTRASENA_METODO'] = 'pbkdf2:sha256:2'
+
+    # Una contraseña incorrecta no toca el hash
+    client.post('/login', data={'username': 'u0', 'password': 'otra'})
+    assert hash_de(app, videos[0]).startswith('pbkdf2:sha256:1$')
+
+    assert client.post('/login', data={'username': 'u0', 'password': 'x'}).status_code == 302
+    assert hash_de(app, videos[0]).startswith('pbkdf2:sha256:2$')
+    client.get('/logout')
+    assert client.post('/login', data={'username': 'u0', 'password': 'x'}).status_code == 302
+
+
+def test_los_hashes_se_calculan_en_otro_proceso_y_se_limita_la_espera(app, client, videos):
+    contrasenas = app.extensions['contrasenas']
+    app.config.update(CONTRASENA_PROCESOS=1, CONTRASENA_COLA=0, CONTRASENA_PRIORIDAD=0)
+    contrasenas.init_app(app)
+    try:
+        assert client.post('/login', data={'username': 'u0', 'password': 'x'}).status_code == 302
+        assert contrasenas._ejecutor is not None
+        client.get('/logout')
+
+        # Con el único lugar ocupado, la petición no espera: 503 con Retry-After
+        contrasenas._lugares.acquire()
+        respuesta = client.post('/login', data={'username': 'u1', 'password': 'x'})
+        assert respuesta.status_code == 503
+        assert respuesta.headers['Retry-After'] == '1'
+        contrasenas._lugares.release()
+        assert client.post('/login', data={'username': 'u1', 'password': 'x'}).status_code == 302
+    finally:
+        contrasenas._ejecutor.shutdown()
+        contrasenas._ejecutor = None
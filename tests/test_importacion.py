@@ -0,0 +1,31 @@
+import io
+import json
+
+from extensiones import db
+from models import Video
+from utils_importacion import importar_videos, leer_filas
+
+
+def test_lineas_jsonl_no_validas_se_cuentan(app, videos):
+    archivo = io.StringIO('\n'.join([
+        json.dumps({'title': 'Uno', 'url': 'https://youtu.be/zzzzzzzzz01'}),
+        '{"title": "roto", ',
+        '["una", "lista"]',
+        '42',
+        json.dumps({'title': 7, 'description': None, 'url': 'https://youtu.be/zzzzzzzzz02'}),
+        '',
+    ]))
+    with app.app_context():
+        progreso = importar_videos(leer_filas(archivo, 'jsonl'), videos[0])
+        assert (progreso.leidos, progreso.insertados, progreso.invalidos) == (5, 2, 3)
+        assert db.session.query(Video).filter_by(title='7').count() == 1
+
+
+def test_import_desde_la_linea_de_comandos(app, videos, tmp_path):
+    ruta = tmp_path / 'videos.jsonl'
+    ruta.write_text('no es json\n' + json.dumps({'url': 'https://youtu.be/zzzzzzzzz03'}) + '\n',
+                    encoding='utf-8')
+    resultado = app.test_cli_runner().invoke(args=['videos', 'import', str(ruta), '--usuario', 'u0'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '1 insertados' in resultado.output
+    assert '1 no válidos' in resultado.output
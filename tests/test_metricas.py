@@ -0,0 +1,62 @@
+import os
+import pickle
+import subprocess
+
+from utils_metricas import Metricas
+
+
+def valor(texto, linea):
+    for renglon in texto.splitlines():
+        if renglon.startswith(linea + ' '):
+            return float(renglon.split()[-1])
+    return 0.0
+
+
+def test_sin_token_no_se_expone_en_produccion(app, client):
+    app.config['TESTING'] = False
+    assert client.get('/metrics').status_code == 404
+
+
+def test_con_token(app, client):
+    app.config.update(TESTING=False, METRICAS_TOKEN='secreto')
+    assert client.get('/metrics').status_code == 401
+    respuesta = client.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+    assert respuesta.status_code == 200
+
+
+def guardar_proceso(directorio, pid, peticiones):
+    """Deja en el directorio los números de otro proceso con `peticiones` a /index."""
+    otro = Metricas()
+    for _ in range(peticiones):
+        otro.peticiones.sumar(('videos.index', 'GET', '200'))
+        otro.duracion.observar(0.01, ('videos.index', 'GET'))
+    estado = {'metricas': [metrica.estado() for metrica in otro.metricas],
+              'caches': {'cache_respuestas': (peticiones, 1)}}
+    with open(os.path.join(directorio, f'{pid}-1.pickle'), 'wb') as archivo:
+        pickle.dump(estado, archivo)
+
+
+def test_suma_los_procesos_de_gunicorn(app, client, videos, tmp_path):
+    directorio = tmp_path / 'metricas'
+    directorio.mkdir()
+    metricas = app.extensions['metricas']
+    metricas.directorio = str(directorio)
+    terminado = subprocess.Popen(['true'])
+    terminado.wait()
+    guardar_proceso(directorio, os.getppid(), 3)
+    guardar_proceso(directorio, terminado.pid, 5)
+    # Los números de este proceso incluyen los de las pruebas anteriores
+    antes = metricas.peticiones.estado().get(('videos.index', 'GET', '200'), 0)
+    client.get('/index')
+
+    serie = 'peticiones_total{endpoint="videos.index",metodo="GET",estado="200"}'
+    histograma = 'peticion_duracion_segundos_count{endpoint="videos.index",metodo="GET"}'
+    for _ in range(2):
+        texto = client.get('/metrics').get_data(as_text=True)
+        assert valor(texto, serie) == antes + 1 + 3 + 5
+        assert valor(texto, histograma) == antes + 1 + 3 + 5
+        assert valor(texto, 'cache_aciertos_total{cache="cache_respuestas"}') >= 3 + 5
+
+    # El proceso que terminó quedó junto con los demás terminados
+    assert sorted(n for n in os.listdir(directorio) if not n.startswith('.')) == [
+        f'{os.getppid()}-1.pickle', 'terminados.pickle']
@@ -0,0 +1,55 @@
+from sqlalchemy import text
+
+from extensiones import db
+from models import Video, VideoEliminado
+
+
+def test_la_restriccion_unica_fusiona_los_videos_repetidos(app_vacia, migrar):
+    migrar('e7d2b9a4c615')
+    with app_vacia.app_context(), db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO \"user\" (id, username, password_hash) VALUES (1, 'u0', 'x'), (2, 'u1', 'x')"))
+        conexion.execute(text(
+            "INSERT INTO video (id, title, description, youtube_url, video_id, user_id) VALUES "
+            "(1, 'Original', NULL, 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1), "
+            "(2, 'Copia', 'Primera descripción', 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1), "
+            "(3, 'Otra copia', 'Segunda', 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1), "
+            "(4, 'De otro usuario', NULL, 'https://youtu.be/abcdefghi01', 'abcdefghi01', 2), "
+            "(5, 'Con descripción', 'Propia', 'https://youtu.be/abcdefghi02', 'abcdefghi02', 1), "
+            "(6, 'Copia', 'Ajena', 'https://youtu.be/abcdefghi02', 'abcdefghi02', 1)"))
+
+    migrar('f1a6c3e8d092')
+
+    with app_vacia.app_context(), db.engine.connect() as conexion:
+        filas = conexion.execute(text(
+            "SELECT id, title, description FROM video ORDER BY id")).all()
+    assert [tuple(fila) for fila in filas] == [
+        (1, 'Original', 'Primera descripción'),
+        (4, 'De otro usuario', None),
+        (5, 'Con descripción', 'Propia'),
+    ]
+    # El resto de la cadena sigue aplicándose sobre la base fusionada
+    migrar()
+
+
+def test_borrar_videos_con_la_base_a_medio_migrar(app_vacia, migrar):
+    # Antes de video_eliminado y del índice de búsqueda
+    migrar('e7d2b9a4c615')
+    with app_vacia.app_context(), db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO \"user\" (id, username, password_hash) VALUES (1, 'u0', 'x')"))
+        conexion.execute(text(
+            "INSERT INTO video (id, title, description, youtube_url, video_id, user_id) VALUES "
+            "(1, 'Original', NULL, 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1), "
+            "(2, 'Copia', 'Descripción', 'https://youtu.be/abcdefghi01', 'abcdefghi01', 1)"))
+
+    resultado = app_vacia.test_cli_runner().invoke(args=['videos', 'deduplicar'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '1 videos eliminados' in resultado.output
+
+    # Al terminar de migrar, los borrados vuelven a quedar en el feed
+    migrar()
+    with app_vacia.app_context():
+        db.session.delete(db.session.get(Video, 1))
+        db.session.commit()
+        assert [fila.video_id for fila in VideoEliminado.query] == [1]
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from extensiones import db
+from models import Video
+from utils_paginacion import link_header, paginar_keyset, paginar_peticion
+
+COLUMNAS = [Video.fecha_creacion, Video.id]
+
+
+def recorrer(cursor_de, orden='desc', por_pagina=7):
+    """Sigue los cursores desde la primera página y devuelve los ids vistos por página."""
+    paginas, cursor = [], None
+    while True:
+        pagina = paginar_keyset(Video.query, COLUMNAS, orden, cursor, por_pagina)
+        paginas.append([video.id for video in pagina])
+        cursor = cursor_de(pagina)
+        if cursor is None:
+            return paginas, pagina
+
+
+def test_siguiente_y_anterior_recorren_todo_sin_repetir(app, videos):
+    with app.app_context():
+        esperados = [v.id for v in Video.query.order_by(Video.fecha_creacion.desc(), Video.id.desc())]
+        paginas, ultima = recorrer(lambda pagina: pagina.siguiente)
+        assert sum(paginas, []) == esperados
+        assert [len(p) for p in paginas] == [7, 7, 7, 7, 7, 5]
+
+        # Desde la última página, "anterior" vuelve por las mismas páginas
+        vueltas, cursor = [], ultima.anterior
+        while cursor:
+            pagina = paginar_keyset(Video.query, COLUMNAS, 'desc', cursor, 7)
+            vueltas.append([video.id for video in pagina])
+            cursor = pagina.anterior
+        assert vueltas == paginas[-2::-1]
+
+
+def test_orden_ascendente(app, videos):
+    with app.app_context():
+        paginas, _ = recorrer(lambda pagina: pagina.siguiente, orden='asc')
+        ids = sum(paginas, [])
+        assert ids == sorted(ids)
+        assert len(ids) == 40
+        # Un orden desconocido se trata como descendente
+        primera = paginar_keyset(Video.query, COLUMNAS, 'cualquiera', None, 3)
+        assert primera.orden == 'desc' and [v.id for v in primera] == [40, 39, 38]
+
+
+def test_cursor_mal_formado_vuelve_a_la_primera_pagina(app, videos):
+    with app.app_context():
+        primera = [v.id for v in paginar_keyset(Video.query, COLUMNAS, 'desc', None, 5)]
+        for cursor in ('no-es-base64!', 'e30', 'eyJkIjoieCIsImsiOlsxLDJdfQ'):
+            pagina = paginar_keyset(Video.query, COLUMNAS, 'desc', cursor, 5)
+            assert [v.id for v in pagina] == primera
+            assert pagina.anterior is None
+
+
+def test_fechas_iguales_se_desempatan_por_id(app, videos):
+    with app.app_context():
+        Video.query.update({Video.fecha_creacion: datetime(2024, 1, 1)})
+        db.session.commit()
+        paginas, _ = recorrer(lambda pagina: pagina.siguiente, por_pagina=6)
+        assert sum(paginas, []) == list(range(40, 0, -1))
+
+
+def test_link_header_con_la_peticion(app, videos):
+    with app.test_request_context('/?por_pagina=1000'):
+        assert paginar_peticion(Video.query, COLUMNAS).por_pagina == app.config['VIDEOS_POR_PAGINA_MAX']
+
+    with app.test_request_context('/?por_pagina=25&orden=asc'):
+        pagina = paginar_peticion(Video.query, COLUMNAS)
+        assert pagina.orden == 'asc' and pagina.anterior is None
+        assert link_header(pagina, lambda c: f'/x?cursor={c}') == \
+            f'</x?cursor={pagina.siguiente}>; rel="next"'
+
+    with app.test_request_context(f'/?por_pagina=25&orden=asc&cursor={pagina.siguiente}'):
+        pagina = paginar_peticion(Video.query, COLUMNAS)
+        enlaces = link_header(pagina, lambda c: f'/x?cursor={c}')
+        assert pagina.siguiente is None
+        assert enlaces == f'</x?cursor={pagina.anterior}>; rel="prev"'
+
+    with app.test_request_context('/'):
+        vacia = paginar_peticion(Video.query.filter(Video.id < 0), COLUMNAS)
+        assert link_header(vacia, lambda c: c) is None
@@ -0,0 +1,106 @@
+"""
+EXPLAIN QUERY PLAN de los listados sobre el esquema que dejan las
+migraciones: ninguna consulta filtrada debe recorrer video (o
+video_eliminado) completa ni ordenar en memoria.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from extensiones import db
+from models import User, Video
+
+# Las tablas video y video_eliminado, no el índice de texto completo video_fts
+DESDE_TABLAS = re.compile(r'\bFROM (video|video_eliminado)\b(?!_fts)')
+
+
+@pytest.fixture
+def app_migrada(app_vacia, migrar):
+    migrar()
+    with app_vacia.app_context():
+        usuarios = []
+        for numero in range(3):
+            usuario = User(username=f'u{numero}')
+            usuario.set_password('x')
+            db.session.add(usuario)
+            usuarios.append(usuario)
+        db.session.commit()
+        for numero in range(300):
+            db.session.add(Video(
+                title=f'Video {numero}', description=f'Descripción {numero}',
+                youtube_url=f'https://youtu.be/v{numero:010d}', video_id=f'v{numero:010d}',
+                user_id=usuarios[numero % 3].id,
+                fecha_creacion=datetime(2024, 1, 1) + timedelta(minutes=numero)))
+        db.session.commit()
+        for video in Video.query.filter(Video.id <= 5):
+            db.session.delete(video)
+        db.session.commit()
+        # Sin estadísticas el planificador de SQLite puede elegir otro plan
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+    return app_vacia
+
+
+def problemas_del_plan(sentencia, filas):
+    """
+    Líneas del plan con un recorrido completo o un ordenamiento en memoria.
+    Recorrer video por su clave primaria sin filtro es aceptable: el LIMIT
+    corta en cuanto tiene la página.
+    """
+    filtrada = ' WHERE ' in sentencia.upper()
+    problemas = []
+    for fila in filas:
+        detalle = fila[-1]
+        if 'USE TEMP B-TREE FOR ORDER BY' in detalle:
+            problemas.append(detalle)
+        elif re.match(r'SCAN video(_eliminado)?\b', detalle) and 'INDEX' not in detalle \
+                and filtrada:
+            problemas.append(detalle)
+    return problemas
+
+
+def recorrer(client, url):
+    """Pide la primera página y la siguiente, siguiendo Link o el token del feed."""
+    respuesta = client.get(url)
+    assert respuesta.status_code == 200, url
+    enlace = respuesta.headers.get('Link', '')
+    if 'rel="next"' in enlace:
+        client.get(enlace.split('>')[0].lstrip('<'))
+    elif respuesta.is_json and 'siguiente' in respuesta.get_json():
+        client.get('/api/v1/videos/changes', query_string={
+            'limite': 50, 'since': respuesta.get_json()['siguiente']})
+
+
+@pytest.mark.parametrize('ruta', ['/index', '/blog', '/mis_videos', '/api/v1/videos',
+                                  '/api/v1/videos/changes?limite=50'])
+@pytest.mark.parametrize('orden', ['desc', 'asc'])
+def test_los_listados_usan_indices(app_migrada, ruta, orden):
+    app_migrada.config['CAMBIOS_MARGEN_SEGUNDOS'] = 0
+    client = app_migrada.test_client()
+    client.post('/login', data={'username': 'u0', 'password': 'x'})
+    with app_migrada.app_context():
+        motor = db.engine
+    consultas = {}
+
+    def anotar(conn, cursor, statement, parameters, context, executemany):
+        sentencia = statement.lstrip()
+        if sentencia.upper().startswith('SELECT') and DESDE_TABLAS.search(sentencia):
+            consultas.setdefault(sentencia, parameters)
+
+    event.listen(motor, 'before_cursor_execute', anotar)
+    try:
+        recorrer(client, f'{ruta}{"&" if "?" in ruta else "?"}orden={orden}')
+    finally:
+        event.remove(motor, 'before_cursor_execute', anotar)
+
+    assert consultas
+    conexion = motor.raw_connection()
+    try:
+        for sentencia, parametros in consultas.items():
+            filas = conexion.execute('EXPLAIN QUERY PLAN ' + sentencia, parametros).fetchall()
+            assert not problemas_del_plan(sentencia, filas), (
+                ' '.join(sentencia.split()), [fila[-1] for fila in filas])
+    finally:
+        conexion.close()
@@ -0,0 +1,45 @@
+from extensiones import db
+from models import User, Video
+
+
+def copiar(app):
+    resultado = app.test_cli_runner().invoke(args=['replicas', 'copiar'])
+    assert resultado.exit_code == 0, resultado.output
+
+
+def subir(client, video_id, titulo):
+    respuesta = client.post('/upload', data={
+        'url': f'https://youtu.be/{video_id}', 'title': titulo, 'description': ''})
+    assert respuesta.status_code == 302
+
+
+def test_las_lecturas_van_a_la_replica_salvo_despues_de_escribir(app_con_replica):
+    app = app_con_replica
+    with app.app_context():
+        usuario = User(username='u0')
+        usuario.set_password('x')
+        db.session.add(usuario)
+        db.session.commit()
+        db.session.add(Video(title='Copiado a la réplica', youtube_url='https://youtu.be/abcdefghi01',
+                             video_id='abcdefghi01', description='', user_id=usuario.id))
+        db.session.commit()
+    copiar(app)
+
+    anonimo = app.test_client()
+    autor = app.test_client()
+    autor.post('/login', data={'username': 'u0', 'password': 'x'})
+    subir(autor, 'abcdefghi02', 'Recién subido')
+
+    # Quien escribió lee del primario; los demás, de la réplica sin copiar
+    assert 'Recién subido' in autor.get('/index').get_data(as_text=True)
+    pagina = anonimo.get('/index').get_data(as_text=True)
+    assert 'Copiado a la réplica' in pagina and 'Recién subido' not in pagina
+
+    copiar(app)
+    assert 'Recién subido' in anonimo.get('/index').get_data(as_text=True)
+
+    # Pasada la pausa, el autor también vuelve a leer de la réplica
+    app.config['REPLICAS_PAUSA_SEGUNDOS'] = 0
+    subir(autor, 'abcdefghi03', 'Todavía no copiado')
+    assert 'Todavía no copiado' not in autor.get('/index').get_data(as_text=True)
+    assert 'Todavía no copiado' in autor.get('/mis_videos').get_data(as_text=True)
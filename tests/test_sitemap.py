@@ -0,0 +1,19 @@
+import re
+
+
+def rutas(xml):
+    return [re.sub(r'^https?://[^/]+', '', loc) for loc in re.findall(r'<loc>([^<]+)</loc>', xml)]
+
+
+def test_el_sitemap_solo_anuncia_paginas_publicas(client, videos):
+    indice = client.get('/sitemap.xml')
+    assert indice.status_code == 200
+    paginas = []
+    for sitemap in rutas(indice.get_data(as_text=True)):
+        paginas += rutas(client.get(sitemap).get_data(as_text=True))
+
+    assert '/blog' in paginas
+    assert not [pagina for pagina in paginas if pagina.startswith('/video/')]
+    # Un buscador sin sesión puede abrir todo lo que se anuncia
+    for pagina in paginas:
+        assert client.get(pagina).status_code == 200, pagina
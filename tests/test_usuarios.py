@@ -0,0 +1,85 @@
+import re
+
+from sqlalchemy import event
+
+from extensiones import db
+from models import User
+from utils_usuarios import SELLO
+
+DESDE_USER = re.compile(r'\bFROM "?user"?\b')
+
+
+def lecturas_de_usuario(app, client, url):
+    """Pide la URL y devuelve (respuesta, consultas a la tabla user)."""
+    sentencias = []
+    with app.app_context():
+        motor = db.engine
+
+    def anotar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(motor, 'before_cursor_execute', anotar)
+    try:
+        respuesta = client.get(url)
+    finally:
+        event.remove(motor, 'before_cursor_execute', anotar)
+    return respuesta, sum(bool(DESDE_USER.search(s)) for s in sentencias)
+
+
+def iniciar_sesion(app, usuario):
+    client = app.test_client()
+    client.post('/login', data={'username': usuario, 'password': 'x'})
+    return client
+
+
+def test_aciertos_y_fallos(app, videos):
+    cache = app.extensions['cache_usuarios']
+    client = iniciar_sesion(app, 'u0')
+    fallos = cache.fallos
+
+    # La primera petición lee de la base; las siguientes, de la caché
+    assert lecturas_de_usuario(app, client, '/profile')[1] == 1
+    assert cache.fallos == fallos + 1
+    for _ in range(3):
+        respuesta, lecturas = lecturas_de_usuario(app, client, '/profile')
+        assert respuesta.status_code == 200 and lecturas == 0
+    assert cache.aciertos == 3
+
+
+def test_editar_el_perfil_cambia_el_sello(app, videos):
+    client = iniciar_sesion(app, 'u0')
+    lecturas_de_usuario(app, client, '/profile')
+    with client.session_transaction() as sesion:
+        sello = sesion[SELLO]
+
+    client.post('/edit_profile', data={'username': 'u0', 'description': 'Nueva descripción'})
+
+    with client.session_transaction() as sesion:
+        assert sesion[SELLO] != sello
+    respuesta, lecturas = lecturas_de_usuario(app, client, '/profile')
+    assert lecturas == 1
+    assert 'Nueva descripción' in respuesta.get_data(as_text=True)
+
+
+def test_los_cambios_llegan_a_las_otras_sesiones_del_proceso(app, videos):
+    otra = iniciar_sesion(app, 'u0')
+    lecturas_de_usuario(app, otra, '/profile')
+    assert lecturas_de_usuario(app, otra, '/profile')[1] == 0
+
+    # Desde otra sesión (o un comando) se cambia la contraseña
+    with app.app_context():
+        usuario = db.session.get(User, videos[0])
+        usuario.set_password('nueva')
+        usuario.description = 'Con contraseña nueva'
+        db.session.commit()
+
+    respuesta, lecturas = lecturas_de_usuario(app, otra, '/profile')
+    assert lecturas == 1
+    assert 'Con contraseña nueva' in respuesta.get_data(as_text=True)
+    # Los demás usuarios siguen en la caché
+    tercera = iniciar_sesion(app, 'u1')
+    lecturas_de_usuario(app, tercera, '/profile')
+    with app.app_context():
+        db.session.get(User, videos[0]).description = 'otra vez'
+        db.session.commit()
+    assert lecturas_de_usuario(app, tercera, '/profile')[1] == 0
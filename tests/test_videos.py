@@ -0,0 +1,50 @@
+import rutas_videos
+from extensiones import db
+from models import Video
+
+
+def test_editar_con_un_video_repetido_en_carrera_responde_409(app, client, videos, monkeypatch):
+    # El video 1 y el 4 son de u0; la consulta previa "no ve" el 4, como
+    # si otra petición lo hubiera guardado justo después
+    with app.app_context():
+        repetido = db.session.get(Video, 4).video_id
+    originales = rutas_videos.video_existente
+    llamadas = []
+
+    def video_existente(user_id, video_id):
+        llamadas.append(video_id)
+        return None if len(llamadas) == 1 else originales(user_id, video_id)
+
+    monkeypatch.setattr(rutas_videos, 'video_existente', video_existente)
+    respuesta = client.post('/edit/1', headers={'Accept': 'application/json'}, data={
+        'title': 'Nuevo', 'description': 'd',
+        'youtube_url': f'https://www.youtube.com/watch?v={repetido}'})
+
+    assert respuesta.status_code == 409
+    assert respuesta.get_json()['id'] == 4
+    with app.app_context():
+        assert db.session.get(Video, 1).title != 'Nuevo'
+
+
+def test_backfill_embed_cuenta_las_urls_que_terminan_repetidas(app, videos):
+    # Dos filas antiguas sin embed_url cuyas URLs son el mismo video
+    with app.app_context():
+        pendientes = Video.query.filter(Video.embed_url.is_(None)).count()
+        for video_id, url in (('viejo1', 'https://youtu.be/zzzzzzzzz01'),
+                              ('viejo2', 'https://www.youtube.com/watch?v=zzzzzzzzz01'),
+                              ('viejo3', 'https://youtu.be/zzzzzzzzz02')):
+            db.session.add(Video(title=video_id, youtube_url=url, video_id=video_id,
+                                 user_id=videos[0]))
+        db.session.commit()
+
+    resultado = app.test_cli_runner().invoke(args=['videos', 'backfill-embed', '--lote', '2'])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert f'{pendientes + 2} videos actualizados, 1 repetidos, 0 con URL no válida' \
+        in resultado.output
+    with app.app_context():
+        filas = {v.title: (v.video_id, v.embed_url) for v in Video.query.filter(
+            Video.title.like('viejo%'))}
+    assert filas['viejo1'] == ('zzzzzzzzz01', 'https://www.youtube.com/embed/zzzzzzzzz01')
+    assert filas['viejo2'] == ('viejo2', None)
+    assert filas['viejo3'][0] == 'zzzzzzzzz02'
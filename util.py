@@ -1,4 +1,5 @@
 
 
-# Llama a la función para asignar los videos al usuario deseado
-# asignar_videos_a_usuario('usuario2')
+# Para asignar videos a un usuario ahora se usa la importación masiva:
+#   flask videos export --usuario usuario1 videos.csv
+#   flask videos import --usuario usuario2 videos.csv
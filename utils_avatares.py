@@ -0,0 +1,254 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app, url_for
+from flask.cli import AppGroup
+
+from extensiones import db
+
+# Primeros bytes de cada formato de imagen aceptado -> extensión
+FIRMAS = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+# Nombre de un original guardado por contenido: <sha256>.<ext>
+NOMBRE_ORIGINAL = re.compile(r'^([0-9a-f]{64})\.(png|jpg|gif|webp)$')
+# Original o miniatura (<sha256>.<tamaño>.<ext>): su contenido nunca cambia
+CON_HUELLA = re.compile(r'^[0-9a-f]{64}(\.\d+)?\.(png|jpg|gif|webp)$')
+# Formato de cada variante -> (formato de Pillow, opciones)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+TROZO = 64 * 1024
+
+
+class ImagenNoValida(ValueError):
+    """El archivo subido no es una imagen aceptada; el mensaje es para el usuario."""
+
+
+def detectar_formato(cabecera):
+    """
+    Devuelve la extensión que corresponde a los primeros bytes de un
+    archivo ('png', 'jpg', 'gif', 'webp') o None si no es una imagen
+    conocida. No se confía en el nombre ni en el Content-Type del cliente.
+    """
+    for firma, extension in FIRMAS:
+        if cabecera.startswith(firma):
+            return extension
+    if cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def nombre_variante(nombre, tamano, formato):
+    return f'{nombre.split(".")[0]}.{tamano}.{formato}'
+
+
+def guardar_original(stream, carpeta, extensiones, max_pixeles):
+    """
+    Copia la imagen a `carpeta` por trozos mientras calcula su sha256, y la
+    deja con el nombre <sha256>.<ext>: la misma imagen subida dos veces (o
+    por dos usuarios) ocupa un solo archivo.
+
+    Argumentos:
+        stream: Archivo subido (request.files[...].stream).
+        carpeta: Carpeta de destino (UPLOAD_FOLDER).
+        extensiones: Formatos aceptados (ALLOWED_EXTENSIONS).
+        max_pixeles: Ancho por alto máximo (evita bombas de descompresión).
+
+    Devuelve:
+        El nombre del archivo guardado.
+    """
+    from PIL import Image
+
+    cabecera = stream.read(16)
+    extension = detectar_formato(cabecera)
+    aceptadas = {'jpg' if e == 'jpeg' else e for e in extensiones}
+    if extension is None or extension not in aceptadas:
+        raise ImagenNoValida(f'El archivo no es una imagen válida ({", ".join(sorted(aceptadas))}).')
+
+    os.makedirs(carpeta, exist_ok=True)
+    huella = hashlib.sha256(cabecera)
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, prefix='.subida-')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(cabecera)
+            for trozo in iter(lambda: stream.read(TROZO), b''):
+                huella.update(trozo)
+                archivo.write(trozo)
+        try:
+            # Solo lee la cabecera: no descomprime la imagen
+            with Image.open(temporal) as imagen:
+                ancho, alto = imagen.size
+                imagen.verify()
+        except Exception:
+            raise ImagenNoValida('La imagen está dañada o no se puede leer.')
+        if ancho * alto > max_pixeles:
+            raise ImagenNoValida(f'La imagen es demasiado grande ({ancho}x{alto}).')
+
+        nombre = f'{huella.hexdigest()}.{extension}'
+        destino = os.path.join(carpeta, nombre)
+        if os.path.exists(destino):
+            os.remove(temporal)
+        else:
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, destino)
+        return nombre
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def generar_variantes(carpeta, nombre, tamanos):
+    """
+    Genera miniaturas cuadradas (recorte centrado) de un original en WebP y
+    JPEG para cada tamaño. Lo que ya existe no se vuelve a generar.
+
+    Devuelve:
+        Lista de los nombres generados.
+    """
+    from PIL import Image, ImageOps
+
+    pendientes = [(tamano, formato) for tamano in tamanos for formato in FORMATOS
+                  if not os.path.exists(os.path.join(carpeta, nombre_variante(nombre, tamano, formato)))]
+    if not pendientes:
+        return []
+    generados = []
+    with Image.open(os.path.join(carpeta, nombre)) as original:
+        # JPEG puede decodificarse directo a una escala menor (mucho más rápido)
+        lado = max(tamanos)
+        original.draft('RGB', (lado, lado))
+        # Fotos de celular: la orientación viene en el EXIF
+        imagen = ImageOps.exif_transpose(original).convert('RGB')
+    for tamano, formato in pendientes:
+        miniatura = ImageOps.fit(imagen, (tamano, tamano), Image.LANCZOS)
+        variante = nombre_variante(nombre, tamano, formato)
+        formato_pil, opciones = FORMATOS[formato]
+        # Se escribe con otro nombre y se renombra: nunca se sirve a medias
+        temporal = os.path.join(carpeta, f'.{variante}')
+        miniatura.save(temporal, formato_pil, **opciones)
+        os.replace(temporal, os.path.join(carpeta, variante))
+        generados.append(variante)
+    return generados
+
+
+class Avatares:
+    """
+    Guarda las imágenes de perfil y genera sus miniaturas en un hilo aparte
+    para no hacer esperar la petición. Con AVATAR_HILO=False (pruebas,
+    scripts) las genera en el momento.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._ejecutor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['avatares'] = self
+        app.cli.add_command(avatares_cli)
+        app.jinja_env.globals['avatar_url'] = avatar_url
+
+    @property
+    def carpeta(self):
+        return os.path.join(self.app.root_path, self.app.config['UPLOAD_FOLDER'])
+
+    def guardar(self, archivo):
+        """
+        Guarda la imagen subida y encarga sus miniaturas.
+
+        Devuelve:
+            El nombre del original guardado.
+        """
+        config = self.app.config
+        nombre = guardar_original(archivo.stream, self.carpeta,
+                                  config['ALLOWED_EXTENSIONS'], config['AVATAR_MAX_PIXELES'])
+        if config['AVATAR_HILO']:
+            self._obtener_ejecutor().submit(self._generar, nombre)
+        else:
+            generar_variantes(self.carpeta, nombre, config['AVATAR_TAMANOS'])
+        return nombre
+
+    def _obtener_ejecutor(self):
+        # Igual que la cola de formularios: los hilos no sobreviven al fork
+        # de gunicorn, así que cada proceso crea el suyo
+        with self._lock:
+            if self._ejecutor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='avatares')
+            return self._ejecutor
+
+    def _generar(self, nombre):
+        try:
+            generar_variantes(self.carpeta, nombre, self.app.config['AVATAR_TAMANOS'])
+        except Exception:
+            self.app.logger.exception('No se pudieron generar las miniaturas de %s', nombre)
+
+
+def original_de(url):
+    """Nombre del original con contenido en el nombre a partir de la URL guardada, o None."""
+    nombre = (url or '').rsplit('/', 1)[-1]
+    return nombre if NOMBRE_ORIGINAL.match(nombre) else None
+
+
+def avatar_url(usuario, tamano=None, formato='jpg'):
+    """
+    URL de la imagen de perfil: la miniatura pedida si ya se generó o, si
+    no (o si es una imagen de antes de las miniaturas), la original.
+    """
+    nombre = original_de(usuario.profile_picture)
+    if nombre and tamano:
+        variante = nombre_variante(nombre, tamano, formato)
+        if os.path.exists(os.path.join(current_app.extensions['avatares'].carpeta, variante)):
+            return url_for('auth.uploaded_file', filename=variante)
+    return usuario.profile_picture
+
+
+avatares = Avatares()
+avatares_cli = AppGroup('avatares', help='Imágenes de perfil y sus miniaturas.')
+
+
+@avatares_cli.command('regenerar')
+def regenerar_avatares():
+    """Genera las miniaturas que falten (por ejemplo, después de cambiar AVATAR_TAMANOS)."""
+    carpeta = avatares.carpeta
+    total = 0
+    for nombre in sorted(os.listdir(carpeta)) if os.path.isdir(carpeta) else []:
+        if NOMBRE_ORIGINAL.match(nombre):
+            total += len(generar_variantes(carpeta, nombre, current_app.config['AVATAR_TAMANOS']))
+    click.echo(f'{total} miniaturas generadas.')
+
+
+@avatares_cli.command('limpiar')
+def limpiar_avatares():
+    """Borra las imágenes (y sus miniaturas) que ya no usa ningún usuario."""
+    from models import User
+
+    carpeta = avatares.carpeta
+    en_uso = {original_de(url) for (url,) in db.session.query(User.profile_picture)}
+    hashes = {nombre.split('.')[0] for nombre in en_uso if nombre}
+    # Lo recién subido puede no estar guardado todavía en el usuario
+    limite = time.time() - 3600
+    borrados = 0
+    for nombre in sorted(os.listdir(carpeta)) if os.path.isdir(carpeta) else []:
+        huella = nombre.split('.')[0]
+        ruta = os.path.join(carpeta, nombre)
+        if re.fullmatch(r'[0-9a-f]{64}', huella) and huella not in hashes \
+                and os.path.getmtime(ruta) < limite:
+            os.remove(ruta)
+            borrados += 1
+    click.echo(f'{borrados} archivos borrados.')
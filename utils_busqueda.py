@@ -0,0 +1,238 @@
+import re
+
+from sqlalchemy import text
+
+# Palabras de la consulta: letras (con tildes), números y guion bajo
+PALABRA_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def palabras_consulta(consulta):
+    """
+    Separa la consulta del usuario en palabras, descartando la sintaxis
+    especial del motor (comillas, operadores, paréntesis).
+    """
+    return PALABRA_RE.findall(consulta or '')[:16]
+
+
+class MotorBusqueda:
+    """
+    Interfaz de los motores de búsqueda de videos.
+
+    Cada motor mantiene su propio índice sincronizado con la tabla video y
+    devuelve los ids ordenados por relevancia. El índice lo crea la
+    migración de Alembic (o db.create_all() junto con la tabla video), nunca
+    una petición.
+    """
+
+    # Tabla del índice; None si el motor no usa una
+    TABLA = None
+
+    def preparar(self, conexion):
+        """Crea el índice si no existe y lo llena (idempotente)."""
+        raise NotImplementedError
+
+    def indexar(self, conexion, video):
+        """Agrega o actualiza un video en el índice."""
+        raise NotImplementedError
+
+    def indexar_lote(self, conexion, videos):
+        """Agrega o actualiza varios videos (importaciones masivas)."""
+        for video in videos:
+            self.indexar(conexion, video)
+
+    def eliminar(self, conexion, video_id):
+        """Quita un video del índice."""
+        raise NotImplementedError
+
+    def reconstruir(self, conexion):
+        """Vuelve a indexar todos los videos desde la tabla video."""
+        raise NotImplementedError
+
+    def buscar(self, conexion, consulta, limite, desplazamiento=0):
+        """
+        Devuelve la lista de ids de videos que coinciden con la consulta,
+        del más al menos relevante.
+        """
+        raise NotImplementedError
+
+
+class MotorSQLiteFTS5(MotorBusqueda):
+    """
+    Índice FTS5 de SQLite con ranking BM25. El tokenizador unicode61 con
+    remove_diacritics hace que "programacion" encuentre "Programación".
+    """
+
+    TABLA = 'video_fts'
+    # El título pesa más que la descripción en el ranking
+    PESOS = (10.0, 1.0)
+
+    def preparar(self, conexion):
+        existe = conexion.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :t"),
+            {'t': self.TABLA}).first()
+        if existe:
+            return
+        conexion.execute(text(
+            f"CREATE VIRTUAL TABLE {self.TABLA} USING fts5("
+            "title, description, tokenize = 'unicode61 remove_diacritics 2')"))
+        self.reconstruir(conexion)
+
+    def indexar(self, conexion, video):
+        self.eliminar(conexion, video.id)
+        conexion.execute(text(
+            f"INSERT INTO {self.TABLA} (rowid, title, description) "
+            "VALUES (:id, :title, :description)"),
+            {'id': video.id, 'title': video.title,
+             'description': video.description or ''})
+
+    def indexar_lote(self, conexion, videos):
+        filas = [{'id': v.id, 'title': v.title, 'description': v.description or ''}
+                 for v in videos]
+        if not filas:
+            return
+        # executemany: una sola sentencia preparada para todo el lote
+        conexion.execute(text(f"DELETE FROM {self.TABLA} WHERE rowid = :id"), filas)
+        conexion.execute(text(
+            f"INSERT INTO {self.TABLA} (rowid, title, description) "
+            "VALUES (:id, :title, :description)"), filas)
+
+    def eliminar(self, conexion, video_id):
+        conexion.execute(text(f"DELETE FROM {self.TABLA} WHERE rowid = :id"),
+                         {'id': video_id})
+
+    def reconstruir(self, conexion):
+        conexion.execute(text(f"DELETE FROM {self.TABLA}"))
+        conexion.execute(text(
+            f"INSERT INTO {self.TABLA} (rowid, title, description) "
+            "SELECT id, title, coalesce(description, '') FROM video"))
+
+    def buscar(self, conexion, consulta, limite, desplazamiento=0):
+        palabras = palabras_consulta(consulta)
+        if not palabras:
+            return []
+        # Cada palabra entre comillas y como prefijo: "pyth" encuentra "python"
+        expresion = ' '.join('"%s"*' % p for p in palabras)
+        filas = conexion.execute(text(
+            f"SELECT rowid FROM {self.TABLA} WHERE {self.TABLA} MATCH :q "
+            f"ORDER BY bm25({self.TABLA}, {self.PESOS[0]}, {self.PESOS[1]}) "
+            "LIMIT :limite OFFSET :desplazamiento"),
+            {'q': expresion, 'limite': limite, 'desplazamiento': desplazamiento})
+        return [fila[0] for fila in filas]
+
+
+class MotorPostgres(MotorBusqueda):
+    """
+    Búsqueda con tsvector de PostgreSQL en una tabla auxiliar con índice GIN,
+    usando la configuración 'spanish' y la extensión unaccent.
+    """
+
+    TABLA = 'video_busqueda'
+    DOCUMENTO = ("setweight(to_tsvector('spanish', unaccent(:title)), 'A') || "
+                 "setweight(to_tsvector('spanish', unaccent(:description)), 'B')")
+
+    def preparar(self, conexion):
+        conexion.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        existe = conexion.execute(text(
+            "SELECT to_regclass(:t)"), {'t': self.TABLA}).scalar()
+        if existe:
+            return
+        conexion.execute(text(
+            f"CREATE TABLE {self.TABLA} ("
+            "video_id INTEGER PRIMARY KEY REFERENCES video (id) ON DELETE CASCADE, "
+            "documento TSVECTOR NOT NULL)"))
+        conexion.execute(text(
+            f"CREATE INDEX {self.TABLA}_documento_idx ON {self.TABLA} "
+            "USING GIN (documento)"))
+        self.reconstruir(conexion)
+
+    def indexar(self, conexion, video):
+        conexion.execute(text(
+            f"INSERT INTO {self.TABLA} (video_id, documento) "
+            f"VALUES (:id, {self.DOCUMENTO}) "
+            "ON CONFLICT (video_id) DO UPDATE SET documento = EXCLUDED.documento"),
+            {'id': video.id, 'title': video.title,
+             'description': video.description or ''})
+
+    def indexar_lote(self, conexion, videos):
+        filas = [{'id': v.id, 'title': v.title, 'description': v.description or ''}
+                 for v in videos]
+        if filas:
+            conexion.execute(text(
+                f"INSERT INTO {self.TABLA} (video_id, documento) "
+                f"VALUES (:id, {self.DOCUMENTO}) "
+                "ON CONFLICT (video_id) DO UPDATE SET documento = EXCLUDED.documento"),
+                filas)
+
+    def eliminar(self, conexion, video_id):
+        conexion.execute(text(f"DELETE FROM {self.TABLA} WHERE video_id = :id"),
+                         {'id': video_id})
+
+    def reconstruir(self, conexion):
+        conexion.execute(text(f"DELETE FROM {self.TABLA}"))
+        conexion.execute(text(
+            f"INSERT INTO {self.TABLA} (video_id, documento) "
+            "SELECT id, setweight(to_tsvector('spanish', unaccent(title)), 'A') || "
+            "setweight(to_tsvector('spanish', unaccent(coalesce(description, ''))), 'B') "
+            "FROM video"))
+
+    def buscar(self, conexion, consulta, limite, desplazamiento=0):
+        palabras = palabras_consulta(consulta)
+        if not palabras:
+            return []
+        expresion = ' & '.join(p + ':*' for p in palabras)
+        filas = conexion.execute(text(
+            f"SELECT video_id FROM {self.TABLA}, "
+            "to_tsquery('spanish', unaccent(:q)) AS q "
+            "WHERE documento @@ q ORDER BY ts_rank_cd(documento, q) DESC, video_id DESC "
+            "LIMIT :limite OFFSET :desplazamiento"),
+            {'q': expresion, 'limite': limite, 'desplazamiento': desplazamiento})
+        return [fila[0] for fila in filas]
+
+
+class MotorLike(MotorBusqueda):
+    """
+    Respaldo sin índice para motores de base de datos no soportados: el
+    mismo LIKE '%...%' de siempre, ordenado por id.
+    """
+
+    def preparar(self, conexion):
+        pass
+
+    def indexar(self, conexion, video):
+        pass
+
+    def eliminar(self, conexion, video_id):
+        pass
+
+    def reconstruir(self, conexion):
+        pass
+
+    def buscar(self, conexion, consulta, limite, desplazamiento=0):
+        palabras = palabras_consulta(consulta)
+        if not palabras:
+            return []
+        condiciones = ' AND '.join(
+            f"(title LIKE :p{i} OR description LIKE :p{i})" for i in range(len(palabras)))
+        parametros = {f'p{i}': f'%{p}%' for i, p in enumerate(palabras)}
+        parametros.update(limite=limite, desplazamiento=desplazamiento)
+        filas = conexion.execute(text(
+            f"SELECT id FROM video WHERE {condiciones} ORDER BY id DESC "
+            "LIMIT :limite OFFSET :desplazamiento"), parametros)
+        return [fila[0] for fila in filas]
+
+
+def crear_motor(bind):
+    """
+    Elige el motor de búsqueda según el dialecto de la base de datos.
+
+    Argumentos:
+        bind: El engine o una conexión de SQLAlchemy.
+
+    Devuelve:
+        Una instancia de MotorBusqueda.
+    """
+    if bind.dialect.name == 'sqlite':
+        return MotorSQLiteFTS5()
+    if bind.dialect.name == 'postgresql':
+        return MotorPostgres()
+    return MotorLike()
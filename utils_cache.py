@@ -0,0 +1,312 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request, session
+from flask_login import current_user
+
+
+class CacheBackend:
+    """
+    Interfaz mínima de un almacén de caché. Cuenta aciertos y fallos para
+    poder calcular la tasa de aciertos.
+    """
+
+    def __init__(self):
+        self.aciertos = 0
+        self.fallos = 0
+
+    def get(self, clave):
+        valor = self._get(clave)
+        if valor is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return valor
+
+    def _get(self, clave):
+        raise NotImplementedError
+
+    def set(self, clave, valor, ttl):
+        raise NotImplementedError
+
+    def delete(self, clave):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class CacheLRU(CacheBackend):
+    """
+    Caché en memoria del proceso con expiración (TTL) y un máximo de
+    entradas; al llenarse descarta la usada hace más tiempo.
+    """
+
+    def __init__(self, max_items=256, max_bytes=None):
+        super().__init__()
+        self.max_items = max_items
+        # Con max_bytes los valores deben ser str o bytes para medirlos
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tamanio(self, valor):
+        return len(valor) if self.max_bytes else 0
+
+    def _quitar(self, clave):
+        _, valor = self._datos.pop(clave)
+        self.bytes -= self._tamanio(valor)
+
+    def _get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                self._quitar(clave)
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl):
+        if self.max_bytes and self._tamanio(valor) > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self.bytes += self._tamanio(valor)
+            while len(self._datos) > self.max_items or (
+                    self.max_bytes and self.bytes > self.max_bytes):
+                self._quitar(next(iter(self._datos)))
+
+    def delete(self, clave):
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+
+    def delete_prefijo(self, prefijo):
+        """Borra las entradas cuya clave empieza con `prefijo` (recorre toda la caché)."""
+        with self._lock:
+            for clave in [c for c in self._datos if c.startswith(prefijo)]:
+                self._quitar(clave)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes = 0
+
+
+class CacheArchivos(CacheBackend):
+    """
+    Caché compartida entre procesos en un directorio local. Cada entrada es
+    un archivo que se escribe de forma atómica. Con max_items o max_bytes,
+    al guardar se borran las entradas leídas hace más tiempo (la fecha de
+    modificación del archivo se actualiza en cada acierto).
+    """
+
+    def __init__(self, directorio, max_items=None, max_bytes=None):
+        super().__init__()
+        self.directorio = directorio
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, hashlib.sha1(clave.encode()).hexdigest())
+
+    def _get(self, clave):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                expira, valor = pickle.load(archivo)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expira < time.time():
+            self.delete(clave)
+            return None
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return valor
+
+    def set(self, clave, valor, ttl):
+        # El prefijo '.' separa los temporales de las entradas al recortar
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix='.')
+        with os.fdopen(descriptor, 'wb') as archivo:
+            pickle.dump((time.time() + ttl, valor), archivo)
+            tamanio = archivo.tell()
+        ruta = self._ruta(clave)
+        os.replace(temporal, ruta)
+        self._recortar(ruta, tamanio)
+
+    def _recortar(self, conservar, tamanio_conservado):
+        if not self.max_items and not self.max_bytes:
+            return
+        entradas = []
+        with os.scandir(self.directorio) as archivos:
+            for archivo in archivos:
+                if archivo.name.startswith('.') or archivo.path == conservar:
+                    continue
+                try:
+                    datos = archivo.stat()
+                except OSError:
+                    continue
+                entradas.append((datos.st_mtime, datos.st_size, archivo.path))
+        entradas.sort()
+        # La entrada recién guardada cuenta pero no se borra
+        cantidad = len(entradas) + 1
+        total = sum(tamanio for _, tamanio, _ in entradas) + tamanio_conservado
+        for _, tamanio, ruta in entradas:
+            if (not self.max_items or cantidad <= self.max_items) and (
+                    not self.max_bytes or total <= self.max_bytes):
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            cantidad -= 1
+            total -= tamanio
+
+    def delete(self, clave):
+        try:
+            os.remove(self._ruta(clave))
+        except OSError:
+            pass
+
+    def clear(self):
+        for nombre in os.listdir(self.directorio):
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+
+
+class CacheRedis(CacheBackend):
+    """
+    Caché compartida sobre cualquier cliente compatible con Redis
+    (get/setex/delete/scan_iter).
+    """
+
+    def __init__(self, cliente, prefijo='cache:'):
+        super().__init__()
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def _get(self, clave):
+        crudo = self.cliente.get(self.prefijo + clave)
+        return pickle.loads(crudo) if crudo is not None else None
+
+    def set(self, clave, valor, ttl):
+        self.cliente.setex(self.prefijo + clave, int(ttl), pickle.dumps(valor))
+
+    def delete(self, clave):
+        self.cliente.delete(self.prefijo + clave)
+
+    def clear(self):
+        for clave in self.cliente.scan_iter(self.prefijo + '*'):
+            self.cliente.delete(clave)
+
+
+def crear_cache(tipo, max_items=256, directorio=None, redis_url=None, max_bytes=None):
+    """
+    Crea el almacén de caché configurado.
+
+    Argumentos:
+        tipo: 'memoria', 'archivos' o 'redis'.
+        max_items: Máximo de entradas para la caché en memoria o en archivos.
+        directorio: Carpeta para la caché en archivos.
+        max_bytes: Máximo de bytes en disco para la caché en archivos.
+        redis_url: URL del servidor para la caché en Redis.
+
+    Devuelve:
+        Una instancia de CacheBackend.
+    """
+    if tipo == 'archivos':
+        return CacheArchivos(directorio or os.path.join(tempfile.gettempdir(), 'cache_respuestas'),
+                             max_items=max_items, max_bytes=max_bytes)
+    if tipo == 'redis':
+        # Dependencia opcional: solo se importa si se usa
+        import redis
+        return CacheRedis(redis.Redis.from_url(redis_url))
+    return CacheLRU(max_items)
+
+
+def clave_respuesta(parametros=()):
+    """
+    Clave de la respuesta de la petición actual: la ruta y solo los
+    parámetros de la consulta que la vista lee. Otros parámetros (?x=1,
+    ?utm_source=...) comparten la entrada en lugar de crear una nueva.
+    """
+    valores = [(nombre, valor) for nombre in sorted(parametros)
+               for valor in request.args.getlist(nombre)]
+    if not valores:
+        return request.path
+    return f'{request.path}?{urlencode(valores)}'
+
+
+def cachear_respuesta(ttl=None, varia_con_login=True, parametros=()):
+    """
+    Decorador que guarda la respuesta completa de una vista GET y la vuelve
+    a servir sin renderizar la plantilla. Agrega ETag y Last-Modified y
+    responde 304 Not Modified cuando el navegador ya tiene la versión.
+
+    No se usa la caché si hay mensajes flash pendientes, porque la página
+    debe mostrarlos una sola vez.
+
+    Argumentos:
+        ttl: Segundos de vida; por defecto CACHE_TTL.
+        varia_con_login: Si la página cambia según el usuario (ej. la barra
+            de navegación muestra el nombre), la clave incluye su id.
+        parametros: Parámetros de la consulta que la vista usa; los demás
+            no forman parte de la clave.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            config = current_app.config
+            cache = current_app.extensions.get('cache_respuestas')
+            if cache is None or not config['CACHE_RESPUESTAS'] or '_flashes' in session:
+                return vista(*args, **kwargs)
+
+            clave = f"{config['DEPLOY_VERSION']}:{clave_respuesta(parametros)}"
+            if varia_con_login:
+                clave += f':{current_user.get_id()}'
+
+            entrada = cache.get(clave)
+            if entrada is None:
+                respuesta = current_app.make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200 or 'Set-Cookie' in respuesta.headers:
+                    return respuesta
+                cuerpo = respuesta.get_data()
+                entrada = {
+                    'cuerpo': cuerpo,
+                    'mimetype': respuesta.mimetype,
+                    'etag': hashlib.sha1(cuerpo).hexdigest(),
+                    'modificado': time.time(),
+                }
+                cache.set(clave, entrada, ttl or config['CACHE_TTL'])
+
+            respuesta = current_app.response_class(
+                entrada['cuerpo'], mimetype=entrada['mimetype'])
+            respuesta.set_etag(entrada['etag'])
+            respuesta.headers['Last-Modified'] = formatdate(
+                entrada['modificado'], usegmt=True)
+            # El navegador revalida siempre; con el ETag recibe un 304 vacío
+            respuesta.headers['Cache-Control'] = 'no-cache'
+            if varia_con_login:
+                respuesta.vary.add('Cookie')
+            return respuesta.make_conditional(request)
+        return envoltura
+    return decorador
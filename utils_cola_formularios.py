@@ -0,0 +1,198 @@
+import os
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, update
+
+from extensiones import db
+from models import EnvioFormulario
+
+
+class HojaEnMemoria:
+    """
+    Hoja falsa para desarrollo y pruebas: guarda las filas en una lista en
+    lugar de enviarlas a Google. Se activa con SHEETS_FALSO=True.
+    """
+
+    def __init__(self):
+        self.filas = []
+        self.llamadas = 0
+
+    def append_rows(self, filas, value_input_option=None):
+        self.llamadas += 1
+        self.filas.extend(filas)
+
+
+class ColaFormularios:
+    """
+    Cola durable (una tabla de la base de datos) para los envíos del
+    formulario de contacto. La petición solo inserta una fila; un hilo en
+    segundo plano los manda a Google Sheets en lotes con append_rows cada
+    SHEETS_INTERVALO segundos (antes si ya hay un lote completo),
+    reintentando con espera exponencial si la API falla.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._hoja = None
+        self._hoja_lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['cola_formularios'] = self
+        app.cli.add_command(formularios_cli)
+        if app.config['SHEETS_FALSO']:
+            self._hoja = HojaEnMemoria()
+
+    # --- API para las vistas ---
+
+    def encolar(self, fila):
+        envio = EnvioFormulario(
+            nombre=fila[0], apellido=fila[1], email=fila[2],
+            telefono=fila[3], mensaje=fila[4], fecha_envio=fila[5])
+        db.session.add(envio)
+        db.session.commit()
+        self.iniciar()
+        # Sin un lote completo, el hilo lo envía al cumplirse el intervalo
+        if self.profundidad() >= self.app.config['SHEETS_TAMANIO_LOTE']:
+            self._despertar.set()
+        return envio
+
+    def profundidad(self):
+        """Número de envíos que aún no llegaron a la hoja."""
+        return db.session.query(func.count(EnvioFormulario.id)).scalar()
+
+    # --- Envío a Google Sheets ---
+
+    def _obtener_hoja(self):
+        # La hoja abierta se reutiliza entre lotes: abrirla cuesta dos
+        # llamadas a la API (open_by_url y get_worksheet)
+        with self._hoja_lock:
+            if self._hoja is None:
+                from utils_sheets import obtener_cliente
+                hoja = obtener_cliente().open_by_url(self.app.config['SHEETS_URL'])
+                self._hoja = hoja.get_worksheet(0)
+            return self._hoja
+
+    def _reservar_lote(self):
+        config = self.app.config
+        ahora = datetime.utcnow()
+        lote = uuid.uuid4().hex
+        ids = db.session.query(EnvioFormulario.id).filter(
+            EnvioFormulario.proximo_intento <= ahora).order_by(
+            EnvioFormulario.id).limit(config['SHEETS_TAMANIO_LOTE']).scalar_subquery()
+        # Reservar y marcar en una sola sentencia para que dos procesos no
+        # manden la misma fila
+        db.session.execute(
+            update(EnvioFormulario)
+            .where(EnvioFormulario.id.in_(ids), EnvioFormulario.proximo_intento <= ahora)
+            .values(lote=lote, proximo_intento=ahora + timedelta(
+                seconds=config['SHEETS_RESERVA_SEGUNDOS']))
+            .execution_options(synchronize_session=False))
+        db.session.commit()
+        return EnvioFormulario.query.filter_by(lote=lote).order_by(EnvioFormulario.id).all()
+
+    def _espera(self, intentos):
+        config = self.app.config
+        segundos = min(config['SHEETS_REINTENTO_BASE'] * 2 ** intentos,
+                       config['SHEETS_REINTENTO_MAX'])
+        return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+    def procesar_lote(self):
+        """
+        Envía un lote de filas pendientes.
+
+        Devuelve:
+            La cantidad de filas enviadas (0 si no había o si falló).
+        """
+        envios = self._reservar_lote()
+        if not envios:
+            return 0
+        try:
+            self._obtener_hoja().append_rows(
+                [envio.fila() for envio in envios], value_input_option='RAW')
+        except Exception as e:
+            # El handle puede haber caducado: se vuelve a abrir en el próximo intento
+            if not self.app.config['SHEETS_FALSO']:
+                self._hoja = None
+            ahora = datetime.utcnow()
+            for envio in envios:
+                envio.intentos += 1
+                envio.proximo_intento = ahora + self._espera(envio.intentos)
+                envio.ultimo_error = str(e)[:1000]
+                envio.lote = None
+            db.session.commit()
+            self.app.logger.warning(
+                'No se pudieron enviar %d formularios a Google Sheets: %s', len(envios), e)
+            return 0
+        for envio in envios:
+            db.session.delete(envio)
+        db.session.commit()
+        return len(envios)
+
+    def vaciar(self):
+        """Envía lotes hasta que no queden filas listas para enviar."""
+        total = 0
+        while True:
+            enviados = self.procesar_lote()
+            if not enviados:
+                return total
+            total += enviados
+
+    # --- Hilo en segundo plano ---
+
+    def iniciar(self):
+        """
+        Arranca el hilo de envío de este proceso si no está corriendo. Lo
+        llaman post_fork de gunicorn (así lo que quedó en la cola antes de
+        un reinicio se envía sin esperar otro formulario) y encolar().
+        """
+        # Con gunicorn cada proceso necesita su propio hilo (los hilos no
+        # sobreviven al fork), por eso se compara el pid
+        if not self.app.config['SHEETS_HILO'] or (
+                self._hilo is not None and self._pid == os.getpid()):
+            return
+        self._pid = os.getpid()
+        self._hilo = threading.Thread(
+            target=self._bucle, name='cola-formularios', daemon=True)
+        self._hilo.start()
+
+    def _bucle(self):
+        # Primero se vacía lo pendiente y después se espera al intervalo
+        while True:
+            try:
+                with self.app.app_context():
+                    self.vaciar()
+            except Exception:
+                self.app.logger.exception('Error en la cola de formularios')
+            self._despertar.wait(self.app.config['SHEETS_INTERVALO'])
+            self._despertar.clear()
+
+
+cola_formularios = ColaFormularios()
+
+# Comandos: flask formularios <comando>
+formularios_cli = AppGroup('formularios', help='Cola de envíos del formulario de contacto.')
+
+
+@formularios_cli.command('estado')
+def estado_cola():
+    """Muestra cuántos envíos esperan en la cola."""
+    pendientes = cola_formularios.profundidad()
+    con_error = EnvioFormulario.query.filter(EnvioFormulario.intentos > 0).count()
+    click.echo(f'{pendientes} envíos en cola ({con_error} con reintentos).')
+
+
+@formularios_cli.command('enviar')
+def enviar_cola():
+    """Envía ahora todos los formularios pendientes."""
+    click.echo(f'{cola_formularios.vaciar()} formularios enviados.')
@@ -0,0 +1,52 @@
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PresupuestoConsultasExcedido(Exception):
+    """Una vista ejecutó más consultas SQL de las permitidas."""
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.consultas_sql = g.get('consultas_sql', 0) + 1
+
+
+def consultas_en_peticion():
+    """
+    Devuelve el número de consultas SQL ejecutadas en la petición actual.
+    """
+    return g.get('consultas_sql', 0)
+
+
+def presupuesto_consultas(limite=None):
+    """
+    Decorador que limita las consultas SQL de una vista, incluyendo las que
+    se disparan al renderizar la plantilla. Sirve para detectar consultas
+    N+1 cuando una relación se carga de forma perezosa dentro de un bucle.
+
+    En modo TESTING (o con PRESUPUESTO_CONSULTAS_ESTRICTO) lanza
+    PresupuestoConsultasExcedido; en producción solo deja una advertencia
+    en el log.
+
+    Argumentos:
+        limite: Máximo de consultas; por defecto PRESUPUESTO_CONSULTAS.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            respuesta = vista(*args, **kwargs)
+            maximo = limite or current_app.config['PRESUPUESTO_CONSULTAS']
+            total = consultas_en_peticion()
+            if total > maximo:
+                mensaje = (f'{vista.__name__} ejecutó {total} consultas SQL '
+                           f'(presupuesto: {maximo})')
+                if current_app.testing or current_app.config['PRESUPUESTO_CONSULTAS_ESTRICTO']:
+                    raise PresupuestoConsultasExcedido(mensaje)
+                current_app.logger.warning(mensaje)
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as EsperaAgotada
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class ContrasenasOcupadas(ServiceUnavailable):
+    """
+    Hay demasiados cálculos de contraseña en curso: se responde 503 en el
+    momento en lugar de dejar la petición en la cola.
+    """
+
+    description = 'Hay muchos inicios de sesión en este momento. Inténtalo de nuevo en unos segundos.'
+
+    def __init__(self, reintentar=1):
+        super().__init__(retry_after=reintentar)
+
+
+def necesita_rehash(password_hash, metodo):
+    """
+    Indica si un hash se calculó con otros parámetros que los configurados.
+    Solo se comparan las partes del método que se indicaron: 'scrypt' acepta
+    cualquier costo de scrypt, 'scrypt:65536' exige ese n.
+
+    Argumentos:
+        password_hash: Hash guardado ('scrypt:32768:8:1$sal$...').
+        metodo: Método configurado (CONTRASENA_METODO).
+    """
+    guardado = password_hash.split('$', 1)[0].split(':')
+    pedido = metodo.split(':')
+    return guardado[:len(pedido)] != pedido
+
+
+def _cifrar(password, metodo):
+    return generate_password_hash(password, method=metodo)
+
+
+def _verificar(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+def _iniciar_proceso(prioridad):
+    # Con una sola CPU, el resto de las rutas pasa antes que los hashes
+    if prioridad:
+        os.nice(prioridad)
+
+
+class Contrasenas:
+    """
+    Calcula y verifica los hashes de contraseña en procesos aparte para no
+    ocupar el hilo de la petición (ni el GIL) durante los cientos de
+    milisegundos que cuestan. Admite hasta CONTRASENA_PROCESOS cálculos a la
+    vez más CONTRASENA_COLA en espera; los que no entran reciben un 503.
+
+    Con CONTRASENA_PROCESOS=0 (pruebas, scripts) se calculan en el momento.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._ejecutor = None
+        self._pid = None
+        self._lugares = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['contrasenas'] = self
+        config = app.config
+        if config['CONTRASENA_PROCESOS']:
+            self._lugares = threading.BoundedSemaphore(
+                config['CONTRASENA_PROCESOS'] + config['CONTRASENA_COLA'])
+
+    def cifrar(self, password):
+        """Hash de la contraseña con el método configurado."""
+        return self._ejecutar(_cifrar, password, self.app.config['CONTRASENA_METODO'])
+
+    def verificar(self, password_hash, password):
+        """True si la contraseña corresponde al hash."""
+        return self._ejecutar(_verificar, password_hash, password)
+
+    def necesita_rehash(self, password_hash):
+        return necesita_rehash(password_hash, self.app.config['CONTRASENA_METODO'])
+
+    def _ejecutar(self, funcion, *argumentos):
+        config = self.app.config
+        if not config['CONTRASENA_PROCESOS']:
+            return funcion(*argumentos)
+        if not self._lugares.acquire(blocking=False):
+            raise ContrasenasOcupadas()
+        try:
+            futuro = self._obtener_ejecutor().submit(funcion, *argumentos)
+        except BaseException:
+            self._lugares.release()
+            raise
+        # El lugar se libera cuando termina el cálculo, aunque la petición
+        # ya se haya rendido esperando
+        futuro.add_done_callback(lambda _: self._lugares.release())
+        try:
+            return futuro.result(timeout=config['CONTRASENA_ESPERA'])
+        except EsperaAgotada:
+            raise ContrasenasOcupadas(reintentar=config['CONTRASENA_ESPERA'])
+        except BrokenProcessPool:
+            # Un proceso murió (por ejemplo, por falta de memoria): se crea
+            # otro grupo en la próxima llamada
+            with self._lock:
+                self._ejecutor = None
+            self.app.logger.exception('Se reinicia el grupo de procesos de contraseñas')
+            raise ContrasenasOcupadas()
+
+    def _obtener_ejecutor(self):
+        # Como la cola de formularios: cada proceso de gunicorn crea el suyo.
+        # forkserver evita copiar los hilos y conexiones del proceso web
+        with self._lock:
+            if self._ejecutor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                metodos = multiprocessing.get_all_start_methods()
+                contexto = multiprocessing.get_context(
+                    'forkserver' if 'forkserver' in metodos else 'spawn')
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=self.app.config['CONTRASENA_PROCESOS'], mp_context=contexto,
+                    initializer=_iniciar_proceso,
+                    initargs=(self.app.config['CONTRASENA_PRIORIDAD'],))
+            return self._ejecutor
+
+
+def cifrar(password):
+    """Hash de la contraseña con la extensión de la aplicación o, sin ella, en el momento."""
+    if has_app_context() and 'contrasenas' in current_app.extensions:
+        return current_app.extensions['contrasenas'].cifrar(password)
+    return generate_password_hash(password)
+
+
+def verificar(password_hash, password):
+    """Verifica la contraseña con la extensión de la aplicación o, sin ella, en el momento."""
+    if has_app_context() and 'contrasenas' in current_app.extensions:
+        return current_app.extensions['contrasenas'].verificar(password_hash, password)
+    return check_password_hash(password_hash, password)
+
+
+def rehash_pendiente(password_hash):
+    """True si la aplicación tiene configurado otro método para este hash."""
+    if has_app_context() and 'contrasenas' in current_app.extensions:
+        return current_app.extensions['contrasenas'].necesita_rehash(password_hash)
+    return False
+
+
+contrasenas = Contrasenas()
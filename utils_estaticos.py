@@ -0,0 +1,300 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+import click
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+from markupsafe import Markup
+
+import utils_paquetes
+
+MANIFIESTO = 'manifest.json'
+# Archivos de texto que vale la pena precomprimir
+COMPRIMIBLES = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.map')
+# Imágenes de las que se generan versiones WebP/AVIF en varios anchos
+REDIMENSIONABLES = ('.png', '.jpg', '.jpeg')
+ANCHOS = (480, 960, 1600)
+UN_ANIO = 365 * 24 * 3600
+
+bp = Blueprint('estaticos', __name__)
+
+
+def huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:12]
+
+
+def _escribir(ruta, contenido):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(contenido)
+
+
+def _precomprimir(ruta, contenido):
+    """Genera ruta.gz y ruta.br (si Brotli está instalado) junto al archivo."""
+    variantes = []
+    if not os.path.exists(ruta + '.gz'):
+        _escribir(ruta + '.gz', gzip.compress(contenido, compresslevel=9, mtime=0))
+    variantes.append('gzip')
+    try:
+        import brotli
+    except ImportError:
+        return variantes
+    if not os.path.exists(ruta + '.br'):
+        _escribir(ruta + '.br', brotli.compress(contenido, quality=11))
+    variantes.append('br')
+    return variantes
+
+
+def _variantes_imagen(ruta_original, destino, base, anchos, calidad):
+    """
+    Genera las versiones WebP y AVIF de una imagen en cada ancho menor al
+    original (más el ancho original si es menor que el mayor pedido).
+
+    Devuelve:
+        (ancho, alto, {'avif': [[ancho, nombre], ...], 'webp': [...]}) o
+        None si Pillow no está instalado.
+    """
+    try:
+        from PIL import Image, features
+    except ImportError:
+        return None
+
+    formatos = [('webp', 'WEBP', {'quality': calidad, 'method': 6})]
+    if features.check('avif'):
+        formatos.insert(0, ('avif', 'AVIF', {'quality': calidad - 25, 'speed': 6}))
+
+    with Image.open(ruta_original) as imagen:
+        imagen.load()
+        ancho, alto = imagen.size
+        if imagen.mode not in ('RGB', 'RGBA'):
+            imagen = imagen.convert('RGBA' if 'transparency' in imagen.info else 'RGB')
+        destinos = sorted({a for a in anchos if a < ancho} | {min(ancho, max(anchos))})
+        variantes = {formato: [] for formato, _, _ in formatos}
+        for objetivo in destinos:
+            copia = None
+            for formato, formato_pil, opciones in formatos:
+                nombre = f'{base}.{objetivo}.{formato}'
+                ruta = os.path.join(destino, nombre)
+                if not os.path.exists(ruta):
+                    if copia is None:
+                        copia = imagen if objetivo == ancho else imagen.resize(
+                            (objetivo, round(alto * objetivo / ancho)), Image.LANCZOS)
+                    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                    copia.save(ruta, formato_pil, **opciones)
+                variantes[formato].append([objetivo, nombre])
+    return ancho, alto, variantes
+
+
+def _guardar(destino, nombre, contenido):
+    """Escribe `contenido` con huella en destino y devuelve su entrada."""
+    raiz, extension = os.path.splitext(nombre)
+    con_huella = f'{raiz}.{huella(contenido)}{extension}'
+    ruta_destino = os.path.join(destino, con_huella)
+    if not os.path.exists(ruta_destino):
+        _escribir(ruta_destino, contenido)
+    entrada = {'url': con_huella}
+    if extension.lower() in COMPRIMIBLES:
+        entrada['comprimidos'] = _precomprimir(ruta_destino, contenido)
+    return entrada
+
+
+def construir(origen, destino, anchos=ANCHOS, calidad=80, al_avanzar=None, plantillas=None):
+    """
+    Copia los archivos estáticos a `destino` con el hash del contenido en
+    el nombre (css/style.css -> css/style.1a2b3c4d5e6f.css), precomprime
+    CSS/JS/SVG en gzip y brotli, genera variantes WebP/AVIF redimensionadas
+    de las imágenes y escribe manifest.json con la correspondencia.
+
+    Si static/vendor/ existe también arma bundle.css, bundle.js y
+    critico.css (ver utils_paquetes.PAQUETES); `plantillas` es la carpeta
+    de donde sale el CSS crítico (por defecto templates/ junto a `origen`).
+
+    Los nombres dependen del contenido, así que lo que ya existe en destino
+    no se vuelve a generar.
+
+    Devuelve:
+        El manifiesto (diccionario nombre original -> datos).
+    """
+    manifiesto = {}
+    for carpeta, _, archivos in os.walk(origen):
+        if os.path.abspath(carpeta).startswith(os.path.abspath(destino)):
+            continue
+        for archivo in sorted(archivos):
+            if archivo.startswith('.'):
+                continue
+            ruta = os.path.join(carpeta, archivo)
+            nombre = os.path.relpath(ruta, origen).replace(os.sep, '/')
+            with open(ruta, 'rb') as f:
+                contenido = f.read()
+            entrada = _guardar(destino, nombre, contenido)
+            if os.path.splitext(nombre)[1].lower() in REDIMENSIONABLES:
+                base = os.path.splitext(entrada['url'])[0]
+                imagen = _variantes_imagen(ruta, destino, base, anchos, calidad)
+                if imagen:
+                    entrada['ancho'], entrada['alto'], entrada['variantes'] = imagen
+            manifiesto[nombre] = entrada
+            if al_avanzar:
+                al_avanzar(nombre, entrada)
+
+    plantillas = plantillas or os.path.join(os.path.dirname(os.path.abspath(origen)), 'templates')
+    for nombre, (contenido, partes) in utils_paquetes.paquetes(origen, manifiesto, plantillas).items():
+        entrada = _guardar(destino, nombre, contenido)
+        entrada['partes'] = partes
+        manifiesto[nombre] = entrada
+        if al_avanzar:
+            al_avanzar(nombre, entrada)
+
+    _escribir(os.path.join(destino, MANIFIESTO),
+              json.dumps(manifiesto, indent=1, sort_keys=True).encode())
+    return manifiesto
+
+
+class Estaticos:
+    """
+    Sirve los archivos construidos por `flask estaticos construir` en
+    /assets/ y da a las plantillas las funciones estatico(), srcset() e
+    imagen_info(). Sin manifiesto (en desarrollo) todo apunta a /static/
+    como siempre.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        directorio = os.path.join(app.root_path, app.config['ESTATICOS_DIR'])
+        manifiesto = {}
+        ruta = os.path.join(directorio, MANIFIESTO)
+        if app.config['ESTATICOS_HUELLA'] and os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+        app.extensions['estaticos'] = {
+            'directorio': directorio,
+            'manifiesto': manifiesto,
+            # nombre con huella -> codificaciones disponibles (br, gzip)
+            'comprimidos': {e['url']: e.get('comprimidos', []) for e in manifiesto.values()},
+            'critico': None,
+        }
+        app.register_blueprint(bp)
+        app.cli.add_command(estaticos_cli)
+        app.jinja_env.globals.update(
+            estatico=estatico, srcset=srcset, imagen_info=imagen_info,
+            paquete_activo=paquete_activo, css_critico=css_critico)
+
+
+def _datos():
+    return current_app.extensions['estaticos']
+
+
+def imagen_info(nombre):
+    """Devuelve los datos del manifiesto de un archivo, o None."""
+    return _datos()['manifiesto'].get(nombre)
+
+
+def estatico(nombre):
+    """
+    URL de un archivo de static/: la versión con huella si está construida
+    (se puede cachear para siempre) o la de /static/ si no.
+    """
+    entrada = imagen_info(nombre)
+    if entrada is None:
+        return url_for('static', filename=nombre)
+    return url_for('estaticos.servir', filename=entrada['url'])
+
+
+def srcset(nombre, formato='webp'):
+    """
+    Valor del atributo srcset con las variantes de una imagen en el formato
+    pedido ('webp' o 'avif'), o '' si no se generaron.
+    """
+    entrada = imagen_info(nombre) or {}
+    return ', '.join(
+        f"{url_for('estaticos.servir', filename=archivo)} {ancho}w"
+        for ancho, archivo in entrada.get('variantes', {}).get(formato, []))
+
+
+def paquete_activo():
+    """
+    True si las plantillas deben usar bundle.css/bundle.js en lugar de los
+    CDN: ESTATICOS_BUNDLE activado y los paquetes construidos.
+    """
+    return current_app.config['ESTATICOS_BUNDLE'] and 'bundle.css' in _datos()['manifiesto']
+
+
+def css_critico():
+    """Contenido de critico.css para ponerlo en un <style> del <head>."""
+    datos = _datos()
+    if datos['critico'] is None:
+        entrada = datos['manifiesto'].get(utils_paquetes.CRITICO)
+        texto = ''
+        if entrada:
+            with open(os.path.join(datos['directorio'], entrada['url']), encoding='utf-8') as archivo:
+                texto = archivo.read()
+        # Es CSS propio generado al construir: no hay nada que escapar
+        datos['critico'] = Markup(texto.replace('</', '<\\/'))
+    return datos['critico']
+
+# Ruta para servir los archivos con huella, precomprimidos si el navegador acepta
+
+
+@bp.route('/assets/<path:filename>')
+def servir(filename):
+    datos = _datos()
+    tipo = mimetypes.guess_type(filename)[0]
+    disponibles = datos['comprimidos'].get(filename, [])
+    for codificacion, extension in (('br', '.br'), ('gzip', '.gz')):
+        if codificacion in disponibles and codificacion in request.accept_encodings:
+            respuesta = send_from_directory(
+                datos['directorio'], filename + extension, mimetype=tipo, max_age=UN_ANIO)
+            respuesta.content_encoding = codificacion
+            break
+    else:
+        respuesta = send_from_directory(
+            datos['directorio'], filename, mimetype=tipo, max_age=UN_ANIO)
+    if disponibles:
+        respuesta.vary.add('Accept-Encoding')
+    # El nombre cambia con el contenido: el navegador no necesita revalidar
+    respuesta.cache_control.public = True
+    respuesta.cache_control.immutable = True
+    return respuesta
+
+
+estaticos = Estaticos()
+estaticos_cli = AppGroup('estaticos', help='Archivos estáticos con huella y precomprimidos.')
+
+
+@estaticos_cli.command('construir')
+@click.option('--calidad', default=80, show_default=True, help='Calidad de WebP (AVIF usa 25 menos).')
+def construir_estaticos(calidad):
+    """Genera ESTATICOS_DIR a partir de static/ (huellas, gzip/brotli, WebP/AVIF)."""
+    destino = _datos()['directorio']
+    manifiesto = construir(current_app.static_folder, destino, calidad=calidad,
+                           al_avanzar=lambda nombre, _: click.echo(nombre, err=True))
+    click.echo(f'{len(manifiesto)} archivos en {destino}.')
+
+
+@estaticos_cli.command('vendorizar')
+@click.option('--desde', type=click.Path(exists=True, file_okay=False),
+              help='Carpeta con los archivos de utils_paquetes.FUENTES ya descargados.')
+def vendorizar_estaticos(desde):
+    """Copia Bootstrap, Popper y los íconos usados de Font Awesome a static/vendor/."""
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        raise click.ClickException('Hace falta fonttools para recortar las fuentes: pip install fonttools')
+    escritos = utils_paquetes.vendorizar(
+        current_app.static_folder, os.path.join(current_app.root_path, current_app.template_folder),
+        desde=desde,
+        al_avanzar=lambda nombre, tamano: click.echo(f'{nombre}: {tamano / 1024:.1f} KiB', err=True))
+    click.echo(f'{len(escritos)} archivos en static/{utils_paquetes.VENDOR}/.')
+
+
+if __name__ == '__main__':
+    # Para la imagen de Docker: no necesita la configuración de la aplicación
+    import sys
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    destino = sys.argv[1] if len(sys.argv) > 1 else os.path.join(raiz, 'build', 'static')
+    print(f"{len(construir(os.path.join(raiz, 'static'), destino))} archivos en {destino}.")
@@ -0,0 +1,56 @@
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Agrega la etiqueta {% cache %} a Jinja para guardar el HTML de un
+    fragmento ya renderizado:
+
+        {% cache %} ... {% endcache %}
+        {% cache current_date.year %} ... {% endcache %}
+
+    La clave se forma con la versión de despliegue, el nombre de la
+    plantilla, la línea de la etiqueta y los argumentos. Así una página
+    personalizada (la barra de navegación cambia con el usuario) reutiliza
+    igual las partes pesadas que no cambian.
+
+    Se configura con los atributos del entorno fragment_cache (un
+    CacheBackend), fragment_cache_version y fragment_cache_ttl; sin
+    fragment_cache el contenido se renderiza siempre.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(
+            fragment_cache=None,
+            fragment_cache_version='',
+            fragment_cache_ttl=3600,
+        )
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = []
+        while parser.stream.current.type != 'block_end':
+            if args:
+                parser.stream.expect('comma')
+            args.append(parser.parse_expression())
+        clave = nodes.Const(f'{parser.name}:{lineno}')
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_renderizar', [clave, nodes.List(args)]),
+            [], [], body).set_lineno(lineno)
+
+    def _renderizar(self, clave, args, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        clave = f'{self.environment.fragment_cache_version}:{clave}:{args!r}'
+        fragmento = cache.get(clave)
+        if fragmento is None:
+            fragmento = caller()
+            cache.set(clave, str(fragmento), self.environment.fragment_cache_ttl)
+        return Markup(fragmento)
@@ -0,0 +1,206 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from sqlalchemy import insert, select
+
+from extensiones import db
+from models import Video, motor_con_indice
+from utils_youtube import parse_youtube_url, embed_url_para
+
+FORMATOS = ('csv', 'jsonl', 'urls')
+COLUMNAS_EXPORTACION = ('id', 'title', 'description', 'youtube_url', 'video_id',
+                        'fecha_creacion', 'usuario')
+
+
+def formato_de(nombre, formato=None):
+    """
+    Devuelve el formato indicado o lo deduce de la extensión del archivo:
+    .csv, .jsonl/.ndjson y cualquier otro como lista de URLs.
+    """
+    if formato:
+        return formato
+    nombre = (nombre or '').lower()
+    if nombre.endswith('.csv'):
+        return 'csv'
+    if nombre.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'urls'
+
+
+def leer_filas(archivo, formato):
+    """
+    Generador de diccionarios con title, description y url leídos de un
+    archivo abierto en modo texto, sin cargarlo completo en memoria.
+
+    Argumentos:
+        archivo: Archivo de texto abierto.
+        formato: 'csv' (con cabecera), 'jsonl' (un objeto por línea) o
+            'urls' (una URL de YouTube por línea).
+    """
+    if formato == 'csv':
+        filas = csv.DictReader(archivo)
+    elif formato == 'jsonl':
+        filas = _objetos_jsonl(archivo)
+    else:
+        filas = ({'url': linea.strip()} for linea in archivo
+                 if linea.strip() and not linea.startswith('#'))
+    for fila in filas:
+        yield {
+            'title': _texto(fila.get('title')).strip(),
+            'description': _texto(fila.get('description')),
+            'url': _texto(fila.get('url') or fila.get('youtube_url')).strip(),
+        }
+
+
+def _objetos_jsonl(archivo):
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            fila = None
+        # Una línea rota o que no es un objeto queda sin URL y se cuenta
+        # como no válida, igual que una fila mala del CSV
+        yield fila if isinstance(fila, dict) else {}
+
+
+def _texto(valor):
+    return '' if valor is None else str(valor)
+
+
+def en_lotes(iterable, tamanio):
+    """Agrupa un iterable en listas de como mucho `tamanio` elementos."""
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamanio))
+        if not lote:
+            return
+        yield lote
+
+
+class Progreso:
+    """Contadores de una importación o exportación y su velocidad."""
+
+    def __init__(self):
+        self.leidos = self.insertados = self.duplicados = self.invalidos = 0
+        self.inicio = time.perf_counter()
+
+    @property
+    def filas_por_segundo(self):
+        return self.leidos / max(time.perf_counter() - self.inicio, 1e-9)
+
+    def __str__(self):
+        return (f'{self.leidos} leídos, {self.insertados} insertados, '
+                f'{self.duplicados} duplicados, {self.invalidos} no válidos '
+                f'({self.filas_por_segundo:,.0f} filas/s)')
+
+
+def importar_videos(filas, user_id, tamanio_lote=1000, al_avanzar=None):
+    """
+    Inserta videos en lotes, una transacción por lote, descartando las URL
+    no válidas y los videos que el usuario ya tiene (mismo video_id).
+
+    Argumentos:
+        filas: Iterable de diccionarios como los de leer_filas.
+        user_id: Dueño de los videos importados.
+        tamanio_lote: Filas por INSERT y por transacción.
+        al_avanzar: Función opcional que recibe el Progreso tras cada lote.
+
+    Devuelve:
+        El Progreso final.
+    """
+    progreso = Progreso()
+    for lote in en_lotes(filas, tamanio_lote):
+        progreso.leidos += len(lote)
+        nuevos = {}
+        for fila in lote:
+            video_id = parse_youtube_url(fila['url'])
+            if not video_id:
+                progreso.invalidos += 1
+            elif video_id in nuevos:
+                progreso.duplicados += 1
+            else:
+                nuevos[video_id] = {
+                    'title': fila['title'] or video_id,
+                    'description': fila['description'],
+                    'youtube_url': fila['url'],
+                    'video_id': video_id,
+                    'embed_url': embed_url_para(video_id),
+                    'user_id': user_id,
+                }
+        if nuevos:
+            existentes = db.session.scalars(select(Video.video_id).where(
+                Video.user_id == user_id, Video.video_id.in_(list(nuevos))))
+            for video_id in set(existentes):
+                del nuevos[video_id]
+                progreso.duplicados += 1
+        if nuevos:
+            # El INSERT masivo no dispara los eventos del modelo, así que el
+            # índice de búsqueda se actualiza aquí en la misma transacción
+            insertados = db.session.execute(
+                insert(Video).returning(Video.id, Video.title, Video.description),
+                list(nuevos.values())).all()
+            conexion = db.session.connection()
+            motor = motor_con_indice(conexion)
+            if motor:
+                motor.indexar_lote(conexion, insertados)
+            progreso.insertados += len(insertados)
+        db.session.commit()
+        if al_avanzar:
+            al_avanzar(progreso)
+    return progreso
+
+
+def videos_para_exportar(user_id=None, tamanio_lote=1000):
+    """
+    Generador de videos ordenados por id, leídos por lotes con un cursor
+    sobre la clave primaria para no cargar la tabla en memoria.
+    """
+    ultimo_id = 0
+    while True:
+        consulta = select(Video.id, Video.title, Video.description, Video.youtube_url,
+                          Video.video_id, Video.fecha_creacion, Video.user_id).where(
+            Video.id > ultimo_id).order_by(Video.id).limit(tamanio_lote)
+        if user_id is not None:
+            consulta = consulta.where(Video.user_id == user_id)
+        lote = db.session.execute(consulta).all()
+        if not lote:
+            return
+        yield from lote
+        ultimo_id = lote[-1].id
+
+
+def escribir_videos(videos, archivo, formato, usuarios):
+    """
+    Escribe los videos en el archivo en el formato pedido y devuelve
+    cuántos escribió.
+
+    Argumentos:
+        videos: Iterable de filas de videos_para_exportar.
+        archivo: Archivo de texto abierto para escritura.
+        formato: 'csv', 'jsonl' o 'urls'.
+        usuarios: Diccionario id -> username para la columna usuario.
+    """
+    escritor = None
+    if formato == 'csv':
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS_EXPORTACION)
+    total = 0
+    for video in videos:
+        if formato == 'urls':
+            archivo.write(video.youtube_url + '\n')
+        else:
+            valores = (video.id, video.title, video.description, video.youtube_url,
+                       video.video_id,
+                       video.fecha_creacion.isoformat() if video.fecha_creacion else None,
+                       usuarios.get(video.user_id))
+            if escritor:
+                escritor.writerow(valores)
+            else:
+                archivo.write(json.dumps(dict(zip(COLUMNAS_EXPORTACION, valores)),
+                                         ensure_ascii=False) + '\n')
+        total += 1
+    return total
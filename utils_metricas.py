@@ -0,0 +1,395 @@
+import fcntl
+import hmac
+import os
+import pickle
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Blueprint, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils_cache import CacheBackend
+from utils_consultas import consultas_en_peticion
+
+# Límites de los histogramas en segundos (los de prometheus_client)
+LIMITES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+bp = Blueprint('metricas', __name__)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ''
+    return '{' + ','.join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + '}'
+
+
+class Contador:
+    """Contador con etiquetas (solo sube)."""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, valores=(), cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def estado(self):
+        """Copia de los valores: {etiquetas: valor}."""
+        with self._lock:
+            return dict(self._valores)
+
+    @staticmethod
+    def combinar(total, estado):
+        for etiquetas, valor in estado.items():
+            total[etiquetas] = total.get(etiquetas, 0) + valor
+
+    def lineas(self, estado):
+        for etiquetas, valor in sorted(estado.items()):
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {valor:g}'
+
+
+class Histograma:
+    """Histograma acumulativo con etiquetas, en el formato de Prometheus."""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        # etiquetas -> [cuentas por límite..., +Inf], suma
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, valores=()):
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            else:
+                serie[0][-1] += 1
+            serie[1] += valor
+
+    def estado(self):
+        """Copia de las series: {etiquetas: (cuentas por límite, suma)}."""
+        with self._lock:
+            return {k: (list(c), s) for k, (c, s) in self._series.items()}
+
+    @staticmethod
+    def combinar(total, estado):
+        for etiquetas, (cuentas, suma) in estado.items():
+            if etiquetas in total:
+                anteriores, anterior = total[etiquetas]
+                cuentas = [a + b for a, b in zip(anteriores, cuentas)]
+                suma += anterior
+            total[etiquetas] = (list(cuentas), suma)
+
+    def lineas(self, estado):
+        for valores, (cuentas, suma) in sorted(estado.items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.limites + ('+Inf',), cuentas):
+                acumulado += cuenta
+                etiquetas = _etiquetas(self.etiquetas + ('le',), valores + (limite,))
+                yield f'{self.nombre}_bucket{etiquetas} {acumulado}'
+            etiquetas = _etiquetas(self.etiquetas, valores)
+            yield f'{self.nombre}_sum{etiquetas} {suma:.6f}'
+            yield f'{self.nombre}_count{etiquetas} {acumulado}'
+
+
+class Metricas:
+    """
+    Métricas de rendimiento del proceso: duración de cada petición por
+    endpoint, consultas SQL y su tiempo, tiempo de las plantillas y aciertos
+    de las cachés. Se leen en /metrics (formato de Prometheus) y, con
+    METRICAS_SERVER_TIMING, en la cabecera Server-Timing de cada respuesta.
+
+    Con METRICAS=False no se registra nada: ni eventos ni la ruta.
+
+    Con METRICAS_DIR (gunicorn.conf.py lo define), cada proceso guarda sus
+    números en ese directorio cada METRICAS_INTERVALO segundos y /metrics
+    suma los de todos, así da lo mismo qué proceso atienda la lectura. Los
+    de procesos que ya terminaron (max_requests, recargas) se juntan en un
+    solo archivo para que los contadores no bajen.
+    """
+
+    def __init__(self, app=None):
+        self.peticiones = Contador(
+            'peticiones_total', 'Peticiones atendidas.', ('endpoint', 'metodo', 'estado'))
+        self.duracion = Histograma(
+            'peticion_duracion_segundos', 'Duración de las peticiones.', ('endpoint', 'metodo'))
+        self.consultas = Contador(
+            'sql_consultas_total', 'Consultas SQL ejecutadas.', ('endpoint',))
+        self.tiempo_sql = Contador(
+            'sql_duracion_segundos_total', 'Tiempo en consultas SQL.', ('endpoint',))
+        self.plantillas = Histograma(
+            'plantilla_duracion_segundos', 'Tiempo de render de las plantillas.', ('plantilla',))
+        self._eventos = False
+        self.app = None
+        self.directorio = None
+        self._hilo = None
+        self._pid = None
+        self._archivo = None
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def metricas(self):
+        return (self.peticiones, self.duracion, self.consultas, self.tiempo_sql, self.plantillas)
+
+    def init_app(self, app):
+        if not app.config['METRICAS']:
+            return
+        self.app = app
+        self.directorio = app.config['METRICAS_DIR'] or None
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+        app.extensions['metricas'] = self
+        app.before_request(_iniciar)
+        app.after_request(self._registrar)
+        app.register_blueprint(bp)
+        if not self._eventos:
+            # Los eventos son globales: se conectan una sola vez por proceso
+            from flask import before_render_template, template_rendered
+            event.listen(Engine, 'before_cursor_execute', _antes_consulta)
+            event.listen(Engine, 'after_cursor_execute', _despues_consulta)
+            event.listen(Engine, 'handle_error', _error_consulta)
+            before_render_template.connect(_antes_plantilla)
+            template_rendered.connect(self._despues_plantilla)
+            self._eventos = True
+
+    def _despues_plantilla(self, app, template, context, **extra):
+        if 'metricas' not in app.extensions or not has_request_context():
+            return
+        inicios = g.get('_inicio_plantillas')
+        if inicios:
+            duracion = time.perf_counter() - inicios.pop()
+            g.tiempo_plantillas = g.get('tiempo_plantillas', 0.0) + duracion
+            self.plantillas.observar(duracion, (template.name or 'sin_nombre',))
+
+    def _registrar(self, respuesta):
+        inicio = g.get('_inicio_peticion')
+        if inicio is None:
+            return respuesta
+        self._iniciar_guardado()
+        duracion = time.perf_counter() - inicio
+        endpoint = request.endpoint or 'sin_ruta'
+        consultas = consultas_en_peticion()
+        tiempo_sql = g.get('tiempo_sql', 0.0)
+        self.peticiones.sumar((endpoint, request.method, str(respuesta.status_code)))
+        self.duracion.observar(duracion, (endpoint, request.method))
+        if consultas:
+            self.consultas.sumar((endpoint,), consultas)
+            self.tiempo_sql.sumar((endpoint,), tiempo_sql)
+        if current_app.config['METRICAS_SERVER_TIMING']:
+            partes = [f'app;dur={duracion * 1000:.1f}',
+                      f'sql;dur={tiempo_sql * 1000:.1f};desc="{consultas} consultas"']
+            if 'tiempo_plantillas' in g:
+                partes.append(f'plantilla;dur={g.tiempo_plantillas * 1000:.1f}')
+            respuesta.headers.add('Server-Timing', ', '.join(partes))
+        return respuesta
+
+    # --- Suma entre procesos (METRICAS_DIR) ---
+
+    def _iniciar_guardado(self):
+        # Un hilo por proceso: los hilos no sobreviven al fork de gunicorn
+        if not self.directorio or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._archivo = os.path.join(self.directorio, f'{self._pid}-{time.time_ns()}.pickle')
+        self._hilo = threading.Thread(target=self._bucle, name='metricas', daemon=True)
+        self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            time.sleep(self.app.config['METRICAS_INTERVALO'])
+            try:
+                self.guardar()
+            except OSError:
+                self.app.logger.exception('No se pudieron guardar las métricas')
+
+    def estado(self, app):
+        """Los números de este proceso, incluidos los de las cachés."""
+        caches = {nombre: (backend.aciertos, backend.fallos)
+                  for nombre, backend in _caches(app).items()}
+        return {'metricas': [metrica.estado() for metrica in self.metricas], 'caches': caches}
+
+    def guardar(self):
+        """Escribe (de forma atómica) los números de este proceso en METRICAS_DIR."""
+        if not self.directorio or self._pid != os.getpid():
+            return
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix='.')
+        with os.fdopen(descriptor, 'wb') as archivo:
+            pickle.dump(self.estado(self.app), archivo)
+        os.replace(temporal, self._archivo)
+
+    def _leer(self, ruta):
+        try:
+            with open(ruta, 'rb') as archivo:
+                return pickle.load(archivo)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _combinar(self, total, estado):
+        for metrica, acumulado, parte in zip(self.metricas, total['metricas'], estado['metricas']):
+            metrica.combinar(acumulado, parte)
+        for nombre, (aciertos, fallos) in estado['caches'].items():
+            anteriores = total['caches'].get(nombre, (0, 0))
+            total['caches'][nombre] = (anteriores[0] + aciertos, anteriores[1] + fallos)
+
+    def _vacio(self):
+        return {'metricas': [{} for _ in self.metricas], 'caches': {}}
+
+    def estado_total(self, app):
+        """
+        La suma de todos los procesos: los archivos de METRICAS_DIR y los
+        números actuales de este proceso (sin METRICAS_DIR, solo estos).
+        """
+        if not self.directorio:
+            return self.estado(app)
+        total = self._vacio()
+        with _bloqueo(os.path.join(self.directorio, '.bloqueo')):
+            terminados = os.path.join(self.directorio, 'terminados.pickle')
+            juntos = self._leer(terminados) or self._vacio()
+            hay_terminados = False
+            for nombre in os.listdir(self.directorio):
+                ruta = os.path.join(self.directorio, nombre)
+                if nombre.startswith('.') or ruta in (terminados, self._archivo):
+                    continue
+                estado = self._leer(ruta)
+                if estado is None:
+                    continue
+                if _vivo(int(nombre.split('-')[0])):
+                    self._combinar(total, estado)
+                else:
+                    self._combinar(juntos, estado)
+                    os.remove(ruta)
+                    hay_terminados = True
+            if hay_terminados:
+                descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix='.')
+                with os.fdopen(descriptor, 'wb') as archivo:
+                    pickle.dump(juntos, archivo)
+                os.replace(temporal, terminados)
+        self._combinar(total, juntos)
+        self._combinar(total, self.estado(app))
+        return total
+
+    def exponer(self, app):
+        """Texto con todas las métricas en el formato de exposición de Prometheus."""
+        total = self.estado_total(app)
+        lineas = []
+        for metrica, estado in zip(self.metricas, total['metricas']):
+            lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.lineas(estado))
+        caches = sorted(total['caches'].items())
+        for nombre, ayuda, posicion in (
+                ('cache_aciertos_total', 'Lecturas de caché que encontraron el valor.', 0),
+                ('cache_fallos_total', 'Lecturas de caché que no lo encontraron.', 1)):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} counter')
+            for cache, valores in caches:
+                lineas.append(f'{nombre}{{cache="{cache}"}} {valores[posicion]}')
+        return '\n'.join(lineas) + '\n'
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _bloqueo(ruta):
+    """Bloqueo entre procesos (fcntl) mientras se juntan los archivos."""
+    with open(ruta, 'a') as archivo:
+        fcntl.flock(archivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+def _caches(app):
+    """Las cachés de la aplicación (las de app.extensions y la de fragmentos)."""
+    caches = {nombre: valor for nombre, valor in app.extensions.items()
+              if isinstance(valor, CacheBackend)}
+    fragmentos = getattr(app.jinja_env, 'fragment_cache', None)
+    if isinstance(fragmentos, CacheBackend):
+        caches['fragmentos'] = fragmentos
+    return caches
+
+
+def _iniciar():
+    g._inicio_peticion = time.perf_counter()
+
+
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicio_consultas', []).append(time.perf_counter())
+
+
+def _despues_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_inicio_consultas')
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    # La cantidad de consultas la cuenta utils_consultas; aquí solo el tiempo
+    if has_request_context() and '_inicio_peticion' in g:
+        g.tiempo_sql = g.get('tiempo_sql', 0.0) + duracion
+
+
+def _error_consulta(contexto):
+    # La consulta falló: after_cursor_execute no se llama
+    if contexto.connection is not None:
+        inicios = contexto.connection.info.get('_inicio_consultas')
+        if inicios:
+            inicios.pop()
+
+
+def _antes_plantilla(app, template, context, **extra):
+    if 'metricas' in app.extensions and has_request_context():
+        g.setdefault('_inicio_plantillas', []).append(time.perf_counter())
+
+# Ruta para que Prometheus lea las métricas
+
+
+@bp.route('/metrics')
+def exponer_metricas():
+    token = current_app.config['METRICAS_TOKEN']
+    if not token:
+        # Sin token solo se exponen en desarrollo y en las pruebas
+        if not (current_app.debug or current_app.testing):
+            abort(404)
+    else:
+        recibido = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(recibido.encode(), f'Bearer {token}'.encode()):
+            return 'No autorizado\n', 401, {'WWW-Authenticate': 'Bearer'}
+    texto = current_app.extensions['metricas'].exponer(current_app)
+    respuesta = current_app.response_class(texto, mimetype='text/plain')
+    respuesta.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    respuesta.cache_control.no_store = True
+    return respuesta
+
+
+metricas = Metricas()
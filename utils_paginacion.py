@@ -0,0 +1,154 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+
+class Pagina:
+    """
+    Resultado de una consulta paginada por cursor (keyset).
+
+    Atributos:
+        items: Los registros de la página actual.
+        siguiente: Cursor para la página siguiente, o None si no hay más.
+        anterior: Cursor para la página anterior, o None si es la primera.
+        orden: 'asc' o 'desc'.
+        por_pagina: Tamaño de página usado.
+    """
+
+    def __init__(self, items, siguiente, anterior, orden, por_pagina):
+        self.items = items
+        self.siguiente = siguiente
+        self.anterior = anterior
+        self.orden = orden
+        self.por_pagina = por_pagina
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _codificar_cursor(direccion, valores):
+    datos = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    crudo = json.dumps({'d': direccion, 'k': datos}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor, columnas):
+    """
+    Devuelve (direccion, valores) o None si el cursor es inválido.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        direccion, crudos = datos['d'], datos['k']
+        if direccion not in ('n', 'p') or len(crudos) != len(columnas):
+            return None
+        valores = []
+        for columna, valor in zip(columnas, crudos):
+            if columna.type.python_type is datetime:
+                valor = datetime.fromisoformat(valor)
+            valores.append(valor)
+        return direccion, valores
+    except (ValueError, KeyError, TypeError, NotImplementedError):
+        return None
+
+
+def _condicion_despues(columnas, valores, ascendente):
+    """
+    Construye (c1 > v1) OR (c1 = v1 AND c2 > v2) ... para ordenar por varias
+    columnas sin depender de comparaciones de tuplas en la base de datos.
+    """
+    condiciones = []
+    for i, (columna, valor) in enumerate(zip(columnas, valores)):
+        iguales = [c == v for c, v in zip(columnas[:i], valores[:i])]
+        comparacion = columna > valor if ascendente else columna < valor
+        condiciones.append(and_(*iguales, comparacion))
+    return or_(*condiciones)
+
+
+def paginar_keyset(query, columnas, orden='desc', cursor=None, por_pagina=12):
+    """
+    Pagina una consulta buscando a partir del último registro visto en lugar
+    de usar OFFSET, de modo que cada página cuesta lo mismo sin importar
+    cuántos videos haya antes.
+
+    Argumentos:
+        query: Consulta de SQLAlchemy sin order_by.
+        columnas: Columnas de ordenamiento; la última debe ser única (ej. id).
+        orden: 'asc' o 'desc'.
+        cursor: Cursor opaco recibido en la petición, o None para la primera página.
+        por_pagina: Número de registros por página.
+
+    Devuelve:
+        Un objeto Pagina con los items y los cursores siguiente/anterior.
+    """
+    orden = 'asc' if orden == 'asc' else 'desc'
+    decodificado = _decodificar_cursor(cursor, columnas) if cursor else None
+    direccion, valores = decodificado if decodificado else ('n', None)
+
+    # Hacia atrás se recorre en sentido inverso y luego se da vuelta la lista
+    ascendente = (orden == 'asc') == (direccion == 'n')
+    if valores is not None:
+        query = query.filter(_condicion_despues(columnas, valores, ascendente))
+    query = query.order_by(
+        *[c.asc() if ascendente else c.desc() for c in columnas])
+
+    filas = query.limit(por_pagina + 1).all()
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if direccion == 'p':
+        filas.reverse()
+
+    def clave(fila):
+        return [getattr(fila, c.key) for c in columnas]
+
+    siguiente = anterior = None
+    if filas:
+        if direccion == 'n':
+            if hay_mas:
+                siguiente = _codificar_cursor('n', clave(filas[-1]))
+            if valores is not None:
+                anterior = _codificar_cursor('p', clave(filas[0]))
+        else:
+            siguiente = _codificar_cursor('n', clave(filas[-1]))
+            if hay_mas:
+                anterior = _codificar_cursor('p', clave(filas[0]))
+
+    return Pagina(filas, siguiente, anterior, orden, por_pagina)
+
+
+def paginar_peticion(query, columnas):
+    """
+    Aplica paginar_keyset con los parámetros de la petición actual (orden,
+    cursor y por_pagina, limitado a VIDEOS_POR_PAGINA_MAX).
+    """
+    config = current_app.config
+    por_pagina = request.args.get(
+        'por_pagina', config['VIDEOS_POR_PAGINA'], type=int)
+    por_pagina = max(1, min(por_pagina, config['VIDEOS_POR_PAGINA_MAX']))
+    return paginar_keyset(query, columnas, orden=request.args.get('orden', 'desc'),
+                          cursor=request.args.get('cursor'), por_pagina=por_pagina)
+
+
+def link_header(pagina, construir_url):
+    """
+    Arma el valor de la cabecera HTTP Link (RFC 8288) para la página.
+
+    Argumentos:
+        pagina: Objeto Pagina.
+        construir_url: Función que recibe un cursor y devuelve la URL absoluta.
+
+    Devuelve:
+        El valor de la cabecera, o None si no hay páginas vecinas.
+    """
+    enlaces = []
+    if pagina.siguiente:
+        enlaces.append(f'<{construir_url(pagina.siguiente)}>; rel="next"')
+    if pagina.anterior:
+        enlaces.append(f'<{construir_url(pagina.anterior)}>; rel="prev"')
+    return ', '.join(enlaces) or None
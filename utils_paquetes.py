@@ -0,0 +1,299 @@
+import io
+import os
+import posixpath
+import re
+import shutil
+import urllib.request
+
+# Versiones fijas de las dependencias que antes venían de jsdelivr/cdnjs
+BOOTSTRAP = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/'
+POPPER = 'https://cdn.jsdelivr.net/npm/@popperjs/core@2.11.8/dist/umd/'
+FONTAWESOME = 'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.2.0/'
+FUENTES = {
+    'bootstrap.min.css': BOOTSTRAP + 'css/bootstrap.min.css',
+    'bootstrap.min.js': BOOTSTRAP + 'js/bootstrap.min.js',
+    'popper.min.js': POPPER + 'popper.min.js',
+    'fontawesome.min.css': FONTAWESOME + 'css/fontawesome.min.css',
+    'solid.min.css': FONTAWESOME + 'css/solid.min.css',
+    'brands.min.css': FONTAWESOME + 'css/brands.min.css',
+    # Se parte del .ttf: el recorte se guarda como woff2
+    'fa-solid-900.ttf': FONTAWESOME + 'webfonts/fa-solid-900.ttf',
+    'fa-brands-400.ttf': FONTAWESOME + 'webfonts/fa-brands-400.ttf',
+}
+VENDOR = 'vendor'
+
+# Paquetes que genera `construir` (nombres relativos a static/, en orden de cascada)
+PAQUETES = {
+    'bundle.css': ['vendor/iconos.css', 'css/textos.css', 'css/style.css',
+                   'vendor/bootstrap.min.css'],
+    'bundle.js': ['vendor/popper.min.js', 'vendor/bootstrap.min.js', 'js/main.js'],
+}
+CRITICO = 'critico.css'
+# Plantillas cuyo contenido se ve antes de hacer scroll en todas las páginas
+PLANTILLAS_CRITICAS = ('base.html', 'shared/nav.html')
+# Clases que se agregan desde JavaScript al cargar la página
+CLASES_CRITICAS = {'day-mode', 'night-mode'}
+
+_ICONO = re.compile(r'^\.fa-([\w-]+)::?before$')
+_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def _descargar(nombre, desde):
+    if desde:
+        with open(os.path.join(desde, nombre), 'rb') as archivo:
+            return archivo.read()
+    with urllib.request.urlopen(FUENTES[nombre], timeout=30) as respuesta:
+        return respuesta.read()
+
+
+def _sin_comentarios(css):
+    """Quita los comentarios salvo los de licencia (/*! ... */)."""
+    return re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.S)
+
+
+def _sin_source_map(texto):
+    # Los .map no se copian: evita un 404 cuando se abren las herramientas
+    return re.sub(r'\n?(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$', '', texto)
+
+
+def reglas(css):
+    """
+    Divide una hoja de estilos en sus reglas de primer nivel.
+
+    Devuelve:
+        Lista de (selector, cuerpo); el cuerpo de @media trae las reglas
+        anidadas tal cual y es None en las sentencias como @charset.
+    """
+    resultado, inicio, nivel, fin_selector = [], 0, 0, 0
+    for i, caracter in enumerate(css):
+        if caracter == '{':
+            if nivel == 0:
+                fin_selector = i
+            nivel += 1
+        elif caracter == '}':
+            nivel -= 1
+            if nivel == 0:
+                resultado.append((css[inicio:fin_selector].strip(), css[fin_selector + 1:i]))
+                inicio = i + 1
+        elif caracter == ';' and nivel == 0:
+            resultado.append((css[inicio:i].strip(), None))
+            inicio = i + 1
+    return resultado
+
+
+def selectores(selector):
+    """Separa una lista de selectores por comas, sin cortar dentro de :not(...)."""
+    partes, nivel, actual = [], 0, ''
+    for caracter in selector:
+        if caracter == ',' and nivel == 0:
+            partes.append(actual.strip())
+            actual = ''
+            continue
+        nivel += {'(': 1, ')': -1}.get(caracter, 0)
+        actual += caracter
+    partes.append(actual.strip())
+    return partes
+
+
+def unir(lista):
+    return ''.join(f'{s}{{{c}}}' if c is not None else f'{s};' for s, c in lista)
+
+
+def clases_de_plantillas(carpeta, nombres):
+    """Clases CSS que aparecen en atributos class="..." de las plantillas."""
+    clases = set()
+    for nombre in nombres:
+        with open(os.path.join(carpeta, nombre), encoding='utf-8') as archivo:
+            for valor in re.findall(r'class="([^"]*)"', archivo.read()):
+                clases.update(re.sub(r'{[{%].*?[%}]}', ' ', valor).split())
+    return clases
+
+
+def iconos_usados(carpetas):
+    """Nombres de íconos fa-* usados en plantillas y scripts."""
+    iconos = set()
+    for carpeta in carpetas:
+        for raiz, _, archivos in os.walk(carpeta):
+            for archivo in archivos:
+                if archivo.endswith(('.html', '.js')) and VENDOR not in raiz:
+                    with open(os.path.join(raiz, archivo), encoding='utf-8') as f:
+                        iconos.update(re.findall(r'\bfa-([a-z0-9-]+)', f.read()))
+    return iconos
+
+
+def recortar_iconos(css, usados):
+    """
+    Quita de una hoja de Font Awesome los íconos que no se usan.
+
+    Devuelve:
+        (css recortado, puntos de código de los íconos que quedaron).
+    """
+    salida, codigos = [], set()
+    for selector, cuerpo in reglas(_sin_comentarios(css)):
+        partes = selectores(selector)
+        nombres = [_ICONO.match(p) for p in partes]
+        if cuerpo is None or not all(nombres):
+            salida.append((selector, cuerpo))
+            continue
+        elegidos = [p for p, n in zip(partes, nombres) if n.group(1) in usados]
+        if elegidos:
+            salida.append((','.join(elegidos), cuerpo))
+            codigos.update(int(c, 16) for c in re.findall(r'content:"\\([0-9a-f]+)"', cuerpo))
+    # Solo woff2: todos los navegadores que soporta Bootstrap 5 lo leen
+    css = re.sub(r',url\([^)]*\.ttf\) format\("truetype"\)', '', unir(salida))
+    css = css.replace('../webfonts/', '')
+    return css, codigos
+
+
+def recortar_fuente(contenido, codigos):
+    """Deja en la fuente solo los glifos de `codigos` y la devuelve como woff2."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    opciones = subset.Options()
+    opciones.flavor = 'woff2'
+    fuente = TTFont(io.BytesIO(contenido))
+    recortador = subset.Subsetter(opciones)
+    recortador.populate(unicodes=codigos)
+    recortador.subset(fuente)
+    salida = io.BytesIO()
+    subset.save_font(fuente, salida, opciones)
+    return salida.getvalue()
+
+
+def vendorizar(static, plantillas, desde=None, al_avanzar=None):
+    """
+    Descarga (o copia desde `desde`) las versiones fijadas en FUENTES a
+    static/vendor/: Bootstrap y Popper tal cual, y de Font Awesome solo los
+    íconos que usan las plantillas (CSS y fuentes recortadas; necesita
+    fonttools, que no hace falta en producción).
+
+    Devuelve:
+        Diccionario nombre -> tamaño en bytes de lo escrito.
+    """
+    # Primero todo a memoria: si falla una descarga no se toca vendor/
+    crudos = {nombre: _descargar(nombre, desde) for nombre in FUENTES}
+    destino = os.path.join(static, VENDOR)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.makedirs(destino)
+    escritos = {}
+
+    def escribir(nombre, contenido):
+        if isinstance(contenido, str):
+            contenido = contenido.encode('utf-8')
+        with open(os.path.join(destino, nombre), 'wb') as archivo:
+            archivo.write(contenido)
+        escritos[nombre] = len(contenido)
+        if al_avanzar:
+            al_avanzar(nombre, len(contenido))
+
+    for nombre in ('bootstrap.min.css', 'bootstrap.min.js', 'popper.min.js'):
+        escribir(nombre, _sin_source_map(crudos[nombre].decode('utf-8')))
+
+    usados = iconos_usados([plantillas, static])
+    iconos, solidos = recortar_iconos(crudos['fontawesome.min.css'].decode('utf-8'), usados)
+    marcas, de_marcas = recortar_iconos(crudos['brands.min.css'].decode('utf-8'), usados)
+    solido, _ = recortar_iconos(crudos['solid.min.css'].decode('utf-8'), usados)
+    escribir('iconos.css', '\n'.join([iconos, solido, marcas]))
+    escribir('fa-solid-900.woff2', recortar_fuente(crudos['fa-solid-900.ttf'], solidos))
+    escribir('fa-brands-400.woff2', recortar_fuente(crudos['fa-brands-400.ttf'], de_marcas))
+    return escritos
+
+
+def minificar_css(css):
+    try:
+        import rcssmin
+    except ImportError:
+        css = re.sub(r'\s+', ' ', _sin_comentarios(css))
+        return re.sub(r'\s*([{};,])\s*', r'\1', css).replace(';}', '}').strip()
+    return rcssmin.cssmin(css, keep_bang_comments=True)
+
+
+def minificar_js(js):
+    try:
+        import rjsmin
+    except ImportError:
+        return js
+    return rjsmin.jsmin(js, keep_bang_comments=True)
+
+
+def _reescribir_urls(css, carpeta, manifiesto):
+    """
+    Cambia las url() relativas de una hoja de static/`carpeta` por el
+    nombre con huella, relativo a la raíz donde queda el paquete.
+    """
+    def reemplazar(coincidencia):
+        url = coincidencia.group(2)
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return coincidencia.group(0)
+        ruta, separador, resto = re.match(r'([^?#]*)([?#]?)(.*)', url).groups()
+        entrada = manifiesto.get(posixpath.normpath(posixpath.join(carpeta, ruta)))
+        if entrada is None:
+            return coincidencia.group(0)
+        return f'url({entrada["url"]}{separador}{resto})'
+    return _URL.sub(reemplazar, css)
+
+
+def _selector_critico(selector, clases):
+    if re.search(r':(hover|focus|active|visited|checked|disabled)|::?-|\[data-bs-', selector):
+        return False
+    return all(c in clases for c in re.findall(r'\.(-?[_a-zA-Z][\w-]*)', selector))
+
+
+def css_critico(css, clases):
+    """
+    Reglas de `css` que solo dependen de `clases` (y de etiquetas), para
+    pintar la parte de arriba de la página antes de que llegue la hoja
+    completa. Se omiten @font-face, animaciones y fondos con url() relativa
+    (se inlinea en páginas con otra ruta).
+    """
+    salida = []
+    for selector, cuerpo in reglas(css):
+        if cuerpo is None:
+            continue
+        if selector.startswith(('@media', '@supports')):
+            interior = css_critico(cuerpo, clases)
+            if interior:
+                salida.append((selector, interior))
+        elif not selector.startswith('@') and not re.search(r'url\((?![\'"]?data:)', cuerpo):
+            elegidos = [s for s in selectores(selector) if _selector_critico(s, clases)]
+            if elegidos:
+                salida.append((','.join(elegidos), cuerpo))
+    return unir(salida)
+
+
+def paquetes(origen, manifiesto, plantillas):
+    """
+    Arma el contenido de los paquetes de PAQUETES y del CSS crítico a
+    partir de los archivos de `origen` (static/).
+
+    Argumentos:
+        origen: Carpeta static/.
+        manifiesto: Manifiesto de `construir` (para las url() con huella).
+        plantillas: Carpeta templates/ (para elegir el CSS crítico).
+
+    Devuelve:
+        Diccionario nombre -> (bytes, partes), vacío si falta algún archivo
+        (por ejemplo si nunca se corrió `flask estaticos vendorizar`).
+    """
+    if not all(nombre in manifiesto for partes in PAQUETES.values() for nombre in partes):
+        return {}
+    contenidos = {}
+    for paquete, partes in PAQUETES.items():
+        textos = []
+        for nombre in partes:
+            with open(os.path.join(origen, nombre), encoding='utf-8') as archivo:
+                texto = archivo.read()
+            if paquete.endswith('.css'):
+                texto = _reescribir_urls(texto, posixpath.dirname(nombre), manifiesto)
+            textos.append(texto)
+        if paquete.endswith('.css'):
+            completo = '\n'.join(textos)
+            contenidos[paquete] = (minificar_css(completo), partes)
+            clases = clases_de_plantillas(plantillas, PLANTILLAS_CRITICAS) | CLASES_CRITICAS
+            critico = css_critico(re.sub(r'/\*.*?\*/', '', completo, flags=re.S), clases)
+            contenidos[CRITICO] = (minificar_css(critico), partes)
+        else:
+            contenidos[paquete] = (minificar_js('\n;\n'.join(textos)), partes)
+    return {nombre: (texto.encode('utf-8'), partes) for nombre, (texto, partes) in contenidos.items()}
@@ -0,0 +1,127 @@
+import random
+import sqlite3
+import time
+from contextlib import closing
+from functools import wraps
+
+import click
+from flask import current_app, g, has_request_context, session
+from flask.cli import AppGroup
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, event
+
+# Clave de la sesión: hasta cuándo leer del primario después de escribir
+PAUSA = 'replica_pausa_hasta'
+
+
+def configurar_replicas(app):
+    """
+    Agrega cada URI de DATABASE_REPLICAS como un bind 'replica1',
+    'replica2', ... (antes de db.init_app). Sin réplicas no hace nada y
+    todo se lee y escribe en DATABASE_URI.
+    """
+    uris = app.config['DATABASE_REPLICAS']
+    if not uris:
+        return
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    claves = []
+    for numero, uri in enumerate(uris, start=1):
+        binds[f'replica{numero}'] = uri
+        claves.append(f'replica{numero}')
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.extensions['replicas'] = claves
+    app.cli.add_command(replicas_cli)
+
+
+def solo_lectura(vista):
+    """
+    Decorador para las vistas que solo leen: sus consultas van a una
+    réplica, salvo que quien pide haya escrito hace menos de
+    REPLICAS_PAUSA_SEGUNDOS (así ve lo que acaba de guardar).
+    """
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        if 'replicas' in current_app.extensions and session.get(PAUSA, 0) < time.time():
+            g.solo_lectura = True
+        return vista(*args, **kwargs)
+    return envoltura
+
+
+def motor_de_replica():
+    """
+    Motor de la réplica de esta petición (una al azar, la misma en toda la
+    petición) o None si la petición no puede leer de una réplica.
+    """
+    if not has_request_context() or not g.get('solo_lectura'):
+        return None
+    if 'replica' not in g:
+        g.replica = random.choice(current_app.extensions['replicas'])
+    return current_app.extensions['sqlalchemy'].engines[g.replica]
+
+
+class SesionEnrutada(Session):
+    """
+    Sesión de Flask-SQLAlchemy que, en las vistas con @solo_lectura, manda
+    las lecturas a una réplica. Las escrituras (flush, INSERT, UPDATE,
+    DELETE) siempre van al primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, (Insert, Update, Delete)):
+            replica = motor_de_replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(SesionEnrutada, 'after_flush')
+def _marcar_escritura(sesion_db, contexto):
+    sesion_db.info['escribio'] = True
+
+
+@event.listens_for(SesionEnrutada, 'after_rollback')
+def _descartar_escritura(sesion_db):
+    sesion_db.info.pop('escribio', None)
+
+
+@event.listens_for(SesionEnrutada, 'after_commit')
+def _pausar_replicas(sesion_db):
+    # Lectura de lo propio: por un rato, este usuario lee del primario
+    if sesion_db.info.pop('escribio', False) and has_request_context() \
+            and 'replicas' in current_app.extensions:
+        session[PAUSA] = time.time() + current_app.config['REPLICAS_PAUSA_SEGUNDOS']
+
+
+def copiar_sqlite(origen, destino):
+    """
+    Copia la base SQLite `origen` sobre `destino` con la API de backup de
+    SQLite: es consistente aunque el primario esté escribiendo y quien lee
+    de la réplica ve la copia anterior o la nueva, nunca una mezcla.
+    """
+    with closing(sqlite3.connect(origen)) as fuente, \
+            closing(sqlite3.connect(destino, timeout=30)) as copia:
+        fuente.backup(copia)
+
+
+replicas_cli = AppGroup('replicas', help='Réplicas de lectura de la base de datos.')
+
+
+@replicas_cli.command('copiar')
+@click.option('--intervalo', type=float, default=None,
+              help='Repetir cada tantos segundos (sin esto, copia una vez).')
+def copiar_replicas(intervalo):
+    """Copia la base SQLite primaria sobre cada réplica (para probar en local)."""
+    motores = current_app.extensions['sqlalchemy'].engines
+    primario = motores[None]
+    if primario.dialect.name != 'sqlite':
+        raise click.ClickException(
+            'La copia es solo para SQLite; en otras bases la replicación la hace el servidor.')
+    while True:
+        inicio = time.perf_counter()
+        for clave in current_app.extensions['replicas']:
+            copiar_sqlite(primario.url.database, motores[clave].url.database)
+        click.echo(f'{len(current_app.extensions["replicas"])} réplica(s) copiada(s) '
+                   f'en {(time.perf_counter() - inicio) * 1000:.0f} ms.')
+        if intervalo is None:
+            break
+        time.sleep(intervalo)
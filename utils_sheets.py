@@ -0,0 +1,44 @@
+from decouple import config
+
+# Configurar el alcance (scope) de las credenciales
+SCOPE = ["https://spreadsheets.google.com/feeds",
+         "https://www.googleapis.com/auth/drive"]
+
+_cliente = None
+
+
+def credenciales_google():
+    """
+    Arma el diccionario de la cuenta de servicio de Google desde el entorno.
+    """
+    return {
+        "type": config("GOOGLE_TYPE"),
+        "project_id": config("GOOGLE_PROJECT_ID"),
+        "private_key_id": config("GOOGLE_PRIVATE_KEY_ID"),
+        "private_key": config("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
+        "client_email": config("GOOGLE_CLIENT_EMAIL"),
+        "client_id": config("GOOGLE_CLIENT_ID"),
+        "auth_uri": config("GOOGLE_AUTH_URI"),
+        "token_uri": config("GOOGLE_TOKEN_URI"),
+        "auth_provider_x509_cert_url": config("GOOGLE_AUTH_PROVIDER_X509_CERT_URL"),
+        "client_x509_cert_url": config("GOOGLE_CLIENT_X509_CERT_URL"),
+        "universe_domain": config("GOOGLE_UNIVERSE_DOMAIN"),
+    }
+
+
+def obtener_cliente():
+    """
+    Devuelve el cliente autorizado de gspread. gspread y oauth2client se
+    importan y autorizan recién en el primer uso, no al arrancar la app.
+    """
+    global _cliente
+    if _cliente is None:
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
+        # Crear las credenciales
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(
+            credenciales_google(), scopes=SCOPE)
+        # Autorizar el cliente de gspread
+        _cliente = gspread.authorize(creds)
+    return _cliente
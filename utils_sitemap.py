@@ -0,0 +1,32 @@
+from markupsafe import escape
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def fecha_w3c(fecha):
+    return fecha.strftime('%Y-%m-%dT%H:%M:%S+00:00') if fecha else None
+
+
+def xml_urlset(urls):
+    """Generador del XML <urlset> por trozos a partir de (loc, lastmod, ...)."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+    for url in urls:
+        loc, lastmod = url[0], url[1]
+        partes = [f'<url><loc>{escape(loc)}</loc>']
+        if lastmod:
+            partes.append(f'<lastmod>{lastmod}</lastmod>')
+        if len(url) > 2:
+            partes.append(f'<changefreq>{url[2]}</changefreq><priority>{url[3]}</priority>')
+        partes.append('</url>\n')
+        yield ''.join(partes)
+    yield '</urlset>\n'
+
+
+def xml_indice(sitemaps):
+    """XML <sitemapindex> a partir de (loc, lastmod)."""
+    lineas = [f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">']
+    for loc, lastmod in sitemaps:
+        lineas.append(f'<sitemap><loc>{escape(loc)}</loc>'
+                      + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '') + '</sitemap>')
+    lineas.append('</sitemapindex>\n')
+    return '\n'.join(lineas)
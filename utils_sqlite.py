@@ -0,0 +1,74 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def es_sqlite_en_archivo(uri):
+    """True si la URI es de una base SQLite en un archivo (no en memoria)."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def opciones_motor(config):
+    """
+    Opciones de create_engine para SQLite en un archivo: un QueuePool con
+    una conexión por hilo de gunicorn (SQLITE_POOL_SIZE) y la espera de
+    sqlite3 igual a busy_timeout, así un escritor espera al otro en lugar
+    de fallar con "database is locked".
+    """
+    return {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_POOL_OVERFLOW'],
+        'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000},
+    }
+
+
+def pragmas(config):
+    """PRAGMA que se ejecutan en cada conexión nueva, en orden."""
+    lista = []
+    if config['SQLITE_WAL']:
+        # Los lectores no esperan al escritor ni el escritor a los lectores
+        lista.append('journal_mode=WAL')
+    lista += [
+        f"synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}",
+        # Negativo: en KiB en lugar de páginas
+        f"cache_size={-config['SQLITE_CACHE_MB'] * 1024}",
+        f"mmap_size={config['SQLITE_MMAP_MB'] * 1024 * 1024}",
+        'temp_store=MEMORY',
+    ]
+    return lista
+
+
+def perfil_activo(config):
+    return config['SQLITE_PERFIL'] and es_sqlite_en_archivo(config['SQLALCHEMY_DATABASE_URI'])
+
+
+def configurar_motor(app):
+    """
+    Agrega las opciones del motor para SQLite (antes de db.init_app). Las
+    de SQLALCHEMY_ENGINE_OPTIONS tienen prioridad. No hace nada con otras
+    bases, con SQLite en memoria ni con SQLITE_PERFIL=False.
+    """
+    if perfil_activo(app.config):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(
+            opciones_motor(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+
+
+def conectar_pragmas(app):
+    """Ejecuta los PRAGMA del perfil en cada conexión nueva (después de db.init_app)."""
+    if not perfil_activo(app.config):
+        return
+    sentencias = [f'PRAGMA {pragma}' for pragma in pragmas(app.config)]
+
+    def al_conectar(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        try:
+            for sentencia in sentencias:
+                cursor.execute(sentencia)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for motor in app.extensions['sqlalchemy'].engines.values():
+            if motor.dialect.name == 'sqlite':
+                event.listen(motor, 'connect', al_conectar)
@@ -0,0 +1,90 @@
+import secrets
+
+from flask import current_app, has_app_context, has_request_context, session
+from flask_login import user_logged_in
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from extensiones import db
+from models import User
+from utils_cache import CacheLRU
+
+# Clave de la sesión con el sello de la versión del usuario en caché
+SELLO = 'usuario_sello'
+
+
+def nuevo_sello():
+    return secrets.token_hex(4)
+
+
+def columnas(usuario):
+    """Valores de las columnas del usuario (lo que se guarda en la caché)."""
+    return {atributo.key: getattr(usuario, atributo.key)
+            for atributo in inspect(User).mapper.column_attrs}
+
+
+def cargar_usuario(user_id):
+    """
+    user_loader de Flask-Login con caché por proceso. La clave lleva el
+    sello guardado en la sesión: al editar el perfil o la contraseña se
+    cambia el sello y la próxima petición lee el usuario de la base, en
+    este proceso y en los demás. Las otras sesiones del mismo usuario lo
+    leen de nuevo en este proceso; en los demás pueden ver los datos
+    anteriores hasta CACHE_USUARIOS_TTL.
+
+    Devuelve:
+        El usuario, ya dentro de la sesión de SQLAlchemy (se puede
+        modificar y guardar como uno recién leído), o None.
+    """
+    cache = current_app.extensions.get('cache_usuarios')
+    if cache is None:
+        return db.session.get(User, int(user_id))
+
+    sello = session.get(SELLO)
+    clave = f'{user_id}:{sello}'
+    valores = cache.get(clave) if sello else None
+    if valores is not None:
+        usuario = User(**valores)
+        # Como si viniera de una consulta: sin cambios pendientes
+        make_transient_to_detached(usuario)
+        return db.session.merge(usuario, load=False)
+
+    usuario = db.session.get(User, int(user_id))
+    if usuario is not None:
+        if not sello:
+            sello = session[SELLO] = nuevo_sello()
+        cache.set(f'{user_id}:{sello}', columnas(usuario), current_app.config['CACHE_USUARIOS_TTL'])
+    return usuario
+
+
+def _renovar_sello(usuario_id):
+    cache = current_app.extensions.get('cache_usuarios')
+    anterior = session.get(SELLO)
+    if cache is not None and anterior:
+        cache.delete(f'{usuario_id}:{anterior}')
+    session[SELLO] = nuevo_sello()
+
+
+def _al_iniciar_sesion(app, user, **extra):
+    _renovar_sello(user.id)
+
+
+def _usuario_modificado(mapper, conexion, usuario):
+    # En este proceso se descartan las entradas de todas sus sesiones; a
+    # los demás procesos solo llega el sello nuevo de quien hizo el cambio
+    cache = current_app.extensions.get('cache_usuarios') if has_app_context() else None
+    if cache is not None:
+        cache.delete_prefijo(f'{usuario.id}:')
+    if has_request_context() and session.get('_user_id') == str(usuario.id):
+        _renovar_sello(usuario.id)
+
+
+def init_cache_usuarios(app):
+    """Crea la caché de usuarios (CACHE_USUARIOS) y conecta la invalidación."""
+    if not app.config['CACHE_USUARIOS']:
+        return
+    app.extensions['cache_usuarios'] = CacheLRU(max_items=app.config['CACHE_USUARIOS_MAX_ITEMS'])
+    if not event.contains(User, 'after_update', _usuario_modificado):
+        event.listen(User, 'after_update', _usuario_modificado)
+        event.listen(User, 'after_delete', _usuario_modificado)
+        user_logged_in.connect(_al_iniciar_sesion)
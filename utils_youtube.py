@@ -0,0 +1,62 @@
+import re
+from functools import lru_cache
+
+# Todas las formas de URL de YouTube se compilan una sola vez al importar
+_ID = r'(?P<id>[A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+_DOMINIO = r'(?:https?://)?(?:www\.|m\.|music\.)?'
+YOUTUBE_PATRONES = (
+    # youtube.com/watch?v=ID (v puede no ser el primer parámetro)
+    re.compile(_DOMINIO + r'youtube\.com/watch/?\?(?:[^#\s]*&)?v=' + _ID),
+    # youtube.com/embed/ID, /shorts/ID, /live/ID, /v/ID y youtube-nocookie.com
+    re.compile(_DOMINIO + r'youtube(?:-nocookie)?\.com/(?:embed|shorts|live|v|e)/' + _ID),
+    # youtu.be/ID
+    re.compile(r'(?:https?://)?youtu\.be/' + _ID),
+)
+# Un ID pegado directamente en el formulario
+YOUTUBE_ID_RE = re.compile(r'^' + _ID + r'$')
+
+EMBED_URL = 'https://www.youtube.com/embed/{}'
+
+
+@lru_cache(maxsize=4096)
+def parse_youtube_url(youtube_url):
+    """
+    Extrae el ID de 11 caracteres de cualquier URL de YouTube.
+
+    Argumentos:
+        youtube_url: La URL del video (watch, youtu.be, shorts, embed, live)
+            o directamente el ID.
+
+    Devuelve:
+        El ID del video, o None si la URL no es de YouTube.
+    """
+    if not youtube_url:
+        return None
+    youtube_url = youtube_url.strip()
+    for patron in YOUTUBE_PATRONES:
+        coincidencia = patron.match(youtube_url)
+        if coincidencia:
+            return coincidencia.group('id')
+    coincidencia = YOUTUBE_ID_RE.match(youtube_url)
+    return coincidencia.group('id') if coincidencia else None
+
+
+def embed_url_para(video_id):
+    """
+    Devuelve la URL para incrustar el video con el ID dado.
+    """
+    return EMBED_URL.format(video_id) if video_id else None
+
+
+def embed_youtube_url(youtube_url):
+    """
+    Extrae el ID del video de una URL de YouTube y devuelve la URL incrustada.
+    Solo se usa como respaldo para filas sin embed_url guardado.
+
+    Argumentos:
+        youtube_url: La URL del video de YouTube.
+
+    Devuelve:
+        La URL incrustada para el video de YouTube, o None si la URL es inválida.
+    """
+    return embed_url_para(parse_youtube_url(youtube_url))